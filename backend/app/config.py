@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./gateway.db"
@@ -10,6 +10,95 @@ class Settings(BaseSettings):
     
     mock_fico_plor_url: str = "http://localhost:8001"
     mock_fico_dm_url: str = "http://localhost:8002"
+    mock_fico_latency_ms: float = 0.0
+    mock_fico_latency_jitter_ms: float = 0.0
+    mock_fico_error_rate: float = 0.0
+    
+    gateway_batch_max_size: int = 5000
+    gateway_batch_concurrency: int = 32
+    gateway_fast_json: bool = True
+    gateway_coalesce_requests: bool = True
+    
+    admission_max_concurrency: int = 0
+    admission_max_queue: int = 100
+    admission_queue_timeout: float = 1.0
+    admission_rate: float = 0.0
+    admission_burst: float = 0.0
+    admission_overrides: Dict[str, Dict[str, float]] = {}
+    admission_caller_header: str = "X-Caller-Id"
+    admission_caller_rate: float = 0.0
+    admission_caller_burst: float = 0.0
+    admission_max_callers: int = 10000
+    admission_caller_idle_ttl: int = 300
+    
+    shadow_max_in_flight: int = 100
+    shadow_recent_diffs: int = 50
+    
+    # Paths tried in order; "[*]" matches any element of a list, as in FR-AG-002 bodies
+    extract_bom_version_id_paths: List[str] = [
+        "bomVersionId", "value.bomVersionId", "data.bomVersionId", "[*].value.bomVersionId"
+    ]
+    extract_product_id_paths: List[str] = [
+        "value.productId", "productId", "value.application.productCode", "application.productCode",
+        "[*].value.application.productCode"
+    ]
+    extract_subproduct_id_paths: List[str] = [
+        "value.subproductId", "subproductId", "value.application.subProductCode", "application.subProductCode",
+        "[*].value.application.subProductCode"
+    ]
+    extract_application_id_paths: List[str] = ["applicationId", "value.applicationId", "[*].value.applicationId"]
+    bom_version_id_cache_size: int = 4096
+    
+    upstream_max_connections: int = 100
+    upstream_max_keepalive_connections: int = 20
+    upstream_keepalive_expiry: float = 30.0
+    upstream_http2: bool = True
+    upstream_connect_timeout: float = 5.0
+    upstream_read_timeout: float = 30.0
+    upstream_write_timeout: float = 30.0
+    upstream_pool_timeout: float = 5.0
+    
+    upstream_max_retries: int = 2
+    upstream_retry_backoff: float = 0.05
+    retry_budget_ratio: float = 0.2
+    retry_budget_min_retries: int = 10
+    retry_budget_window: float = 10.0
+    circuit_failure_threshold: int = 5
+    circuit_open_seconds: float = 30.0
+    circuit_half_open_max_calls: int = 1
+    
+    fico_token_refresh_margin: int = 60
+    fico_token_default_ttl: int = 300
+    fico_token_failure_backoff: float = 2.0
+    routing_table_refresh_interval: int = 30
+    
+    local_cache_max_entries: int = 1024
+    local_cache_ttl: int = 60
+    cache_invalidation_channel: str = "gateway:cache-invalidation"
+    cache_max_ttl: int = 86400
+    cache_stale_ttl: int = 300
+    cache_refresh_lock_ttl: int = 10
+    cache_refresh_lock_wait: float = 0.5
+    cache_storage: str = "json"
+    negative_cache_ttl: int = 30
+    negative_cache_tracked_keys: int = 1000
+    response_cache_max_entries: int = 10000
+    response_cache_max_local_bytes: int = 67108864
+    response_cache_max_body_bytes: int = 1048576
+    warmup_enabled: bool = True
+    warmup_concurrency: int = 4
+    warmup_batch_size: int = 200
+    warmup_timeout: float = 60.0
+    
+    access_log_enabled: bool = True
+    access_log_queue_size: int = 10000
+    access_log_batch_size: int = 500
+    access_log_flush_interval: float = 1.0
+    access_log_sample_watermark: float = 0.8
+    access_log_sample_rate: float = 0.1
+    
+    parameter_import_chunk_size: int = 500
+    admin_page_size: int = 100
     
     class Config:
         env_file = ".env"
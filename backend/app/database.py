@@ -1,16 +1,54 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text, Engine
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from app.models import Base
 from app.config import settings
 import redis
+import redis.asyncio as aioredis
+
+def _async_database_url(database_url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver"""
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if database_url.startswith("postgresql://"):
+        return database_url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return database_url
 
 engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(_async_database_url(settings.database_url))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+async_redis_client = aioredis.from_url(settings.redis_url, decode_responses=True)
+
+# Columns added to tables after their first release, as (table, column, SQL type).
+# create_all only creates missing tables, so these are added to existing ones.
+ADDED_COLUMNS = [
+    ("fico_environment_config", "response_cache_ttl", "INTEGER"),
+]
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    upgrade_schema()
+
+def upgrade_schema(bind: Engine = engine):
+    """Add columns and indexes that tables created by an older release are missing.
+
+    Safe to run on every startup and from several workers at once.
+    """
+    # SQLite has no ADD COLUMN IF NOT EXISTS; it has no concurrent workers to race either
+    if_not_exists = " IF NOT EXISTS" if bind.dialect.name == "postgresql" else ""
+    inspector = inspect(bind)
+    with bind.begin() as connection:
+        for table, column, column_type in ADDED_COLUMNS:
+            if column not in {existing["name"] for existing in inspector.get_columns(table)}:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN{if_not_exists} {column} {column_type}"))
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
 
 def get_db():
     db = SessionLocal()
@@ -21,3 +59,10 @@ def get_db():
 
 def get_redis():
     return redis_client
+
+def get_async_redis():
+    return async_redis_client
+
+async def close_async_clients():
+    await async_redis_client.aclose()
+    await async_engine.dispose()
@@ -1,21 +1,39 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+import json
 import logging
 import jwt
 
-from app.database import get_db, create_tables
-from app.models import FicoEnvironmentConfig, ConfigurableParameters, ChangeLog, User
+from app.database import get_db, create_tables, close_async_clients
+from app.models import FicoEnvironmentConfig, FicoRoutingRule, ConfigurableParameters, ChangeLog, User
 from app.schemas import (
     FicoEnvironmentConfigCreate, FicoEnvironmentConfigUpdate, FicoEnvironmentConfigResponse,
+    FicoRoutingRuleCreate, FicoRoutingRuleBase, FicoRoutingRuleResponse,
     ConfigurableParametersCreate, ConfigurableParametersUpdate, ConfigurableParametersResponse,
-    ChangeLogResponse, GatewayRequest, GatewayResponse, ApprovalRequest
+    ChangeLogResponse, GatewayRequest, GatewayResponse, ApprovalRequest,
+    GatewayAccessLogPage
 )
-from app.services.gateway_service import gateway_service
+from app.services.gateway_service import gateway_service, UpstreamStreamingResponse
 from app.services.cache_service import cache_service
+from app.services.token_service import token_manager
+from app.services.routing_service import routing_table
+from app.services.circuit_breaker import circuit_breakers
+from app.services.metrics import render_metrics
+from app.services.json_codec import gateway_json
+from app.services.access_log import access_log_writer, query_access_logs
+from app.services.pagination import parse_fields, project_page
+from app.services.parameter_transfer import ParameterImportError, import_parameters, export_parameters
+from app.services.warmup import cache_warmer
+from app.services.response_cache import response_cache
+from app.services.admission import admission_controller, AdmissionRejected
+from app.services.shadow import shadow_mirror
 from app.services.oauth_service import oauth_app
 from app.config import settings
 
@@ -25,7 +43,7 @@ logger = logging.getLogger(__name__)
 app = FastAPI(title="API Gateway", description="Enterprise API Gateway and Configuration Management System")
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
     try:
         payload = jwt.decode(credentials.credentials, settings.secret_key, algorithms=[settings.algorithm])
         user = db.query(User).filter(User.user_id == payload["user_id"]).first()
@@ -46,6 +64,18 @@ def require_role(required_role: str):
         return current_user
     return role_checker
 
+def list_page(db: Session, model, response_schema, fields: Optional[str], filters: List[Any],
+              order_columns: List[Any], descending: bool, cursor: Optional[str],
+              limit: Optional[int]) -> JSONResponse:
+    """Keyset-paginated list response; the next page's cursor is sent in X-Next-Cursor"""
+    try:
+        selected = parse_fields(fields, list(response_schema.model_fields))
+        items, next_cursor = project_page(db, model, selected, filters, order_columns, descending, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return JSONResponse(content=items, headers=headers)
+
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +83,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 app.mount("/auth", oauth_app)
@@ -61,31 +92,175 @@ app.mount("/auth", oauth_app)
 async def startup_event():
     create_tables()
     logger.info("Database tables created")
+    
+    routing_table.reload()
+    routing_table.start_periodic_refresh()
+    cache_service.start_invalidation_listener()
+    access_log_writer.start()
+    cache_warmer.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await cache_warmer.stop()
+    await routing_table.stop_periodic_refresh()
+    cache_service.stop_invalidation_listener()
+    await gateway_service.aclose()
+    await access_log_writer.stop()
+    await close_async_clients()
 
 @app.get("/healthz")
 async def healthz():
     return {"status": "ok"}
 
-@app.post("/gateway", response_model=Dict[str, Any])
-async def process_gateway_request(
-    request: GatewayRequest,
-    db: Session = Depends(get_db)
-):
-    """Main gateway endpoint for processing requests"""
+@app.get("/readyz")
+async def readyz():
+    """Ready once startup warm-up has finished, so cold workers get no traffic"""
+    if not cache_warmer.ready:
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready"}
+
+# The gateway endpoints read and write JSON themselves (see GatewayJSONCodec), so
+# their request schemas are declared for the OpenAPI docs only
+@app.post("/gateway", openapi_extra={"requestBody": {
+    "required": True, "content": {"application/json": {"schema": GatewayRequest.model_json_schema()}}
+}})
+async def process_gateway_request(request: Request, stream: bool = False):
+    """Main gateway endpoint for processing requests.
+
+    With stream=true the Fico response is relayed as-is (status, headers and
+    body chunks) instead of being wrapped in the status_code/data envelope.
+    """
+    request_data = gateway_json.parse_request(gateway_json.loads(await request.body()))
+    client_address = request.client.host if request.client else None
     try:
-        response_data, status_code = await gateway_service.process_request(
-            db, request.dict()
-        )
-        return {
+        if stream:
+            upstream, error = await gateway_service.process_request_stream(request_data, request.headers,
+                                                                           client_address)
+            if error:
+                return gateway_json.response(error[0], error[1])
+            return UpstreamStreamingResponse(upstream)
+        
+        response_data, status_code = await gateway_service.process_request(request_data, request.headers,
+                                                                           client_address)
+        return gateway_json.response({
             "status_code": status_code,
             "data": response_data
-        }
+        })
+    except AdmissionRejected as e:
+        # Shed requests get a real HTTP status so clients and load balancers back off
+        return gateway_json.response({"error": str(e)}, e.status_code, {"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.error(f"Gateway processing error: {e}")
         raise HTTPException(status_code=500, detail="Internal gateway error")
 
+@app.post("/gateway/batch", openapi_extra={"requestBody": {
+    "required": True, "content": {"application/json": {"schema": {
+        "type": "object",
+        "required": ["requests"],
+        "properties": {"requests": {"type": "array", "items": GatewayRequest.model_json_schema()}}
+    }}}
+}})
+async def process_gateway_batch(request: Request, stream: bool = False):
+    """Process many gateway requests in one call.
+
+    Results are returned in request order, or streamed as NDJSON in completion
+    order when stream=true.
+    """
+    payload = gateway_json.loads(await request.body())
+    items = payload.get("requests") if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        raise RequestValidationError([
+            {"type": "list_type", "loc": ("body", "requests"), "msg": "Input should be a valid list", "input": items}
+        ])
+    if len(items) > settings.gateway_batch_max_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds {settings.gateway_batch_max_size} requests"
+        )
+    
+    requests = [
+        gateway_json.parse_request(item, ("body", "requests", index)) for index, item in enumerate(items)
+    ]
+    
+    client_address = request.client.host if request.client else None
+    if stream:
+        async def ndjson_results():
+            async for index, response_data, status_code in gateway_service.process_batch(
+                requests, request.headers, client_address
+            ):
+                yield gateway_json.dumps({"index": index, "status_code": status_code, "data": response_data}) + b"\n"
+        return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+    
+    results: List[Dict[str, Any]] = [{} for _ in requests]
+    async for index, response_data, status_code in gateway_service.process_batch(
+        requests, request.headers, client_address
+    ):
+        results[index] = {"index": index, "status_code": status_code, "data": response_data}
+    return gateway_json.response({"results": results})
+
+@app.get("/api/stats/auth-tokens")
+async def get_auth_token_stats():
+    """Fico auth token cache hit/refresh counters per environment"""
+    return token_manager.get_stats()
+
+@app.get("/api/stats/routing")
+async def get_routing_stats():
+    """Routing table generation, loaded Fico routes and routing rules"""
+    return routing_table.get_stats()
+
+@app.get("/api/stats/shadow")
+async def get_shadow_stats():
+    """Mirrored request counts, latencies and recent response diffs per routing rule"""
+    return shadow_mirror.get_stats()
+
+@app.get("/api/stats/upstream")
+async def get_upstream_stats():
+    """Connection pool usage per Fico upstream host"""
+    return gateway_service.upstream_pool.get_stats()
+
+@app.get("/api/stats/circuits")
+async def get_circuit_stats():
+    """Circuit breaker state and retry budget usage per Fico environment"""
+    return circuit_breakers.get_stats()
+
+@app.get("/api/stats/cache")
+async def get_cache_stats():
+    """Parameter cache hit ratios for the local and Redis tiers"""
+    return cache_service.get_stats()
+
+@app.get("/api/stats/admission")
+async def get_admission_stats():
+    """In-flight and queued requests and rejections per Fico environment"""
+    return admission_controller.get_stats()
+
+@app.get("/api/stats/coalescing")
+async def get_coalescing_stats():
+    """Fico calls shared between concurrent identical requests, per environment"""
+    return gateway_service.coalescer.get_stats()
+
+@app.get("/api/stats/response-cache")
+async def get_response_cache_stats():
+    """Fico response cache hit ratios per environment"""
+    return response_cache.get_stats()
+
+@app.get("/api/stats/warmup")
+async def get_warmup_stats():
+    """Startup warm-up progress and how many routes and parameter sets it loaded"""
+    return cache_warmer.get_stats()
+
+@app.get("/api/stats/access-log")
+async def get_access_log_stats():
+    """Access log writer queue depth and written/sampled/dropped counts"""
+    return access_log_writer.get_stats()
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
 @app.post("/api/fico-configs", response_model=FicoEnvironmentConfigResponse)
-async def create_fico_config(
+def create_fico_config(
     config: FicoEnvironmentConfigCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("EDITOR"))
@@ -101,12 +276,27 @@ async def create_fico_config(
     return db_config
 
 @app.get("/api/fico-configs", response_model=List[FicoEnvironmentConfigResponse])
-async def get_fico_configs(db: Session = Depends(get_db)):
-    """Get all Fico environment configurations"""
-    return db.query(FicoEnvironmentConfig).all()
+def get_fico_configs(
+    product_code: Optional[str] = None,
+    status: Optional[str] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get Fico environment configurations, optionally filtered, projected and paginated"""
+    filters = []
+    if product_code:
+        filters.append(FicoEnvironmentConfig.product_code == product_code)
+    if status:
+        filters.append(FicoEnvironmentConfig.status == status)
+    return list_page(
+        db, FicoEnvironmentConfig, FicoEnvironmentConfigResponse, fields, filters,
+        [FicoEnvironmentConfig.product_code, FicoEnvironmentConfig.version], False, cursor, limit
+    )
 
 @app.get("/api/fico-configs/{product_code}/{version}", response_model=FicoEnvironmentConfigResponse)
-async def get_fico_config(
+def get_fico_config(
     product_code: str,
     version: str,
     db: Session = Depends(get_db)
@@ -121,7 +311,7 @@ async def get_fico_config(
     return config
 
 @app.put("/api/fico-configs/{product_code}/{version}", response_model=FicoEnvironmentConfigResponse)
-async def update_fico_config(
+def update_fico_config(
     product_code: str,
     version: str,
     config_update: FicoEnvironmentConfigUpdate,
@@ -145,10 +335,127 @@ async def update_fico_config(
     
     db.commit()
     db.refresh(config)
+    
+    routing_table.load(db)
+    token_manager.invalidate(product_code, version)
+    
     return config
 
+def routing_rule_settings(rule: FicoRoutingRule) -> Dict[str, Any]:
+    """The fields of a routing rule that its change log entries record and approval applies"""
+    return {
+        "targets": json.loads(rule.targets or "[]"),
+        "shadow_product_code": rule.shadow_product_code,
+        "shadow_version": rule.shadow_version,
+        "shadow_sample_rate": rule.shadow_sample_rate,
+        "status": rule.status
+    }
+
+def propose_routing_rule_change(db: Session, rule: FicoRoutingRule, old_settings: Optional[Dict[str, Any]],
+                                new_settings: Dict[str, Any], current_user: User):
+    """Record a routing rule change for approval; the live rule is only changed once it is approved"""
+    db.add(ChangeLog(
+        table_name="fico_routing_rule",
+        record_id=f"{rule.product_code}:{rule.version}",
+        field_name="rule",
+        old_value=json.dumps(old_settings) if old_settings is not None else None,
+        new_value=json.dumps(new_settings),
+        changed_by=current_user.user_id,
+        status="PENDING_APPROVAL"
+    ))
+
+def get_routing_rule_or_404(db: Session, product_code: str, version: str) -> FicoRoutingRule:
+    rule = db.query(FicoRoutingRule).filter(
+        FicoRoutingRule.product_code == product_code,
+        FicoRoutingRule.version == version
+    ).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Routing rule not found")
+    return rule
+
+@app.post("/api/routing-rules", response_model=FicoRoutingRuleResponse)
+def create_routing_rule(
+    rule: FicoRoutingRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("EDITOR"))
+):
+    """Propose splitting or mirroring traffic for a bomVersionId; the rule is PENDING_APPROVAL until approved"""
+    exists = db.query(FicoRoutingRule).filter(
+        FicoRoutingRule.product_code == rule.product_code,
+        FicoRoutingRule.version == rule.version
+    ).first()
+    if exists:
+        raise HTTPException(status_code=409, detail="Routing rule already exists")
+    
+    rule_dict = rule.dict()
+    rule_dict["targets"] = json.dumps(rule_dict["targets"])
+    rule_dict["created_by"] = current_user.user_id
+    rule_dict["status"] = "PENDING_APPROVAL"
+    
+    db_rule = FicoRoutingRule(**rule_dict)
+    db.add(db_rule)
+    new_settings = {**rule.dict(exclude={"product_code", "version"}), "status": "ACTIVE"}
+    propose_routing_rule_change(db, db_rule, None, new_settings, current_user)
+    db.commit()
+    db.refresh(db_rule)
+    return db_rule
+
+@app.get("/api/routing-rules", response_model=List[FicoRoutingRuleResponse])
+def get_routing_rules(
+    product_code: Optional[str] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Get routing rules, optionally filtered"""
+    query = db.query(FicoRoutingRule)
+    if product_code:
+        query = query.filter(FicoRoutingRule.product_code == product_code)
+    if status:
+        query = query.filter(FicoRoutingRule.status == status)
+    return query.order_by(FicoRoutingRule.product_code, FicoRoutingRule.version).all()
+
+@app.get("/api/routing-rules/{product_code}/{version}", response_model=FicoRoutingRuleResponse)
+def get_routing_rule(
+    product_code: str,
+    version: str,
+    db: Session = Depends(get_db)
+):
+    """Get the routing rule for a bomVersionId's product_code and version"""
+    return get_routing_rule_or_404(db, product_code, version)
+
+@app.put("/api/routing-rules/{product_code}/{version}", response_model=FicoRoutingRuleResponse)
+def update_routing_rule(
+    product_code: str,
+    version: str,
+    rule_update: FicoRoutingRuleBase,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("EDITOR"))
+):
+    """Propose replacing a routing rule's targets and shadow settings and reactivating it.
+
+    The rule keeps routing as it is until the change is approved.
+    """
+    rule = get_routing_rule_or_404(db, product_code, version)
+    propose_routing_rule_change(db, rule, routing_rule_settings(rule), {**rule_update.dict(), "status": "ACTIVE"},
+                                current_user)
+    db.commit()
+    return rule
+
+@app.delete("/api/routing-rules/{product_code}/{version}", response_model=FicoRoutingRuleResponse)
+def deactivate_routing_rule(
+    product_code: str,
+    version: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("EDITOR"))
+):
+    """Propose deactivating a routing rule, sending all traffic back to the requested version once approved"""
+    rule = get_routing_rule_or_404(db, product_code, version)
+    propose_routing_rule_change(db, rule, routing_rule_settings(rule), {"status": "INACTIVE"}, current_user)
+    db.commit()
+    return rule
+
 @app.post("/api/parameters", response_model=ConfigurableParametersResponse)
-async def create_parameter(
+def create_parameter(
     parameter: ConfigurableParametersCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role("EDITOR"))
@@ -166,13 +473,70 @@ async def create_parameter(
     
     return db_parameter
 
+@app.post("/api/parameters/import")
+async def import_parameters_bulk(
+    request: Request,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(require_role("EDITOR"))
+):
+    """Create many parameters from a streamed CSV (with header row) or NDJSON body in one transaction"""
+    try:
+        return await import_parameters(request.stream(), format, current_user.user_id)
+    except ParameterImportError as e:
+        raise HTTPException(status_code=e.status_code, detail={"message": str(e), "errors": e.errors})
+
+@app.get("/api/parameters/export")
+def export_parameters_bulk(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    product_id: Optional[str] = None,
+    subproduct_id: Optional[str] = None,
+    status: Optional[str] = None
+):
+    """Stream parameters as CSV or NDJSON in the format accepted by the import endpoint"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        export_parameters(format, product_id, subproduct_id, status),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=parameters.{format}"}
+    )
+
 @app.get("/api/parameters", response_model=List[ConfigurableParametersResponse])
-async def get_parameters(db: Session = Depends(get_db)):
-    """Get all configurable parameters"""
-    return db.query(ConfigurableParameters).all()
+def get_parameters(
+    product_id: Optional[str] = None,
+    subproduct_id: Optional[str] = None,
+    component: Optional[str] = None,
+    status: Optional[str] = None,
+    effective_on: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.admin_page_size, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get configurable parameters, optionally filtered, projected and paginated"""
+    filters = []
+    if product_id:
+        filters.append(ConfigurableParameters.product_id == product_id)
+    if subproduct_id:
+        filters.append(ConfigurableParameters.subproduct_id == subproduct_id)
+    if component:
+        filters.append(ConfigurableParameters.component == component)
+    if status:
+        filters.append(ConfigurableParameters.status == status)
+    if effective_on:
+        filters.append(ConfigurableParameters.effective_from <= effective_on)
+        filters.append(or_(
+            ConfigurableParameters.effective_to.is_(None),
+            ConfigurableParameters.effective_to >= effective_on
+        ))
+    return list_page(
+        db, ConfigurableParameters, ConfigurableParametersResponse, fields, filters,
+        [ConfigurableParameters.product_id, ConfigurableParameters.subproduct_id,
+         ConfigurableParameters.component, ConfigurableParameters.parameter],
+        False, cursor, limit
+    )
 
 @app.get("/api/parameters/{product_id}/{subproduct_id}", response_model=List[ConfigurableParametersResponse])
-async def get_parameters_by_product(
+def get_parameters_by_product(
     product_id: str,
     subproduct_id: str,
     db: Session = Depends(get_db)
@@ -184,7 +548,7 @@ async def get_parameters_by_product(
     ).all()
 
 @app.put("/api/parameters/{product_id}/{subproduct_id}/{component}/{parameter}", response_model=ConfigurableParametersResponse)
-async def update_parameter(
+def update_parameter(
     product_id: str,
     subproduct_id: str,
     component: str,
@@ -219,19 +583,46 @@ async def update_parameter(
     return param
 
 @app.get("/api/change-logs", response_model=List[ChangeLogResponse])
-async def get_change_logs(db: Session = Depends(get_db)):
-    """Get all change logs"""
-    return db.query(ChangeLog).order_by(ChangeLog.change_timestamp.desc()).all()
+def get_change_logs(
+    table_name: Optional[str] = None,
+    record_id: Optional[str] = None,
+    status: Optional[str] = None,
+    changed_by: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.admin_page_size, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Get change logs newest first, optionally filtered, projected and paginated"""
+    filters = []
+    if table_name:
+        filters.append(ChangeLog.table_name == table_name)
+    if record_id:
+        filters.append(ChangeLog.record_id == record_id)
+    if status:
+        filters.append(ChangeLog.status == status)
+    if changed_by:
+        filters.append(ChangeLog.changed_by == changed_by)
+    if start_time:
+        filters.append(ChangeLog.change_timestamp >= start_time)
+    if end_time:
+        filters.append(ChangeLog.change_timestamp < end_time)
+    return list_page(
+        db, ChangeLog, ChangeLogResponse, fields, filters,
+        [ChangeLog.change_timestamp, ChangeLog.log_id], True, cursor, limit
+    )
 
 @app.get("/api/change-logs/pending", response_model=List[ChangeLogResponse])
-async def get_pending_changes(db: Session = Depends(get_db)):
+def get_pending_changes(db: Session = Depends(get_db)):
     """Get pending approval changes"""
     return db.query(ChangeLog).filter(
         ChangeLog.status == "PENDING_APPROVAL"
     ).order_by(ChangeLog.change_timestamp.desc()).all()
 
 @app.post("/api/change-logs/{log_id}/approve")
-async def approve_change(
+def approve_change(
     log_id: int,
     approval: ApprovalRequest,
     db: Session = Depends(get_db),
@@ -252,8 +643,6 @@ async def approve_change(
         change_log.approved_by = current_user.user_id
         change_log.approved_on = datetime.utcnow()
         
-        await apply_approved_change(db, change_log)
-        
     elif approval.action == "REJECT":
         change_log.status = "REJECTED"
         change_log.reviewed_by = current_user.user_id
@@ -262,17 +651,54 @@ async def approve_change(
     change_log.comments = approval.comments
     db.commit()
     
+    if approval.action == "APPROVE":
+        # After the commit, so a cache refresh started by the invalidation cannot read the old rows
+        apply_approved_change(db, change_log)
+    
     return {"message": f"Change {approval.action.lower()}ed successfully"}
 
-async def apply_approved_change(db: Session, change_log: ChangeLog):
+def apply_approved_change(db: Session, change_log: ChangeLog):
     if change_log.table_name == "configurable_parameters":
         parts = change_log.record_id.split(":")
         if len(parts) >= 4:
-            product_id, subproduct_id = parts[0], parts[1]
-            cache_service.invalidate_cache(product_id, subproduct_id)
+            product_id, subproduct_id, component = parts[0], parts[1], parts[2]
+            parameter = ":".join(parts[3:])
+            param = db.get(ConfigurableParameters, (product_id, subproduct_id, component, parameter))
+            cache_service.patch_cached_parameter(product_id, subproduct_id, component, parameter, param)
+    elif change_log.table_name == "fico_environment_config":
+        routing_table.load(db)
+        parts = change_log.record_id.split(":")
+        if len(parts) >= 2:
+            token_manager.invalidate(":".join(parts[:-1]), parts[-1])
+    elif change_log.table_name == "fico_routing_rule":
+        product_code, _, version = change_log.record_id.rpartition(":")
+        rule = db.get(FicoRoutingRule, (product_code, version))
+        if rule is not None:
+            for field, value in json.loads(change_log.new_value).items():
+                setattr(rule, field, json.dumps(value) if field == "targets" else value)
+            rule.modified_by = change_log.changed_by
+            rule.modified_on = datetime.utcnow()
+            db.commit()
+            routing_table.load(db)
+
+@app.get("/api/access-logs", response_model=GatewayAccessLogPage)
+def get_access_logs(
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    bom_version_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """Gateway access log, newest first; pass next_cursor back as cursor for the next page"""
+    try:
+        items, next_cursor = query_access_logs(db, start_time, end_time, bom_version_id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
 
 @app.post("/api/cache/refresh/{product_id}/{subproduct_id}")
-async def refresh_cache(
+def refresh_cache(
     product_id: str,
     subproduct_id: str,
     db: Session = Depends(get_db)
@@ -285,7 +711,7 @@ async def refresh_cache(
     }
 
 @app.delete("/api/cache/{product_id}/{subproduct_id}")
-async def invalidate_cache(product_id: str, subproduct_id: str):
+def invalidate_cache(product_id: str, subproduct_id: str):
     """Invalidate cache for specific product/subproduct"""
     cache_service.invalidate_cache(product_id, subproduct_id)
     return {"message": "Cache invalidated successfully"}
@@ -1,13 +1,24 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
 from typing import Dict, Any
+from app.config import settings
 import uvicorn
 import asyncio
+import random
+
+async def inject_faults():
+    """Simulate upstream latency and failures configured through MOCK_FICO_* settings"""
+    latency_ms = settings.mock_fico_latency_ms + random.uniform(0, settings.mock_fico_latency_jitter_ms)
+    if latency_ms > 0:
+        await asyncio.sleep(latency_ms / 1000)
+    if random.random() < settings.mock_fico_error_rate:
+        raise HTTPException(status_code=503, detail="Injected upstream failure")
 
 mock_plor_app = FastAPI(title="Mock Fico PLOR")
 
 @mock_plor_app.post("/api/plor/process")
 async def mock_plor_process(request: Dict[str, Any]):
     """Mock Fico PLOR processing endpoint"""
+    await inject_faults()
     return {
         "status": "success",
         "message": "Mock PLOR processing completed",
@@ -33,6 +44,7 @@ mock_dm_app = FastAPI(title="Mock Fico DM")
 @mock_dm_app.post("/api/dm/decision")
 async def mock_dm_decision(request: Dict[str, Any]):
     """Mock Fico DM decision endpoint"""
+    await inject_faults()
     return {
         "status": "success",
         "message": "Mock DM decision completed",
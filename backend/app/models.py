@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -25,6 +25,7 @@ class FicoEnvironmentConfig(Base):
     authentication_url = Column(String(500), nullable=False)
     client_id = Column(String(100), nullable=False)
     secret = Column(Text, nullable=False)
+    response_cache_ttl = Column(Integer)
     created_by = Column(String(100), nullable=False)
     created_on = Column(DateTime, default=datetime.utcnow)
     modified_by = Column(String(100))
@@ -33,6 +34,9 @@ class FicoEnvironmentConfig(Base):
 
 class ConfigurableParameters(Base):
     __tablename__ = "configurable_parameters"
+    __table_args__ = (
+        Index("idx_params_product_status", "product_id", "subproduct_id", "status"),
+    )
     
     product_id = Column(String(50), primary_key=True)
     subproduct_id = Column(String(50), primary_key=True)
@@ -49,6 +53,9 @@ class ConfigurableParameters(Base):
 
 class ChangeLog(Base):
     __tablename__ = "change_log"
+    __table_args__ = (
+        Index("idx_changelog_status_timestamp", "status", "change_timestamp"),
+    )
     
     log_id = Column(Integer, primary_key=True, autoincrement=True)
     table_name = Column(String(100), nullable=False)
@@ -64,3 +71,37 @@ class ChangeLog(Base):
     approved_by = Column(String(100))
     approved_on = Column(DateTime)
     comments = Column(Text)
+
+class FicoRoutingRule(Base):
+    __tablename__ = "fico_routing_rule"
+    
+    product_code = Column(String(50), primary_key=True)
+    version = Column(String(20), primary_key=True)
+    targets = Column(Text, nullable=False)
+    shadow_product_code = Column(String(50))
+    shadow_version = Column(String(20))
+    shadow_sample_rate = Column(Float, default=0.0)
+    created_by = Column(String(100), nullable=False)
+    created_on = Column(DateTime, default=datetime.utcnow)
+    modified_by = Column(String(100))
+    modified_on = Column(DateTime)
+    status = Column(String(20), default="ACTIVE")
+
+class GatewayAccessLog(Base):
+    __tablename__ = "gateway_access_log"
+    __table_args__ = (
+        Index("idx_access_log_bom_version", "bom_version_id", "request_timestamp"),
+    )
+    
+    log_id = Column(Integer, primary_key=True, autoincrement=True)
+    request_timestamp = Column(DateTime, nullable=False, index=True)
+    bom_version_id = Column(String(200))
+    product_code = Column(String(50))
+    version = Column(String(20))
+    product_id = Column(String(50))
+    subproduct_id = Column(String(50))
+    routing_path = Column(String(500))
+    status_code = Column(Integer, nullable=False)
+    upstream_status_code = Column(Integer)
+    duration_ms = Column(Float, nullable=False)
+    error = Column(Text)
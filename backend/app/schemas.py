@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+import json
+from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union
 
 class FicoEnvironmentConfigBase(BaseModel):
     product_code: str
@@ -9,6 +10,7 @@ class FicoEnvironmentConfigBase(BaseModel):
     authentication_url: str
     client_id: str
     secret: str
+    response_cache_ttl: Optional[int] = None
 
 class FicoEnvironmentConfigCreate(FicoEnvironmentConfigBase):
     created_by: str
@@ -18,6 +20,7 @@ class FicoEnvironmentConfigUpdate(BaseModel):
     authentication_url: Optional[str] = None
     client_id: Optional[str] = None
     secret: Optional[str] = None
+    response_cache_ttl: Optional[int] = None
     modified_by: str
 
 class FicoEnvironmentConfigResponse(FicoEnvironmentConfigBase):
@@ -77,9 +80,70 @@ class ChangeLogResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class RoutingRuleTarget(BaseModel):
+    product_code: str
+    version: str
+    weight: int = Field(gt=0)
+
+class FicoRoutingRuleBase(BaseModel):
+    targets: List[RoutingRuleTarget] = []
+    shadow_product_code: Optional[str] = None
+    shadow_version: Optional[str] = None
+    shadow_sample_rate: float = Field(0.0, ge=0.0, le=1.0)
+
+    @model_validator(mode="after")
+    def check_targets(self):
+        if (self.shadow_product_code is None) != (self.shadow_version is None):
+            raise ValueError("shadow_product_code and shadow_version must be set together")
+        if not self.targets and self.shadow_product_code is None:
+            raise ValueError("A routing rule needs targets, a shadow environment or both")
+        return self
+
+class FicoRoutingRuleCreate(FicoRoutingRuleBase):
+    product_code: str
+    version: str
+
+class FicoRoutingRuleResponse(FicoRoutingRuleCreate):
+    created_by: str
+    created_on: datetime
+    modified_by: Optional[str] = None
+    modified_on: Optional[datetime] = None
+    status: str
+
+    @field_validator("targets", mode="before")
+    @classmethod
+    def parse_targets(cls, value):
+        # Stored as JSON text on the model
+        return json.loads(value) if isinstance(value, str) else value
+
+    class Config:
+        from_attributes = True
+
+class GatewayAccessLogResponse(BaseModel):
+    log_id: int
+    request_timestamp: datetime
+    bom_version_id: Optional[str] = None
+    product_code: Optional[str] = None
+    version: Optional[str] = None
+    product_id: Optional[str] = None
+    subproduct_id: Optional[str] = None
+    routing_path: Optional[str] = None
+    status_code: int
+    upstream_status_code: Optional[int] = None
+    duration_ms: float
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class GatewayAccessLogPage(BaseModel):
+    items: List[GatewayAccessLogResponse]
+    next_cursor: Optional[str] = None
+
 class GatewayRequest(BaseModel):
     headers: Dict[str, str] = {}
-    body: Dict[str, Any]
+    # FR-AG-002 bodies are a list of {"name", "value"} entries
+    body: Union[Dict[str, Any], List[Any]]
     method: str = "POST"
 
 class GatewayResponse(BaseModel):
@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
+from typing import List, Tuple
 from app.database import SessionLocal, create_tables
 from app.models import FicoEnvironmentConfig, ConfigurableParameters, ChangeLog, User
 
@@ -192,5 +193,95 @@ def create_seed_data():
     finally:
         db.close()
 
+BENCHMARK_PREFIX = "BENCH_"
+
+def create_benchmark_data(product_count: int, parameters_per_product: int,
+                          plor_url: str, dm_url: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """Create BENCH_* Fico configs and parameters for load testing.
+
+    Returns the bomVersionIds and (product_id, subproduct_id) pairs that were seeded.
+    """
+    create_tables()
+    db = SessionLocal()
+    
+    try:
+        _delete_benchmark_rows(db)
+        
+        fico_configs = [
+            FicoEnvironmentConfig(
+                product_code=f"{BENCHMARK_PREFIX}PLOR",
+                version="1.0",
+                url=f"{plor_url}/api/plor/process",
+                authentication_url=f"{plor_url}/oauth/token",
+                client_id="bench_plor_client",
+                secret="bench_plor_secret",
+                created_by="benchmark",
+                status="ACTIVE"
+            ),
+            FicoEnvironmentConfig(
+                product_code=f"{BENCHMARK_PREFIX}DM",
+                version="1.0",
+                url=f"{dm_url}/api/dm/decision",
+                authentication_url=f"{dm_url}/oauth/token",
+                client_id="bench_dm_client",
+                secret="bench_dm_secret",
+                created_by="benchmark",
+                status="ACTIVE"
+            )
+        ]
+        db.add_all(fico_configs)
+        
+        effective_from = datetime.utcnow() - timedelta(days=1)
+        products = []
+        for product_index in range(product_count):
+            product_id = f"{BENCHMARK_PREFIX}{product_index:04d}"
+            products.append((product_id, "STANDARD"))
+            db.add_all([
+                ConfigurableParameters(
+                    product_id=product_id,
+                    subproduct_id="STANDARD",
+                    component=f"COMPONENT_{parameter_index % 5}",
+                    parameter=f"parameter_{parameter_index}",
+                    value=str(parameter_index * 10),
+                    effective_from=effective_from,
+                    created_by="benchmark",
+                    status="ACTIVE"
+                )
+                for parameter_index in range(parameters_per_product)
+            ])
+        
+        db.commit()
+        print(f"Benchmark data created: {product_count} products x {parameters_per_product} parameters")
+        
+        bom_version_ids = [f"{config.product_code}_v{config.version}" for config in fico_configs]
+        return bom_version_ids, products
+    
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def delete_benchmark_data():
+    """Remove the BENCH_* Fico configs and parameters created by create_benchmark_data"""
+    db = SessionLocal()
+    
+    try:
+        _delete_benchmark_rows(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _delete_benchmark_rows(db: Session):
+    db.query(ConfigurableParameters).filter(
+        ConfigurableParameters.product_id.like(f"{BENCHMARK_PREFIX}%")
+    ).delete(synchronize_session=False)
+    db.query(FicoEnvironmentConfig).filter(
+        FicoEnvironmentConfig.product_code.like(f"{BENCHMARK_PREFIX}%")
+    ).delete(synchronize_session=False)
+
 if __name__ == "__main__":
     create_seed_data()
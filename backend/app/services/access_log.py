@@ -0,0 +1,136 @@
+import asyncio
+import random
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models import GatewayAccessLog
+from app.database import AsyncSessionLocal
+from app.services.pagination import keyset_page
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AccessLogWriter:
+    """Queues gateway access log events and writes them in batches off the request path.
+
+    record() never blocks: once the queue passes the sample watermark only a
+    sample of successful requests is kept, and events are dropped when it is full.
+    """
+
+    def __init__(self):
+        self.enabled = settings.access_log_enabled
+        self.queue_size = settings.access_log_queue_size
+        self.batch_size = settings.access_log_batch_size
+        self.flush_interval = settings.access_log_flush_interval
+        self.sample_watermark = int(settings.access_log_queue_size * settings.access_log_sample_watermark)
+        self.sample_rate = settings.access_log_sample_rate
+        self.stats = {"enqueued": 0, "written": 0, "sampled_out": 0, "dropped": 0, "flushes": 0, "write_failures": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._write_task: Optional[asyncio.Task] = None
+        self._collected: List[Dict[str, Any]] = []
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Started gateway access log writer")
+
+    async def stop(self):
+        """Stop the writer and flush whatever is still queued"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        if self._write_task is not None:
+            await asyncio.gather(self._write_task, return_exceptions=True)
+
+        queue, self._queue = self._queue, None
+        remaining, self._collected = self._collected, []
+        while not queue.empty():
+            remaining.append(queue.get_nowait())
+        for offset in range(0, len(remaining), self.batch_size):
+            await self._write(remaining[offset:offset + self.batch_size])
+
+    def record(self, event: Dict[str, Any]):
+        queue = self._queue
+        if queue is None:
+            return
+
+        if (queue.qsize() >= self.sample_watermark and event["status_code"] < 400
+                and random.random() >= self.sample_rate):
+            self.stats["sampled_out"] += 1
+            return
+
+        try:
+            queue.put_nowait(event)
+            self.stats["enqueued"] += 1
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            # Kept on the writer so stop() also flushes a batch that is still being collected
+            batch = self._collected = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            # Flush when the batch is full or flush_interval after its first event
+            while len(batch) < self.batch_size:
+                while not queue.empty() and len(batch) < self.batch_size:
+                    batch.append(queue.get_nowait())
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._collected = []
+
+            # Shielded so stop() can cancel the loop without losing a batch mid-insert
+            self._write_task = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._write_task)
+            self._write_task = None
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(GatewayAccessLog), batch)
+                await session.commit()
+            self.stats["written"] += len(batch)
+            self.stats["flushes"] += 1
+        except Exception as e:
+            self.stats["write_failures"] += 1
+            self.stats["dropped"] += len(batch)
+            logger.error(f"Failed to write {len(batch)} access log entries: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self._task is not None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            **self.stats
+        }
+
+def query_access_logs(db: Session, start_time: Optional[datetime], end_time: Optional[datetime],
+                      bom_version_id: Optional[str], cursor: Optional[str],
+                      limit: int) -> Tuple[List[GatewayAccessLog], Optional[str]]:
+    """Newest-first page of access log entries and the cursor for the next page"""
+    query = db.query(GatewayAccessLog)
+    if bom_version_id:
+        query = query.filter(GatewayAccessLog.bom_version_id == bom_version_id)
+    if start_time:
+        query = query.filter(GatewayAccessLog.request_timestamp >= start_time)
+    if end_time:
+        query = query.filter(GatewayAccessLog.request_timestamp < end_time)
+    return keyset_page(
+        query, [GatewayAccessLog.request_timestamp, GatewayAccessLog.log_id], True, cursor, limit
+    )
+
+access_log_writer = AccessLogWriter()
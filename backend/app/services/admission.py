@@ -0,0 +1,213 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, Any, Mapping, Optional, Tuple
+from app.services.local_cache import LocalCache
+from app.services.routing_service import FicoRoute
+from app.services import metrics
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """The request was shed before reaching Fico; retry_after is in whole seconds"""
+
+    def __init__(self, message: str, status_code: int, retry_after: int, reason: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+class TokenBucket:
+    """Refills rate tokens per second up to burst"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(burst or rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """0 when a token was taken, otherwise the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class ConcurrencyLimiter:
+    """At most max_concurrency holders, with a bounded FIFO queue of waiters.
+
+    A released slot passes straight to the oldest waiter. Waiters give up
+    after queue_timeout, and arrivals are rejected outright once max_queue
+    are waiting. max_concurrency 0 means unlimited.
+    """
+
+    def __init__(self, product_code: str, version: str, max_concurrency: int, max_queue: int,
+                 queue_timeout: float):
+        self.name = f"{product_code}:{version}"
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque = deque()
+        self._queue_gauge = metrics.ADMISSION_QUEUE_DEPTH.labels(product_code, version)
+        self._active_gauge = metrics.ADMISSION_IN_FLIGHT.labels(product_code, version)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        if self.max_concurrency <= 0 or (self.active < self.max_concurrency and not self._waiters):
+            self.active += 1
+            self._active_gauge.set(self.active)
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise AdmissionRejected(f"Too many requests queued for {self.name}", 503, self._retry_after(),
+                                    "queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        self._queue_gauge.set(len(self._waiters))
+        try:
+            # Shielded so a timeout cannot race with release() handing us the slot
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+                try:
+                    self._waiters.remove(future)
+                except ValueError:
+                    pass
+            self._queue_gauge.set(len(self._waiters))
+            if isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected(f"Timed out queueing for {self.name}", 503, self._retry_after(),
+                                        "queue_timeout")
+            raise
+
+    def release(self):
+        while self._waiters:
+            future = self._waiters.popleft()
+            self._queue_gauge.set(len(self._waiters))
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+        self._active_gauge.set(self.active)
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.queue_timeout))
+
+class AdmissionController:
+    """Rate and concurrency limits per Fico (product_code, version), and rate limits per caller.
+
+    Defaults come from the admission_* settings; admission_overrides can set
+    max_concurrency, max_queue, rate and burst for individual
+    "product_code:version" environments.
+
+    Callers are identified by the admission_caller_header value on the HTTP
+    request as sent, so it must be set by a proxy that overwrites whatever
+    the client sent; requests without it are limited per client address. Once
+    admission_max_callers recently active callers are tracked, callers not
+    yet seen share one bucket rather than evicting, and so resetting, the
+    bucket of a tracked caller.
+    """
+
+    def __init__(self):
+        self.caller_header = settings.admission_caller_header.lower()
+        self.caller_rate = settings.admission_caller_rate
+        self.caller_burst = settings.admission_caller_burst
+        self.overrides = settings.admission_overrides
+        self._limiters: Dict[Tuple[str, str], ConcurrencyLimiter] = {}
+        self._buckets: Dict[Tuple[str, str], Optional[TokenBucket]] = {}
+        # Bounded, so callers cannot grow it without limit; idle buckets are full anyway
+        self._caller_buckets = LocalCache(settings.admission_max_callers, settings.admission_caller_idle_ttl)
+        self._untracked_bucket = TokenBucket(self.caller_rate, self.caller_burst) if self.caller_rate > 0 else None
+        self._rejections: Dict[str, Dict[str, int]] = {}
+
+    def caller_id(self, client_headers: Optional[Mapping[str, str]],
+                  client_address: Optional[str] = None) -> Optional[str]:
+        """The caller identity header of the HTTP request, else the client address.
+
+        Headers a request asks the gateway to forward to Fico are part of its
+        JSON body, which no proxy can rewrite, so they are never used.
+        """
+        for header, value in (client_headers or {}).items():
+            if header.lower() == self.caller_header and value:
+                return value
+        # Prefixed so a header value cannot share an address's bucket
+        return f"address:{client_address}" if client_address else None
+
+    async def acquire(self, fico_config: FicoRoute, caller: Optional[str] = None) -> ConcurrencyLimiter:
+        """Admit a request, returning the limiter to release() when it is done; raises AdmissionRejected"""
+        key = (fico_config.product_code, fico_config.version)
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._create(key)
+
+        try:
+            if caller and self.caller_rate > 0:
+                bucket = self._caller_buckets.get(caller)
+                if bucket is None and self._caller_buckets.full():
+                    bucket, caller = self._untracked_bucket, "untracked callers"
+                else:
+                    if bucket is None:
+                        bucket = TokenBucket(self.caller_rate, self.caller_burst)
+                    # Re-set on every use, so only idle callers expire
+                    self._caller_buckets.set(caller, bucket)
+                self._take(bucket, f"caller {caller}", "caller_rate_limited")
+
+            bucket = self._buckets[key]
+            if bucket is not None:
+                self._take(bucket, limiter.name, "rate_limited")
+
+            await limiter.acquire()
+        except AdmissionRejected as e:
+            self._reject(key, e.reason)
+            raise
+        return limiter
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            limiter.name: {
+                "in_flight": limiter.active,
+                "queued": limiter.queued,
+                "max_concurrency": limiter.max_concurrency,
+                "max_queue": limiter.max_queue,
+                "rate": self._buckets[key].rate if self._buckets[key] else None,
+                "rejections": dict(self._rejections.get(limiter.name, {}))
+            }
+            for key, limiter in self._limiters.items()
+        }
+
+    def _take(self, bucket: TokenBucket, name: str, reason: str):
+        wait = bucket.try_acquire()
+        if wait:
+            raise AdmissionRejected(f"Rate limit exceeded for {name}", 429, max(1, math.ceil(wait)), reason)
+
+    def _create(self, key: Tuple[str, str]) -> ConcurrencyLimiter:
+        limits = self.overrides.get(f"{key[0]}:{key[1]}", {})
+        limiter = ConcurrencyLimiter(
+            *key,
+            int(limits.get("max_concurrency", settings.admission_max_concurrency)),
+            int(limits.get("max_queue", settings.admission_max_queue)),
+            settings.admission_queue_timeout
+        )
+        rate = limits.get("rate", settings.admission_rate)
+        self._buckets[key] = TokenBucket(rate, limits.get("burst", settings.admission_burst)) if rate > 0 else None
+        self._limiters[key] = limiter
+        return limiter
+
+    def _reject(self, key: Tuple[str, str], reason: str):
+        counters = self._rejections.setdefault(f"{key[0]}:{key[1]}", {})
+        counters[reason] = counters.get(reason, 0) + 1
+        metrics.ADMISSION_REJECTIONS.labels(key[0], key[1], reason).inc()
+
+admission_controller = AdmissionController()
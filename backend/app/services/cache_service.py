@@ -1,78 +1,653 @@
+import asyncio
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import time
+import math
+from typing import Dict, Any, Collection, List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import ConfigurableParameters
-from app.database import get_redis
+from app.database import get_redis, get_async_redis, AsyncSessionLocal
+from app.services.local_cache import LocalCache, BoundedCounter
+from app.services import metrics
+from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stored in Redis for product/subproduct combinations known to have no parameters
+NEGATIVE_MARKER = "__no_parameters__"
+# Hash layout: index member holding the epoch milliseconds after which a set is served stale
+STALE_AT_PREFIX = "__stale_at__:"
+# Returned for negative hits; shared and read-only like every cached payload
+NO_PARAMETERS: Dict[str, Any] = {}
+
 class CacheService:
     def __init__(self):
         self.redis_client = get_redis()
-        self.cache_ttl = 3600  # 1 hour
+        self.async_redis_client = get_async_redis()
+        # Upper bound only; entries expire earlier at the next effective-date boundary
+        self.cache_ttl = settings.cache_max_ttl
+        # Entries outlive cache_ttl by stale_ttl so they can be served while one worker refreshes
+        self.stale_ttl = settings.cache_stale_ttl
+        self.refresh_lock_ttl = settings.cache_refresh_lock_ttl
+        self.refresh_lock_wait = settings.cache_refresh_lock_wait
+        # Local tier TTL is only a backstop; pub/sub invalidation is the primary path
+        self.local_cache = LocalCache(settings.local_cache_max_entries, settings.local_cache_ttl)
+        self.invalidation_channel = settings.cache_invalidation_channel
+        # "json": one JSON string per product/subproduct; "hash": one Redis hash per component
+        self.storage = settings.cache_storage
+        # Short, so a product whose parameters are added elsewhere is not empty for long
+        self.negative_ttl = settings.negative_cache_ttl
+        self.negative_hits = BoundedCounter(settings.negative_cache_tracked_keys)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.refresh_stats = {
+            "refreshes": 0, "coalesced": 0, "lock_contended": 0, "stale_served": 0, "superseded": 0
+        }
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        # Bumped by every invalidation of a key; a refresh that sees it change discards its result
+        self._generations: Dict[str, int] = {}
+        self._pubsub = None
+        self._listener = None
+
+    def set_cached_parameters(self, product_id: str, subproduct_id: str, parameters: Dict[str, Any],
+                              ttl: Optional[int] = None):
+        """Cache parameters for a product/subproduct combination.
 
-    def get_cached_parameters(self, product_id: str, subproduct_id: str) -> Dict[str, Any]:
-        """Get cached parameters for a product/subproduct combination"""
+        ttl is the number of seconds until the next effective-date boundary, if
+        one falls within cache_ttl; such entries expire exactly at the boundary.
+        An empty parameter set is cached as a negative entry for at most
+        negative_ttl.
+        """
         cache_key = f"params:{product_id}:{subproduct_id}"
         
         try:
-            cached_data = self.redis_client.get(cache_key)
-            if cached_data:
-                logger.info(f"Cache hit for {cache_key}")
-                return json.loads(cached_data)
+            previous = (self.redis_client.smembers(self._index_key(product_id, subproduct_id))
+                        if self.storage == "hash" else ())
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                self._queue_write(pipe, product_id, subproduct_id, parameters, ttl, previous)
+                pipe.execute()
+            logger.info(f"Cached parameters for {cache_key}")
+        except Exception as e:
+            logger.error(f"Failed to cache parameters: {e}")
+
+    async def get_cached_parameters_async(self, product_id: str, subproduct_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached parameters for a product/subproduct combination.
+
+        The returned {component: {parameter: value}} dict is the ready-to-merge
+        payload shared by every request through the local tier, and must not be
+        mutated; GatewayService overlays it onto requests copy-on-write.
+        Combinations known to have no parameters return NO_PARAMETERS, and a
+        miss returns None. Entries past cache_ttl are still returned, and a
+        single background refresh is started for them.
+        """
+        cached = await self.get_many_cached_parameters_async([(product_id, subproduct_id)])
+        return cached[(product_id, subproduct_id)]
+
+    async def get_many_cached_parameters_async(
+        self, keys: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[Dict[str, Any]]]:
+        """get_cached_parameters_async for several product/subproduct keys.
+
+        Local tier misses are read from Redis together, in one pipelined round
+        trip (two with the hash layout) however many keys there are.
+        """
+        results: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        missing = []
+        for key in keys:
+            results[key] = self._get_local(f"params:{key[0]}:{key[1]}")
+            if results[key] is None:
+                missing.append(key)
+        if not missing:
+            return results
+        
+        try:
+            fetched = await self._fetch_many_async(missing)
         except Exception as e:
             logger.error(f"Redis error: {e}")
+            fetched = [(None, -2, False)] * len(missing)
         
-        logger.info(f"Cache miss for {cache_key}")
-        return {}
+        for (product_id, subproduct_id), (cached_params, ttl_ms, stale) in zip(missing, fetched):
+            cache_key = f"params:{product_id}:{subproduct_id}"
+            if cached_params is None:
+                self._redis_miss(cache_key)
+                continue
+            results[(product_id, subproduct_id)] = self._redis_hit(cache_key, cached_params, ttl_ms)
+            if stale:
+                self.refresh_stats["stale_served"] += 1
+                self._start_refresh(product_id, subproduct_id)
+        return results
 
-    def set_cached_parameters(self, product_id: str, subproduct_id: str, parameters: Dict[str, Any]):
-        """Cache parameters for a product/subproduct combination"""
+    async def get_or_refresh_parameters(self, product_id: str, subproduct_id: str) -> Dict[str, Any]:
+        """Cached parameters, loading them through one shared refresh on a miss"""
+        cached_params = await self.get_cached_parameters_async(product_id, subproduct_id)
+        if cached_params is not None:
+            return cached_params
+        
+        # Shield so a cancelled caller does not cancel the refresh other callers wait on
+        return await asyncio.shield(self._start_refresh(product_id, subproduct_id))
+
+    async def get_many_or_refresh_parameters(
+        self, keys: List[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Any]:
+        """get_or_refresh_parameters for several keys; a failed refresh maps its key to the exception"""
+        results: Dict[Tuple[str, str], Any] = await self.get_many_cached_parameters_async(keys)
+        missing = [key for key, cached_params in results.items() if cached_params is None]
+        refreshed = await asyncio.gather(
+            *(asyncio.shield(self._start_refresh(product_id, subproduct_id)) for product_id, subproduct_id in missing),
+            return_exceptions=True
+        )
+        results.update(zip(missing, refreshed))
+        return results
+
+    async def set_cached_parameters_async(self, product_id: str, subproduct_id: str, parameters: Dict[str, Any],
+                                          ttl: Optional[int] = None):
+        """Non-blocking variant of set_cached_parameters"""
         cache_key = f"params:{product_id}:{subproduct_id}"
         
         try:
-            self.redis_client.setex(
-                cache_key, 
-                self.cache_ttl, 
-                json.dumps(parameters)
-            )
+            previous, = await self._read_indexes_async([(product_id, subproduct_id)])
+            async with self.async_redis_client.pipeline(transaction=False) as pipe:
+                self._queue_write(pipe, product_id, subproduct_id, parameters, ttl, previous)
+                await pipe.execute()
             logger.info(f"Cached parameters for {cache_key}")
         except Exception as e:
             logger.error(f"Failed to cache parameters: {e}")
 
+    async def set_many_cached_parameters_async(self, entries: List[Tuple[str, str, Dict[str, Any], Optional[int]]]):
+        """Cache several (product_id, subproduct_id, parameters, ttl) entries together.
+
+        The writes go in one pipelined round trip, after one reading the
+        current indexes with the hash layout.
+        """
+        previous = await self._read_indexes_async([(entry[0], entry[1]) for entry in entries])
+        async with self.async_redis_client.pipeline(transaction=False) as pipe:
+            for (product_id, subproduct_id, parameters, ttl), components in zip(entries, previous):
+                self._queue_write(pipe, product_id, subproduct_id, parameters, ttl, components)
+            await pipe.execute()
+        logger.info(f"Cached {len(entries)} parameter sets")
+
+    async def load_all_parameters_async(self, db: AsyncSession) -> List[Tuple[str, str, Dict[str, Any], Optional[int]]]:
+        """Resolved cache entries for every product/subproduct with ACTIVE parameters, from one query"""
+        current_time = datetime.utcnow()
+        result = await db.execute(self._active_parameters_query(current_time))
+        grouped: Dict[Tuple[str, str], List[ConfigurableParameters]] = {}
+        for param in result.scalars():
+            grouped.setdefault((param.product_id, param.subproduct_id), []).append(param)
+        
+        entries = []
+        for (product_id, subproduct_id), parameters in grouped.items():
+            param_dict, ttl = self._resolve_parameters(parameters, current_time)
+            entries.append((product_id, subproduct_id, param_dict, ttl))
+        return entries
+
     def refresh_parameters_cache(self, db: Session, product_id: str, subproduct_id: str):
         """Refresh cache from database for specific product/subproduct"""
         current_time = datetime.utcnow()
+        parameters = db.execute(
+            self._parameters_query(product_id, subproduct_id, current_time)
+        ).scalars().all()
+        
+        param_dict, ttl = self._resolve_parameters(parameters, current_time)
+        self.set_cached_parameters(product_id, subproduct_id, param_dict, ttl)
+        
+        return param_dict
+
+    async def refresh_parameters_cache_async(self, db: AsyncSession, product_id: str, subproduct_id: str):
+        """Non-blocking variant of refresh_parameters_cache.
+
+        The result is not cached if the set is invalidated while it is read,
+        since the rows read may predate the change that invalidated it.
+        """
+        cache_key = f"params:{product_id}:{subproduct_id}"
+        generation = self._generations.get(cache_key, 0)
+        current_time = datetime.utcnow()
+        result = await db.execute(self._parameters_query(product_id, subproduct_id, current_time))
+        
+        param_dict, ttl = self._resolve_parameters(result.scalars().all(), current_time)
+        if self._generations.get(cache_key, 0) != generation:
+            self.refresh_stats["superseded"] += 1
+            logger.info(f"Not caching {cache_key}: invalidated while it was refreshed")
+            return param_dict
+        await self.set_cached_parameters_async(product_id, subproduct_id, param_dict, ttl)
         
-        parameters = db.query(ConfigurableParameters).filter(
+        return param_dict
+
+    def _start_refresh(self, product_id: str, subproduct_id: str) -> asyncio.Task:
+        cache_key = f"params:{product_id}:{subproduct_id}"
+        task = self._refreshing.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(self._refresh_single_flight(product_id, subproduct_id))
+            task.add_done_callback(lambda done: self._finish_refresh(cache_key, done))
+            self._refreshing[cache_key] = task
+        else:
+            self.refresh_stats["coalesced"] += 1
+        return task
+
+    def _finish_refresh(self, cache_key: str, task: asyncio.Task):
+        self._refreshing.pop(cache_key, None)
+        # Background refreshes may have no awaiter; mark failures as retrieved
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Parameter refresh failed for {cache_key}: {task.exception()}")
+
+    async def _refresh_single_flight(self, product_id: str, subproduct_id: str) -> Dict[str, Any]:
+        """Refresh from the database, holding a short Redis lock so one node does the work"""
+        cache_key = f"params:{product_id}:{subproduct_id}"
+        lock = self.async_redis_client.lock(f"lock:{cache_key}", timeout=self.refresh_lock_ttl)
+        acquired = False
+        try:
+            acquired = await lock.acquire(blocking=False)
+            if not acquired:
+                self.refresh_stats["lock_contended"] += 1
+                cached_params = await self._wait_for_peer_refresh(product_id, subproduct_id)
+                if cached_params is not None:
+                    return cached_params
+        except Exception as e:
+            # Redis being unavailable must not stop the in-process refresh
+            logger.error(f"Refresh lock error for {cache_key}: {e}")
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                self.refresh_stats["refreshes"] += 1
+                return await self.refresh_parameters_cache_async(db, product_id, subproduct_id)
+        finally:
+            if acquired:
+                try:
+                    await lock.release()
+                except Exception as e:
+                    logger.warning(f"Failed to release refresh lock for {cache_key}: {e}")
+
+    async def _wait_for_peer_refresh(self, product_id: str, subproduct_id: str) -> Optional[Dict[str, Any]]:
+        """Poll Redis while another node holds the refresh lock"""
+        cache_key = f"params:{product_id}:{subproduct_id}"
+        deadline = time.monotonic() + self.refresh_lock_wait
+        while True:
+            (cached_params, ttl_ms, _), = await self._fetch_many_async([(product_id, subproduct_id)])
+            if cached_params is not None:
+                self.local_cache.set(cache_key, cached_params, self._local_ttl(ttl_ms / 1000 if ttl_ms >= 0 else None))
+                return cached_params
+            if time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(0.05)
+
+    def _get_local(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        cached_params = self.local_cache.get(cache_key)
+        if cached_params is None:
+            metrics.LOCAL_CACHE_MISS.inc()
+            return None
+        metrics.LOCAL_CACHE_HIT.inc()
+        logger.debug(f"Local cache hit for {cache_key}")
+        if cached_params is NO_PARAMETERS:
+            self._count_negative_hit(cache_key)
+        return cached_params
+
+    def _redis_hit(self, cache_key: str, cached_params: Dict[str, Any], ttl_ms: int) -> Dict[str, Any]:
+        self.redis_hits += 1
+        metrics.REDIS_CACHE_HIT.inc()
+        logger.info(f"Cache hit for {cache_key}")
+        if cached_params is NO_PARAMETERS:
+            self._count_negative_hit(cache_key)
+        self.local_cache.set(cache_key, cached_params, self._local_ttl(ttl_ms / 1000 if ttl_ms >= 0 else None))
+        return cached_params
+
+    def _redis_miss(self, cache_key: str):
+        self.redis_misses += 1
+        metrics.REDIS_CACHE_MISS.inc()
+        logger.info(f"Cache miss for {cache_key}")
+
+    def _index_key(self, product_id: str, subproduct_id: str) -> str:
+        """Hash layout: set of the components cached for a product/subproduct"""
+        return f"hparams:{product_id}:{subproduct_id}"
+
+    def _component_key(self, product_id: str, subproduct_id: str, component: str) -> str:
+        """Hash layout: {parameter: value} hash for one component"""
+        return f"hparams:{product_id}:{subproduct_id}:{component}"
+
+    async def _read_indexes_async(self, keys: List[Tuple[str, str]]) -> List[Collection[str]]:
+        """Hash layout: the components currently indexed for each key, so a rewrite can drop the rest"""
+        if self.storage != "hash":
+            return [()] * len(keys)
+        async with self.async_redis_client.pipeline(transaction=False) as pipe:
+            for product_id, subproduct_id in keys:
+                pipe.smembers(self._index_key(product_id, subproduct_id))
+            return await pipe.execute()
+
+    def _queue_write(self, pipe, product_id: str, subproduct_id: str, parameters: Dict[str, Any],
+                     ttl: Optional[int], previous: Collection[str] = ()):
+        """Queue the writes caching one parameter set on pipe, and update the local tier.
+
+        previous is the hash layout's current index for the set; hashes of
+        components that are no longer in it are deleted. Sets cached for the
+        full cache_ttl record when it runs out, after which they are served
+        stale and refreshed; negative sets and sets cut short by an
+        effective-date boundary simply expire.
+        """
+        if not parameters:
+            parameters = NO_PARAMETERS
+            ttl = self._entry_ttl(NO_PARAMETERS, ttl)
+        redis_ttl = self._redis_ttl(ttl)
+        stale_at = int((time.time() + self.cache_ttl) * 1000) if ttl is None else None
+        
+        if self.storage == "hash":
+            index_key = self._index_key(product_id, subproduct_id)
+            # Readers that run between these writes see a miss, never a partial set
+            pipe.delete(index_key)
+            removed = [
+                self._component_key(product_id, subproduct_id, component) for component in previous
+                if component not in parameters and self._is_component(component)
+            ]
+            if removed:
+                pipe.delete(*removed)
+            for component, values in parameters.items():
+                component_key = self._component_key(product_id, subproduct_id, component)
+                pipe.delete(component_key)
+                pipe.hset(component_key, mapping=values)
+                pipe.expire(component_key, redis_ttl)
+            pipe.sadd(index_key, *(parameters or [NEGATIVE_MARKER]),
+                      *([f"{STALE_AT_PREFIX}{stale_at}"] if stale_at is not None else []))
+            pipe.expire(index_key, redis_ttl)
+        else:
+            cached_data = NEGATIVE_MARKER if parameters is NO_PARAMETERS else json.dumps(parameters)
+            # JSON has no raw newlines, so the stale-at prefix line cannot be mistaken for the set
+            pipe.setex(
+                f"params:{product_id}:{subproduct_id}",
+                redis_ttl,
+                cached_data if stale_at is None else f"{stale_at}\n{cached_data}"
+            )
+        
+        self.local_cache.set(f"params:{product_id}:{subproduct_id}", parameters, self._local_ttl(ttl))
+
+    def _queue_read(self, pipe, product_id: str, subproduct_id: str):
+        """Queue the two commands reading the head of one cached set: its value or index, and its PTTL"""
+        cache_key = (self._index_key(product_id, subproduct_id) if self.storage == "hash"
+                     else f"params:{product_id}:{subproduct_id}")
+        if self.storage == "hash":
+            pipe.smembers(cache_key)
+        else:
+            pipe.get(cache_key)
+        pipe.pttl(cache_key)
+
+    def _decode_heads(self, replies: List[Any]) -> List[Tuple[Any, int, bool]]:
+        """(value or components, PTTL, whether it is past its stale-at) for each head read by _queue_read"""
+        now_ms = time.time() * 1000
+        heads = []
+        for cached_data, ttl_ms in zip(replies[::2], replies[1::2]):
+            stale_at = None
+            if self.storage == "hash":
+                components = []
+                for member in cached_data or ():
+                    if member.startswith(STALE_AT_PREFIX):
+                        stale_at = int(member[len(STALE_AT_PREFIX):])
+                    else:
+                        components.append(member)
+                value = sorted(components) if components else None
+            elif not cached_data:
+                value = None
+            else:
+                if "\n" in cached_data:
+                    stale_at, _, cached_data = cached_data.partition("\n")
+                    stale_at = int(stale_at)
+                value = NO_PARAMETERS if cached_data == NEGATIVE_MARKER else json.loads(cached_data)
+            heads.append((value, ttl_ms, stale_at is not None and now_ms >= stale_at))
+        return heads
+
+    def _pending_components(self, heads: List[Tuple[Any, int, bool]]) -> List[Tuple[int, List[str]]]:
+        """Hash layout: (position, components) of the heads whose component hashes still need reading"""
+        return [
+            (position, components) for position, (components, _, _) in enumerate(heads)
+            if components and components != [NEGATIVE_MARKER]
+        ]
+
+    def _assemble(self, heads: List[Tuple[Any, int, bool]], pending: List[Tuple[int, List[str]]],
+                  hashes: List[Dict[str, str]]) -> List[Tuple[Optional[Dict[str, Any]], int, bool]]:
+        """Hash layout: parameter sets from their indexes and component hashes"""
+        results = [(NO_PARAMETERS if components else None, ttl_ms, stale) for components, ttl_ms, stale in heads]
+        offset = 0
+        for position, components in pending:
+            values = hashes[offset:offset + len(components)]
+            offset += len(components)
+            # A component missing next to its index (expired or being rewritten) makes the set a miss
+            cached_params = dict(zip(components, values)) if all(values) else None
+            results[position] = (cached_params, *heads[position][1:])
+        return results
+
+    def _is_component(self, member: str) -> bool:
+        """Hash layout: whether an index member names a component hash, rather than being a marker"""
+        return member != NEGATIVE_MARKER and not member.startswith(STALE_AT_PREFIX)
+
+    async def _fetch_many_async(
+        self, keys: List[Tuple[str, str]]
+    ) -> List[Tuple[Optional[Dict[str, Any]], int, bool]]:
+        """Cached sets from Redis, each with its remaining TTL in milliseconds and whether it is stale"""
+        async with self.async_redis_client.pipeline(transaction=False) as pipe:
+            for product_id, subproduct_id in keys:
+                self._queue_read(pipe, product_id, subproduct_id)
+            heads = self._decode_heads(await pipe.execute())
+        if self.storage != "hash":
+            return heads
+        
+        pending = self._pending_components(heads)
+        hashes = []
+        if pending:
+            async with self.async_redis_client.pipeline(transaction=False) as pipe:
+                for position, components in pending:
+                    product_id, subproduct_id = keys[position]
+                    for component in components:
+                        pipe.hgetall(self._component_key(product_id, subproduct_id, component))
+                hashes = await pipe.execute()
+        return self._assemble(heads, pending, hashes)
+
+    def _count_negative_hit(self, cache_key: str):
+        metrics.NEGATIVE_PARAMETERS.inc()
+        self.negative_hits.add(cache_key)
+
+    def _entry_ttl(self, parameters: Dict[str, Any], ttl: Optional[int] = None) -> Optional[int]:
+        """ttl capped at negative_ttl for negative entries"""
+        if parameters is not NO_PARAMETERS:
+            return ttl
+        return self.negative_ttl if ttl is None else min(ttl, self.negative_ttl)
+
+    def _parameters_query(self, product_id: str, subproduct_id: str, current_time: datetime):
+        """ACTIVE parameters that are effective now or scheduled to become effective"""
+        return self._active_parameters_query(current_time).where(
             ConfigurableParameters.product_id == product_id,
-            ConfigurableParameters.subproduct_id == subproduct_id,
+            ConfigurableParameters.subproduct_id == subproduct_id
+        )
+
+    def _active_parameters_query(self, current_time: datetime):
+        """_parameters_query across every product/subproduct"""
+        return select(ConfigurableParameters).where(
             ConfigurableParameters.status == "ACTIVE",
-            ConfigurableParameters.effective_from <= current_time,
             (ConfigurableParameters.effective_to.is_(None) | 
              (ConfigurableParameters.effective_to >= current_time))
-        ).all()
-        
+        )
+
+    def _resolve_parameters(self, parameters: List[ConfigurableParameters],
+                            current_time: datetime) -> Tuple[Dict[str, Dict[str, str]], Optional[int]]:
+        """Build the parameter dict and the seconds until the next effective-date boundary"""
         param_dict = {}
+        boundaries = []
         for param in parameters:
+            if param.effective_from > current_time:
+                boundaries.append(param.effective_from)
+                continue
+            if param.effective_to is not None:
+                # effective_to is inclusive, so the row drops out just after it
+                boundaries.append(param.effective_to + timedelta(seconds=1))
             component_key = param.component
             if component_key not in param_dict:
                 param_dict[component_key] = {}
             param_dict[component_key][param.parameter] = param.value
         
-        self.set_cached_parameters(product_id, subproduct_id, param_dict)
+        if not boundaries:
+            return param_dict, None
         
-        return param_dict
+        ttl = math.ceil((min(boundaries) - current_time).total_seconds())
+        if ttl >= self.cache_ttl:
+            return param_dict, None
+        return param_dict, max(ttl, 1)
+
+    def _redis_ttl(self, ttl: Optional[int]) -> int:
+        # Entries bounded by an effective-date boundary must not be served stale past it
+        return self.cache_ttl + self.stale_ttl if ttl is None else ttl
+
+    def _local_ttl(self, ttl: Optional[float]) -> float:
+        return self.local_cache.ttl if ttl is None else min(self.local_cache.ttl, ttl)
 
     def invalidate_cache(self, product_id: str, subproduct_id: str):
-        """Invalidate cache for specific product/subproduct"""
+        """Invalidate cache for specific product/subproduct on every gateway worker.
+
+        This also clears a negative entry, e.g. when the first parameter for a
+        product is created.
+        """
         cache_key = f"params:{product_id}:{subproduct_id}"
         try:
-            self.redis_client.delete(cache_key)
+            if self.storage == "hash":
+                index_key = self._index_key(product_id, subproduct_id)
+                components = self.redis_client.smembers(index_key)
+                self.redis_client.delete(index_key, *(
+                    self._component_key(product_id, subproduct_id, component) for component in components
+                    if self._is_component(component)
+                ))
+            else:
+                self.redis_client.delete(cache_key)
             logger.info(f"Invalidated cache for {cache_key}")
         except Exception as e:
             logger.error(f"Failed to invalidate cache: {e}")
+        self._evict_local(product_id, subproduct_id)
+
+    def patch_cached_parameter(self, product_id: str, subproduct_id: str, component: str, parameter: str,
+                               param: Optional[ConfigurableParameters]):
+        """Bring one cached parameter in line with its database row without reloading the whole set.
+
+        param is the row as it is now, or None if it no longer exists. Only
+        the hash layout can be patched in place, and only when the row adds no
+        effective-date boundary that the cached set's TTL does not account
+        for; otherwise the set is invalidated.
+        """
+        current_time = datetime.utcnow()
+        effective = (param is not None and param.status == "ACTIVE" and param.effective_from <= current_time
+                     and (param.effective_to is None or param.effective_to >= current_time))
+        if self.storage != "hash" or (effective and param.effective_to is not None) or (
+                param is not None and param.status == "ACTIVE" and param.effective_from > current_time):
+            self.invalidate_cache(product_id, subproduct_id)
+            return
+        
+        cache_key = f"params:{product_id}:{subproduct_id}"
+        index_key = self._index_key(product_id, subproduct_id)
+        component_key = self._component_key(product_id, subproduct_id, component)
+        try:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.smembers(index_key)
+                pipe.pttl(index_key)
+                components, ttl_ms = pipe.execute()
+            if NEGATIVE_MARKER in components:
+                # The set is no longer empty, or still is; either way there is nothing to patch
+                self.invalidate_cache(product_id, subproduct_id)
+                return
+            if components and ttl_ms > 0:
+                with self.redis_client.pipeline(transaction=True) as pipe:
+                    if effective:
+                        if component not in components:
+                            # A hash left behind by an earlier set must not bring back its parameters
+                            pipe.delete(component_key)
+                        pipe.hset(component_key, parameter, param.value)
+                        pipe.pexpire(component_key, ttl_ms)
+                        pipe.sadd(index_key, component)
+                    else:
+                        pipe.hdel(component_key, parameter)
+                    pipe.hlen(component_key)
+                    remaining = pipe.execute()[-1]
+                if not remaining:
+                    self.redis_client.srem(index_key, component)
+                logger.info(f"Patched {component}.{parameter} in cache for {cache_key}")
+        except Exception as e:
+            logger.error(f"Failed to patch cached parameter, invalidating instead: {e}")
+            self.invalidate_cache(product_id, subproduct_id)
+            return
+        # Local tiers reload the patched set from Redis, not the database
+        self._evict_local(product_id, subproduct_id)
+
+    def _evict_local(self, product_id: str, subproduct_id: str):
+        """Drop a set from the local tier of every gateway worker"""
+        cache_key = f"params:{product_id}:{subproduct_id}"
+        self._bump_generation(cache_key)
+        self.local_cache.delete(cache_key)
+        self.negative_hits.discard(cache_key)
+        try:
+            self.redis_client.publish(self.invalidation_channel, json.dumps({
+                "product_id": product_id,
+                "subproduct_id": subproduct_id
+            }))
+        except Exception as e:
+            logger.error(f"Failed to publish cache invalidation: {e}")
+
+    def start_invalidation_listener(self):
+        """Subscribe to invalidation messages published by any worker or node"""
+        if self._listener is not None:
+            return
+        try:
+            self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.invalidation_channel: self._handle_invalidation})
+            self._listener = self._pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._handle_listener_error
+            )
+            logger.info(f"Listening for cache invalidations on {self.invalidation_channel}")
+        except Exception as e:
+            # Without pub/sub the local tier TTL still bounds staleness
+            logger.error(f"Failed to subscribe to cache invalidations: {e}")
+            self._pubsub = None
+
+    def stop_invalidation_listener(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener.join(timeout=2.0)
+            self._listener = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit ratios for the local and Redis tiers"""
+        redis_lookups = self.redis_hits + self.redis_misses
+        return {
+            "local": self.local_cache.get_stats(),
+            "redis": {
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_ratio": self.redis_hits / redis_lookups if redis_lookups else 0.0
+            },
+            "refresh": {**self.refresh_stats, "in_flight": len(self._refreshing)},
+            "negative": {
+                "hits": self.negative_hits.total,
+                "ttl": self.negative_ttl,
+                "top_keys": [{"key": key, "hits": hits} for key, hits in self.negative_hits.most_common(10)]
+            },
+            "invalidation_listener": self._listener is not None
+        }
+
+    def _handle_invalidation(self, message: Dict[str, Any]):
+        try:
+            data = json.loads(message["data"])
+            cache_key = f"params:{data['product_id']}:{data['subproduct_id']}"
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Invalid cache invalidation message: {e}")
+            return
+        self._bump_generation(cache_key)
+        self.local_cache.delete(cache_key)
+        logger.debug(f"Evicted {cache_key} from local cache")
+
+    def _bump_generation(self, cache_key: str):
+        # Called from the listener thread too; under the GIL the worst race loses a bump, never both
+        self._generations[cache_key] = self._generations.get(cache_key, 0) + 1
+
+    def _handle_listener_error(self, error: Exception, pubsub, thread):
+        # Keep the listener alive; redis-py resubscribes on reconnect
+        logger.error(f"Cache invalidation listener error: {error}")
+        time.sleep(1.0)
 
 cache_service = CacheService()
@@ -0,0 +1,135 @@
+import time
+from collections import deque
+from typing import Dict, Any, Tuple
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "CLOSED"
+OPEN = "OPEN"
+HALF_OPEN = "HALF_OPEN"
+
+class RetryBudget:
+    """Caps retries at a fraction of recent requests so retries cannot amplify an outage"""
+
+    def __init__(self, ratio: float, min_retries: int, window: float):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self.exhausted = 0
+
+    def record_request(self):
+        self._requests.append(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        self._trim(self._requests, now)
+        self._trim(self._retries, now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def _trim(self, events: deque, now: float):
+        while events and now - events[0] > self.window:
+            events.popleft()
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing"""
+
+    def __init__(self, name: str, failure_threshold: int, open_seconds: float, half_open_max_calls: int):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = HALF_OPEN
+            self.probes_in_flight = 0
+            logger.info(f"Circuit for {self.name} half-open, probing upstream")
+
+        if self.state == HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self.probes_in_flight += 1
+
+        return True
+
+    def record_success(self):
+        if self.state == HALF_OPEN:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.probes_in_flight = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """Give back a half-open probe slot when the call ended without a result"""
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def _open(self):
+        if self.state != OPEN:
+            self.times_opened += 1
+            logger.warning(f"Circuit for {self.name} opened after {self.consecutive_failures} failures")
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+
+class CircuitBreakerRegistry:
+    """Circuit breaker and retry budget per Fico (product_code, version)"""
+
+    def __init__(self):
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._budgets: Dict[Tuple[str, str], RetryBudget] = {}
+
+    def get(self, product_code: str, version: str) -> Tuple[CircuitBreaker, RetryBudget]:
+        key = (product_code, version)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                f"{product_code}:{version}",
+                settings.circuit_failure_threshold,
+                settings.circuit_open_seconds,
+                settings.circuit_half_open_max_calls
+            )
+            self._breakers[key] = breaker
+            self._budgets[key] = RetryBudget(
+                settings.retry_budget_ratio,
+                settings.retry_budget_min_retries,
+                settings.retry_budget_window
+            )
+        return breaker, self._budgets[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            breaker.name: {
+                "state": breaker.state,
+                "consecutive_failures": breaker.consecutive_failures,
+                "times_opened": breaker.times_opened,
+                "rejected": breaker.rejected,
+                "retry_budget_exhausted": self._budgets[key].exhausted
+            }
+            for key, breaker in self._breakers.items()
+        }
+
+circuit_breakers = CircuitBreakerRegistry()
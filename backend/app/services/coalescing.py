@@ -0,0 +1,68 @@
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Tuple, TypeVar
+from app.services import metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class RequestCoalescer:
+    """Shares one in-flight call between concurrent callers with the same key.
+
+    Each caller awaits the shared task through a shield, so a caller being
+    cancelled never cancels the call for the others; the call itself is only
+    cancelled once every caller has gone.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def run(self, key: str, call: Callable[[], Awaitable[T]], environment: Tuple[str, str]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            flight.task.add_done_callback(lambda done: self._finish(key, done))
+            self._flights[key] = flight
+            self._count(environment, "calls")
+        else:
+            self._count(environment, "coalesced")
+            metrics.COALESCED_REQUESTS.labels(*environment).inc()
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to use the response. Forget the flight first, so a caller
+                # arriving before the task has finished cancelling starts a new one
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                self._count(environment, "abandoned")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "environments": {env: dict(counters) for env, counters in self._stats.items()}
+        }
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._flights.get(key) is not None and self._flights[key].task is task:
+            del self._flights[key]
+        # Abandoned calls have no awaiter; mark failures as retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, environment: Tuple[str, str], counter: str):
+        counters = self._stats.setdefault(f"{environment[0]}:{environment[1]}", {
+            "calls": 0, "coalesced": 0, "abandoned": 0
+        })
+        counters[counter] += 1
@@ -0,0 +1,147 @@
+from functools import lru_cache
+from typing import Dict, Any, Callable, List, NamedTuple, Tuple
+from app.config import settings
+
+# The step matching every element of a list
+EACH = "[*]"
+
+class RequestFields(NamedTuple):
+    """Routing and lookup fields read from a gateway request body; None when absent"""
+    bom_version_id: Any
+    product_id: Any
+    subproduct_id: Any
+    application_id: Any
+
+def parse_path(path: str) -> List[Any]:
+    """Split a path like "[*].value.application.productCode" into its steps.
+
+    Steps are object keys, list indexes ("[0]", "[-1]") or "[*]" for every
+    list element, which matches the first element the rest of the path
+    resolves in.
+    """
+    steps: List[Any] = []
+    for part in path.replace("[", ".[").split("."):
+        if not part:
+            continue
+        if part.startswith("["):
+            if not part.endswith("]"):
+                raise ValueError(f"Invalid extraction path {path!r}")
+            index = part[1:-1]
+            try:
+                steps.append(EACH if index == "*" else int(index))
+            except ValueError:
+                raise ValueError(f"Invalid list index in extraction path {path!r}")
+        else:
+            steps.append(part)
+    if not steps:
+        raise ValueError(f"Empty extraction path {path!r}")
+    return steps
+
+# Visits a value with the found values and the priority of the path each was found by
+Visitor = Callable[[Any, List[Any], List[int]], None]
+
+class _Node:
+    def __init__(self):
+        self.keys: Dict[str, "_Node"] = {}
+        self.indexes: Dict[Any, "_Node"] = {}
+        # (field slot, priority) pairs whose path ends here
+        self.terminals: List[Tuple[int, int]] = []
+
+    def visitor(self) -> Visitor:
+        """A closure walking the branches below this node; built once, so nothing is parsed per request"""
+        terminals = tuple(self.terminals)
+        # Children that only end paths are read in place, saving a call per field found
+        key_leaves = tuple(
+            (key, slot, priority) for key, child in self.keys.items() if not child.keys and not child.indexes
+            for slot, priority in child.terminals
+        )
+        key_branches = tuple(
+            (key, child.visitor()) for key, child in self.keys.items() if child.keys or child.indexes
+        )
+        indexes = tuple((index, child.visitor()) for index, child in self.indexes.items())
+
+        def visit(value: Any, found: List[Any], priorities: List[int]):
+            # Lower priorities win; a tie keeps the earlier list element
+            for slot, priority in terminals:
+                if priorities[slot] > priority:
+                    found[slot], priorities[slot] = value, priority
+            if type(value) is dict:
+                get = value.get
+                for key, slot, priority in key_leaves:
+                    child_value = get(key)
+                    if child_value is not None and priorities[slot] > priority:
+                        found[slot], priorities[slot] = child_value, priority
+                for key, child in key_branches:
+                    child_value = get(key)
+                    if child_value is not None:
+                        child(child_value, found, priorities)
+            elif indexes and type(value) is list:
+                for index, child in indexes:
+                    if index == EACH:
+                        for child_value in value:
+                            if child_value is not None:
+                                child(child_value, found, priorities)
+                    elif -len(value) <= index < len(value) and value[index] is not None:
+                        child(value[index], found, priorities)
+        return visit
+
+class RequestExtractor:
+    """Reads RequestFields from a body using paths kept in config.
+
+    Each field has an ordered list of paths, earliest first. All paths are
+    merged into one tree of closures, built once, so a body is walked once
+    however many fields and paths there are, and only along branches some
+    path can match.
+    """
+
+    def __init__(self, paths: Dict[str, List[str]]):
+        unknown = set(paths) - set(RequestFields._fields)
+        if unknown:
+            raise ValueError(f"Unknown extraction fields: {sorted(unknown)}")
+        self.paths = paths
+        root = _Node()
+        for slot, field in enumerate(RequestFields._fields):
+            for priority, path in enumerate(paths.get(field, [])):
+                node = root
+                for step in parse_path(path):
+                    children = node.indexes if step == EACH or isinstance(step, int) else node.keys
+                    node = children.setdefault(step, _Node())
+                node.terminals.append((slot, priority))
+
+        visit = root.visitor()
+        fields = len(RequestFields._fields)
+        unset = max(map(len, paths.values()), default=0)
+        new = tuple.__new__
+
+        def extract(body: Any) -> RequestFields:
+            found = [None] * fields
+            if body is not None:
+                visit(body, found, [unset] * fields)
+            # tuple.__new__ skips the NamedTuple constructor's argument handling
+            return new(RequestFields, found)
+        self.extract: Callable[[Any], RequestFields] = extract
+
+@lru_cache(maxsize=settings.bom_version_id_cache_size)
+def parse_bom_version_id(bom_version_id: str) -> Tuple[str, str]:
+    """Parse bomVersionId to extract product_code and version.
+
+    Callers send a small set of ids over and over, so results are cached.
+    """
+    parts = bom_version_id.split(":")
+    if len(parts) >= 3:
+        product_code = ":".join(parts[:-1])
+        version = parts[-1]
+        return product_code, version
+
+    parts = bom_version_id.split("_v")
+    if len(parts) == 2:
+        return parts[0], parts[1]
+
+    return bom_version_id, "1.0"
+
+request_extractor = RequestExtractor({
+    "bom_version_id": settings.extract_bom_version_id_paths,
+    "product_id": settings.extract_product_id_paths,
+    "subproduct_id": settings.extract_subproduct_id_paths,
+    "application_id": settings.extract_application_id_paths
+})
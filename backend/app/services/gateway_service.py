@@ -1,167 +1,618 @@
+import asyncio
 import json
+import random
+import time
 import httpx
-from typing import Dict, Any, Tuple, Optional
-from sqlalchemy.orm import Session
-from app.models import FicoEnvironmentConfig
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Dict, Any, Tuple, Optional, List, AsyncIterator, Callable, Mapping
 from app.services.cache_service import cache_service
+from app.services.routing_service import routing_table, FicoRoute, RoutingRule
+from app.services.token_service import token_manager
+from app.services.upstream_pool import UpstreamPool
+from app.services.circuit_breaker import circuit_breakers, RetryBudget
+from app.services import metrics
+from app.services.access_log import access_log_writer
+from app.services.response_cache import response_cache, IdempotencyKeyReused, IDEMPOTENCY_KEY_HEADER
+from app.services.json_codec import gateway_json, canonical_digest
+from app.services.coalescing import RequestCoalescer
+from app.services.admission import admission_controller, AdmissionRejected
+from app.services.shadow import shadow_mirror
+from app.services.extraction import request_extractor, parse_bom_version_id, RequestFields
 from app.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Responses counted as failures by the circuit breaker
+FAILURE_STATUS_CODES = {502, 503, 504}
+# Fico did not process the request, so even a non-idempotent POST can be sent again
+RETRYABLE_STATUS_CODES = {503}
+# A 502 or 504 may follow a request Fico processed, so they need an Idempotency-Key for Fico to dedupe by
+IDEMPOTENT_RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# Hop-by-hop headers, and headers our own server sets, are not relayed from Fico
+UNFORWARDED_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailer",
+    "transfer-encoding", "upgrade", "date", "server"
+}
+
+class UpstreamError(Exception):
+    """Fico could not be reached or is failing; status_code is returned to the caller"""
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+class UpstreamStream:
+    """An open Fico response whose body is relayed to the client as it arrives.
+
+    aclose() may be called any number of times; the response is closed and
+    on_close called once.
+    """
+
+    def __init__(self, response: httpx.Response, on_close: Callable[[], None]):
+        self.status_code = response.status_code
+        self.headers = {
+            name: value for name, value in response.headers.items() if name.lower() not in UNFORWARDED_HEADERS
+        }
+        self._response = response
+        self._on_close = on_close
+        self._closed = False
+
+    async def iter_bytes(self) -> AsyncIterator[bytes]:
+        # Raw bytes keep Fico's content-encoding, so nothing is decompressed or buffered here
+        try:
+            async for chunk in self._response.aiter_raw():
+                yield chunk
+        finally:
+            await self.aclose()
+
+    async def aclose(self):
+        if self._closed:
+            return
+        self._closed = True
+        # on_close releases the admission slot, so it runs before anything that can be cancelled
+        try:
+            self._on_close()
+        finally:
+            await self._response.aclose()
+
+class UpstreamStreamingResponse(StreamingResponse):
+    """Relays an UpstreamStream, closing it however the response ends.
+
+    Starlette only runs the body iterator's cleanup if it started iterating,
+    and skips background tasks when sending fails, so a client disconnect or
+    cancellation would otherwise leak the Fico connection and admission slot.
+    """
+
+    def __init__(self, upstream: UpstreamStream):
+        super().__init__(upstream.iter_bytes(), status_code=upstream.status_code, headers=upstream.headers)
+        self.upstream = upstream
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.upstream.aclose()
+
 class GatewayService:
     def __init__(self):
-        self.http_client = httpx.AsyncClient(timeout=30.0)
+        self.upstream_pool = UpstreamPool()
+        self.batch_concurrency = settings.gateway_batch_concurrency
+        self.max_retries = settings.upstream_max_retries
+        self.retry_backoff = settings.upstream_retry_backoff
+        self.coalesce_requests = settings.gateway_coalesce_requests
+        self.coalescer = RequestCoalescer()
+
+    async def process_request(self, request_data: Dict[str, Any],
+                              client_headers: Optional[Mapping[str, str]] = None,
+                              client_address: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+        """Main gateway processing logic.
 
-    async def process_request(self, db: Session, request_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
-        """Main gateway processing logic"""
+        client_headers are the headers of the HTTP request to the gateway; they
+        can carry the response cache's Idempotency-Key and Cache-Control and
+        the caller identity used by admission control, which falls back to
+        client_address. AdmissionRejected is
+        raised, rather than returned, so the endpoint can answer with its
+        status and Retry-After directly.
+        """
+        received_at = datetime.utcnow()
+        started = time.perf_counter()
+        fields, fico_config = None, None
         try:
-            bom_version_id = self._extract_bom_version_id(request_data.get("body", {}))
-            if not bom_version_id:
-                return {"error": "bomVersionId not found in request"}, 400
+            fields, fico_config, rule, error = self._resolve_route(request_data)
+            if error:
+                response, status_code = error
+            else:
+                caller = admission_controller.caller_id(client_headers, client_address)
+                limiter = await admission_controller.acquire(fico_config, caller)
+                try:
+                    augmented_request = await self._augment_request(fico_config, request_data, fields)
+                    response = await self._route_to_fico_cached(fico_config, augmented_request, client_headers,
+                                                                caller, rule)
+                    status_code = 200
+                finally:
+                    limiter.release()
 
-            product_code, version = self._parse_bom_version_id(bom_version_id)
-            
-            fico_config = self._get_fico_config(db, product_code, version)
-            if not fico_config:
-                return {"error": f"No configuration found for {product_code} v{version}"}, 404
+        except AdmissionRejected as e:
+            self._record_request(request_data, fields, fico_config, {"error": str(e)}, e.status_code,
+                                 received_at, time.perf_counter() - started)
+            raise
+        except UpstreamError as e:
+            response, status_code = {"error": str(e)}, e.status_code
+        except IdempotencyKeyReused as e:
+            response, status_code = {"error": str(e)}, 422
+        except Exception as e:
+            logger.error(f"Gateway processing error: {e}")
+            response, status_code = {"error": "Internal gateway error"}, 500
+        
+        self._record_request(request_data, fields, fico_config, response, status_code, received_at,
+                             time.perf_counter() - started)
+        return response, status_code
 
-            product_id, subproduct_id = self._extract_product_info(request_data.get("body", {}))
-            
-            augmented_request = await self._augment_request(db, request_data, product_id, subproduct_id)
-            
-            response = await self._route_to_fico(fico_config, augmented_request)
-            
-            return response, 200
+    async def process_request_stream(self, request_data: Dict[str, Any],
+                                     client_headers: Optional[Mapping[str, str]] = None,
+                                     client_address: Optional[str] = None) -> Tuple[Optional[UpstreamStream], Optional[Tuple[Dict[str, Any], int]]]:
+        """Like process_request, but returns the open Fico response for relaying instead of its parsed body.
 
+        The admission slot is held until the relayed body has been sent.
+        """
+        received_at = datetime.utcnow()
+        started = time.perf_counter()
+        fields, fico_config = None, None
+        limiter = None
+        try:
+            # Streamed responses are relayed unread, so they are not mirrored to shadows
+            fields, fico_config, _, error = self._resolve_route(request_data)
+            if not error:
+                limiter = await admission_controller.acquire(
+                    fico_config, admission_controller.caller_id(client_headers, client_address)
+                )
+                augmented_request = await self._augment_request(fico_config, request_data, fields)
+                response = await self._call_fico(fico_config, augmented_request, stream=True)
+                
+                def finish():
+                    limiter.release()
+                    # The client gets the Fico status as-is, so it is logged as the gateway status too
+                    self._record_request(request_data, fields, fico_config, {"status_code": response.status_code},
+                                         response.status_code, received_at, time.perf_counter() - started)
+                return UpstreamStream(response, finish), None
+        
+        except AdmissionRejected as e:
+            self._record_request(request_data, fields, fico_config, {"error": str(e)}, e.status_code,
+                                 received_at, time.perf_counter() - started)
+            raise
+        except UpstreamError as e:
+            error = {"error": str(e)}, e.status_code
+        except asyncio.CancelledError:
+            if limiter is not None:
+                limiter.release()
+            raise
         except Exception as e:
             logger.error(f"Gateway processing error: {e}")
-            return {"error": "Internal gateway error"}, 500
+            error = {"error": "Internal gateway error"}, 500
+        
+        if limiter is not None:
+            limiter.release()
+        self._record_request(request_data, fields, fico_config, *error, received_at, time.perf_counter() - started)
+        return None, error
+
+    async def aclose(self):
+        await shadow_mirror.aclose()
+        await self.upstream_pool.aclose()
+
+    async def process_batch(self, requests: List[Dict[str, Any]],
+                            client_headers: Optional[Mapping[str, str]] = None,
+                            client_address: Optional[str] = None) -> AsyncIterator[Tuple[int, Dict[str, Any], int]]:
+        """Process many gateway requests, yielding (index, response, status_code) as each completes.
+
+        Items shed by admission control get its 429/503 status and a
+        retry_after in their response.
+        """
+        results: Dict[int, Tuple[Dict[str, Any], int]] = {}
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        fields: Dict[int, Optional[RequestFields]] = {}
+        routes: Dict[int, FicoRoute] = {}
+        rules: Dict[int, Optional[RoutingRule]] = {}
+        product_keys: Dict[int, Tuple[str, str]] = {}
+        
+        received_at = datetime.utcnow()
+        for index, request_data in enumerate(requests):
+            try:
+                fields[index], fico_config, rule, error = self._resolve_route(request_data)
+            except Exception as e:
+                logger.error(f"Gateway processing error: {e}")
+                fields[index], fico_config, rule, error = None, None, None, ({"error": "Internal gateway error"}, 500)
+            if error:
+                results[index] = error
+                self._record_request(request_data, fields[index], None, *error, received_at, 0.0)
+                continue
+            routes[index] = fico_config
+            rules[index] = rule
+            product_keys[index] = self._product_key(fields[index])
+            groups.setdefault((fico_config.product_code, fico_config.version), []).append(index)
+        
+        for index, (response, status_code) in results.items():
+            yield index, response, status_code
+        
+        caller = admission_controller.caller_id(client_headers, client_address)
+        # Resolve each parameter set once for the whole batch
+        parameters = await cache_service.get_many_or_refresh_parameters(list(set(product_keys.values())))
+        
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
+        
+        async def run(index: int) -> Tuple[int, Dict[str, Any], int]:
+            async with semaphore:
+                started = time.perf_counter()
+                fico_config = routes[index]
+                limiter = None
+                try:
+                    limiter = await admission_controller.acquire(fico_config, caller)
+                    cached_params = parameters[product_keys[index]]
+                    if isinstance(cached_params, Exception):
+                        raise cached_params
+                    augmented_request = self._merge_parameters(requests[index], cached_params)
+                    metrics.observe_stage(metrics.STAGE_AUGMENT, fico_config.product_code, fico_config.version,
+                                          time.perf_counter() - started)
+                    response, status_code = await self._route_to_fico_cached(
+                        fico_config, augmented_request, client_headers, caller, rules[index]
+                    ), 200
+                except AdmissionRejected as e:
+                    response, status_code = {"error": str(e), "retry_after": e.retry_after}, e.status_code
+                except UpstreamError as e:
+                    response, status_code = {"error": str(e)}, e.status_code
+                except IdempotencyKeyReused as e:
+                    response, status_code = {"error": str(e)}, 422
+                except Exception as e:
+                    logger.error(f"Gateway processing error: {e}")
+                    response, status_code = {"error": "Internal gateway error"}, 500
+                finally:
+                    if limiter is not None:
+                        limiter.release()
+                self._record_request(requests[index], fields[index], fico_config, response, status_code,
+                                     received_at, time.perf_counter() - started)
+                return index, response, status_code
+        
+        # Schedule group by group so requests for one Fico environment go out together
+        tasks = [asyncio.create_task(run(index)) for indices in groups.values() for index in indices]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _resolve_route(self, request_data: Dict[str, Any]) -> Tuple[RequestFields, Optional[FicoRoute], Optional[RoutingRule], Optional[Tuple[Dict[str, Any], int]]]:
+        """Extract the request's fields and resolve its Fico route and routing rule, or the error response"""
+        started = time.perf_counter()
+        fields = self._extract_fields(request_data.get("body", {}))
+        bom_version_id = fields.bom_version_id
+        if not bom_version_id or not isinstance(bom_version_id, str):
+            metrics.observe_stage(metrics.STAGE_EXTRACT, metrics.UNKNOWN, metrics.UNKNOWN,
+                                  time.perf_counter() - started)
+            error = "bomVersionId not found in request" if not bom_version_id else "bomVersionId must be a string"
+            return fields, None, None, ({"error": error}, 400)
 
-    def _extract_bom_version_id(self, body: Dict[str, Any]) -> Optional[str]:
-        """Extract bomVersionId from request body"""
-        if "bomVersionId" in body:
-            return body["bomVersionId"]
+        product_code, version = self._parse_bom_version_id(bom_version_id)
+        extracted = time.perf_counter()
+        
+        # Sticky on the application, so its retries and follow-ups reach the same Fico version
+        fico_config, rule = self._get_fico_config(product_code, version, fields.application_id)
+        looked_up = time.perf_counter()
         
-        if "value" in body and isinstance(body["value"], dict):
-            if "bomVersionId" in body["value"]:
-                return body["value"]["bomVersionId"]
+        # Unrouted ids come straight from the client, so they are not used as label values
+        label_code, label_version = (
+            (fico_config.product_code, fico_config.version) if fico_config else (metrics.UNKNOWN, metrics.UNKNOWN)
+        )
+        metrics.observe_stage(metrics.STAGE_EXTRACT, label_code, label_version, extracted - started)
+        metrics.observe_stage(metrics.STAGE_CONFIG_LOOKUP, label_code, label_version, looked_up - extracted)
         
-        if "data" in body and isinstance(body["data"], dict):
-            if "bomVersionId" in body["data"]:
-                return body["data"]["bomVersionId"]
+        if not fico_config:
+            return fields, None, None, ({"error": f"No configuration found for {product_code} v{version}"}, 404)
         
-        return None
+        if rule is not None and rule.targets:
+            metrics.ROUTING_RULE_REQUESTS.labels(rule.name, label_code, label_version).inc()
+        return fields, fico_config, rule, None
+
+    def _extract_fields(self, body: Any) -> RequestFields:
+        """Extract bomVersionId, product info and applicationId from request body in one pass"""
+        return request_extractor.extract(body)
 
     def _parse_bom_version_id(self, bom_version_id: str) -> Tuple[str, str]:
         """Parse bomVersionId to extract product_code and version"""
-        parts = bom_version_id.split(":")
-        if len(parts) >= 3:
-            product_code = ":".join(parts[:-1])
-            version = parts[-1]
-            return product_code, version
-        
-        parts = bom_version_id.split("_v")
-        if len(parts) == 2:
-            return parts[0], parts[1]
-        
-        return bom_version_id, "1.0"
-
-    def _get_fico_config(self, db: Session, product_code: str, version: str) -> Optional[FicoEnvironmentConfig]:
-        """Get Fico environment configuration from database"""
-        return db.query(FicoEnvironmentConfig).filter(
-            FicoEnvironmentConfig.product_code == product_code,
-            FicoEnvironmentConfig.version == version,
-            FicoEnvironmentConfig.status == "ACTIVE"
-        ).first()
-
-    def _extract_product_info(self, body: Dict[str, Any]) -> Tuple[str, str]:
-        """Extract product_id and subproduct_id from request body"""
-        product_id = body.get("productId", "DEFAULT")
-        subproduct_id = body.get("subproductId", "DEFAULT")
-        
-        if "value" in body and isinstance(body["value"], dict):
-            product_id = body["value"].get("productId", product_id)
-            subproduct_id = body["value"].get("subproductId", subproduct_id)
-        
+        return parse_bom_version_id(bom_version_id)
+
+    def _get_fico_config(self, product_code: str, version: str,
+                         sticky_key: Optional[Any] = None) -> Tuple[Optional[FicoRoute], Optional[RoutingRule]]:
+        """Get Fico environment configuration, and any routing rule applied, from the in-memory routing table"""
+        return routing_table.resolve(product_code, version, sticky_key)
+
+    def _product_key(self, fields: RequestFields) -> Tuple[str, str]:
+        """product_id and subproduct_id for the parameter lookup, DEFAULT when absent"""
+        product_id = fields.product_id if fields.product_id is not None else "DEFAULT"
+        subproduct_id = fields.subproduct_id if fields.subproduct_id is not None else "DEFAULT"
         return product_id, subproduct_id
 
-    async def _augment_request(self, db: Session, request_data: Dict[str, Any], 
-                             product_id: str, subproduct_id: str) -> Dict[str, Any]:
+    async def _augment_request(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                               fields: RequestFields) -> Dict[str, Any]:
         """Augment request with cached parameters"""
-        cached_params = cache_service.get_cached_parameters(product_id, subproduct_id)
+        started = time.perf_counter()
+        product_id, subproduct_id = self._product_key(fields)
+        cached_params = await cache_service.get_or_refresh_parameters(product_id, subproduct_id)
+        augmented_request = self._merge_parameters(request_data, cached_params)
+        metrics.observe_stage(metrics.STAGE_AUGMENT, fico_config.product_code, fico_config.version,
+                              time.perf_counter() - started)
+        return augmented_request
+
+    def _merge_parameters(self, request_data: Dict[str, Any], cached_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Overlay cached parameters on the request body without mutating either.
+
+        cached_params is the shared, read-only payload from the cache. Components
+        the caller did not send are referenced as-is; only components present in
+        both are copied, with cached values taking precedence. FR-AG-002 list
+        bodies get the parameters in the value of their first object entry.
+        """
+        if not cached_params or "body" not in request_data:
+            return request_data
         
-        if not cached_params:
-            cached_params = cache_service.refresh_parameters_cache(db, product_id, subproduct_id)
+        body = request_data["body"]
+        if isinstance(body, list):
+            for index, entry in enumerate(body):
+                if isinstance(entry, dict) and isinstance(entry.get("value"), dict):
+                    entry = {**entry, "value": self._merge_into(entry["value"], cached_params)}
+                    return {**request_data, "body": [*body[:index], entry, *body[index + 1:]]}
+            return request_data
         
-        augmented_request = request_data.copy()
+        return {**request_data, "body": self._merge_into(body, cached_params)}
+
+    def _merge_into(self, payload: Dict[str, Any], cached_params: Dict[str, Any]) -> Dict[str, Any]:
+        caller_params = payload.get("parameters")
+        if caller_params:
+            merged_params = dict(cached_params)
+            for component, params in caller_params.items():
+                cached_component = cached_params.get(component)
+                merged_params[component] = params if cached_component is None else {**params, **cached_component}
+        else:
+            merged_params = cached_params
         
-        if cached_params and "body" in augmented_request:
-            if "parameters" not in augmented_request["body"]:
-                augmented_request["body"]["parameters"] = {}
-            
-            for component, params in cached_params.items():
-                if component not in augmented_request["body"]["parameters"]:
-                    augmented_request["body"]["parameters"][component] = {}
-                augmented_request["body"]["parameters"][component].update(params)
+        return {**payload, "parameters": merged_params}
+
+    async def _route_to_fico(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                             rule: Optional[RoutingRule] = None) -> Dict[str, Any]:
+        """Route request to Fico platform and return its parsed response.
+
+        With a rule, the response is offered to its shadow mirror along with
+        the time Fico took, since only here is it known to come from Fico.
+        """
+        started = time.perf_counter()
+        response = await self._call_fico(fico_config, request_data)
+        seconds = time.perf_counter() - started
+        result = {
+            "status_code": response.status_code,
+            "headers": dict(response.headers),
+            "body": self._decode_body(response)
+        }
+        if rule is not None and rule.shadow is not None:
+            shadow_mirror.mirror(rule, fico_config, result, seconds,
+                                 lambda shadow: self._route_to_fico(shadow, request_data))
+        return result
+
+    async def _route_to_fico_cached(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                                    client_headers: Optional[Mapping[str, str]] = None,
+                                    caller: Optional[str] = None,
+                                    rule: Optional[RoutingRule] = None) -> Dict[str, Any]:
+        """_route_to_fico through the response cache, for configs that enable it"""
+        cache_key = response_cache.cache_key(fico_config, request_data, client_headers, caller)
+        if cache_key is None:
+            return await self._route_to_fico_coalesced(fico_config, request_data, rule)
         
-        return augmented_request
+        response = await response_cache.get(fico_config, cache_key)
+        if response is None:
+            response = await self._route_to_fico_coalesced(fico_config, request_data, rule)
+            await response_cache.set(fico_config, cache_key, response)
+        return response
 
-    async def _route_to_fico(self, fico_config: FicoEnvironmentConfig, 
-                           request_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Route request to Fico platform"""
-        try:
-            auth_token = await self._get_auth_token(fico_config)
+    async def _route_to_fico_coalesced(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                                       rule: Optional[RoutingRule] = None) -> Dict[str, Any]:
+        """_route_to_fico, sharing one Fico call between concurrent identical requests.
+
+        Only the call that reaches Fico is mirrored, not the requests sharing it.
+        """
+        if not self.coalesce_requests:
+            return await self._route_to_fico(fico_config, request_data, rule)
+        
+        # Forwarded headers are part of the upstream request, so they are part of the key
+        key = canonical_digest([fico_config.product_code, fico_config.version,
+                                request_data.get("body"), request_data.get("headers", {})])
+        return await self.coalescer.run(
+            key, lambda: self._route_to_fico(fico_config, request_data, rule),
+            (fico_config.product_code, fico_config.version)
+        )
+
+    async def _call_fico(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                         stream: bool = False) -> httpx.Response:
+        """Call Fico through the environment's circuit breaker, retrying where it is safe"""
+        breaker, retry_budget = circuit_breakers.get(fico_config.product_code, fico_config.version)
+        retry_budget.record_request()
+        attempt = 0
+        retryable_status_codes = (
+            IDEMPOTENT_RETRYABLE_STATUS_CODES if self._has_idempotency_key(request_data) else RETRYABLE_STATUS_CODES
+        )
+        
+        while True:
+            if not breaker.allow_request():
+                self._count_upstream_error(fico_config, "circuit_open")
+                raise UpstreamError(
+                    f"Fico environment {fico_config.product_code} v{fico_config.version} is unavailable", 503
+                )
             
-            headers = {
-                "Authorization": f"Bearer {auth_token}",
-                "Content-Type": "application/json"
-            }
-            headers.update(request_data.get("headers", {}))
+            recorded = False
+            try:
+                response = await self._send_to_fico(fico_config, request_data, stream)
+                if response.status_code in FAILURE_STATUS_CODES:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                recorded = True
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                # The request never reached Fico, so it is safe to send again
+                breaker.record_failure()
+                recorded = True
+                self._count_upstream_error(fico_config, "connect")
+                logger.error(f"Error connecting to Fico {fico_config.url}: {e}")
+                if self._can_retry(attempt, retry_budget):
+                    attempt += 1
+                    await asyncio.sleep(self._retry_delay(attempt))
+                    continue
+                raise UpstreamError("Fico platform unreachable", 502)
+            except httpx.TimeoutException as e:
+                breaker.record_failure()
+                recorded = True
+                self._count_upstream_error(fico_config, "timeout")
+                logger.error(f"Timeout routing to Fico {fico_config.url}: {e}")
+                raise UpstreamError("Fico platform timed out", 504)
+            except httpx.HTTPError as e:
+                breaker.record_failure()
+                recorded = True
+                self._count_upstream_error(fico_config, "http")
+                logger.error(f"Error routing to Fico {fico_config.url}: {e}")
+                raise UpstreamError("Error communicating with Fico platform", 502)
+            finally:
+                if not recorded:
+                    breaker.release()
             
-            response = await self.http_client.post(
-                fico_config.url,
-                json=request_data.get("body", {}),
-                headers=headers
-            )
+            metrics.UPSTREAM_RESPONSES.labels(
+                fico_config.product_code, fico_config.version, str(response.status_code)
+            ).inc()
             
-            return {
-                "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "body": response.json() if response.content else {}
-            }
+            if response.status_code in retryable_status_codes and self._can_retry(attempt, retry_budget):
+                if stream:
+                    await response.aclose()
+                attempt += 1
+                await asyncio.sleep(self._retry_delay(attempt))
+                continue
             
-        except Exception as e:
-            logger.error(f"Error routing to Fico: {e}")
-            return {
-                "status_code": 200,
-                "headers": {"Content-Type": "application/json"},
-                "body": {
-                    "message": "Mock response from Fico platform",
-                    "processed": True,
-                    "original_request": request_data.get("body", {})
-                }
-            }
+            if response.status_code == 401:
+                # Same credentials, so a token endpoint that just failed is not called again any sooner
+                token_manager.invalidate(fico_config.product_code, fico_config.version, clear_backoff=False)
+            
+            return response
 
-    async def _get_auth_token(self, fico_config: FicoEnvironmentConfig) -> str:
-        """Get authentication token from Fico platform"""
+    async def _send_to_fico(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                            stream: bool = False) -> httpx.Response:
+        started = time.perf_counter()
+        auth_token = await self._get_auth_token(fico_config)
+        authenticated = time.perf_counter()
+        metrics.observe_stage(metrics.STAGE_AUTH, fico_config.product_code, fico_config.version,
+                              authenticated - started)
+        
+        headers = {
+            "Authorization": f"Bearer {auth_token}",
+            "Content-Type": "application/json"
+        }
+        headers.update(request_data.get("headers", {}))
+        
         try:
-            auth_response = await self.http_client.post(
-                fico_config.authentication_url,
-                data={
-                    "client_id": fico_config.client_id,
-                    "client_secret": fico_config.secret,
-                    "grant_type": "client_credentials"
-                }
+            return await self.upstream_pool.post(
+                fico_config.url,
+                stream=stream,
+                content=gateway_json.dumps(request_data.get("body", {})),
+                headers=headers
             )
-            
-            if auth_response.status_code == 200:
-                auth_data = auth_response.json()
-                return auth_data.get("access_token", "mock_token")
-            
+        finally:
+            metrics.observe_stage(metrics.STAGE_UPSTREAM, fico_config.product_code, fico_config.version,
+                                  time.perf_counter() - authenticated)
+
+    def _record_request(self, request_data: Dict[str, Any], fields: Optional[RequestFields],
+                        fico_config: Optional[FicoRoute], response: Dict[str, Any], status_code: int,
+                        received_at: datetime, seconds: float):
+        """Observe request metrics and queue the FR-AG-007 access log entry.
+
+        fields is None when the request failed before they were extracted.
+        """
+        if fico_config:
+            labels = (fico_config.product_code, fico_config.version)
+        else:
+            labels = (metrics.UNKNOWN, metrics.UNKNOWN)
+        metrics.REQUEST_DURATION.labels(*labels, str(status_code)).observe(seconds)
+        
+        if fields is None:
+            fields = self._extract_fields(request_data.get("body", {}))
+        bom_version_id = fields.bom_version_id
+        product_id, subproduct_id = self._product_key(fields)
+        access_log_writer.record({
+            "request_timestamp": received_at,
+            "bom_version_id": str(bom_version_id)[:200] if bom_version_id else None,
+            "product_code": fico_config.product_code if fico_config else None,
+            "version": fico_config.version if fico_config else None,
+            "product_id": str(product_id)[:50],
+            "subproduct_id": str(subproduct_id)[:50],
+            "routing_path": fico_config.url if fico_config else None,
+            "status_code": status_code,
+            "upstream_status_code": response.get("status_code"),
+            "duration_ms": round(seconds * 1000, 3),
+            "error": response.get("error")
+        })
+
+    def _count_upstream_error(self, fico_config: FicoRoute, error: str):
+        metrics.UPSTREAM_ERRORS.labels(fico_config.product_code, fico_config.version, error).inc()
+
+    def _has_idempotency_key(self, request_data: Dict[str, Any]) -> bool:
+        """Whether the request forwards an Idempotency-Key to Fico"""
+        return any(header.lower() == IDEMPOTENCY_KEY_HEADER for header in (request_data.get("headers") or {}))
+
+    def _can_retry(self, attempt: int, retry_budget: RetryBudget) -> bool:
+        return attempt < self.max_retries and retry_budget.try_acquire()
+
+    def _retry_delay(self, attempt: int) -> float:
+        # Full jitter keeps retries from many workers from arriving in lockstep
+        return random.uniform(0, self.retry_backoff * (2 ** (attempt - 1)))
+
+    def _decode_body(self, response: httpx.Response) -> Any:
+        if not response.content:
+            return {}
+        raw_body = gateway_json.upstream_body(response.content, response.headers.get("content-type", ""))
+        if raw_body is not None:
+            return raw_body
+        try:
+            return response.json()
+        except ValueError:
+            return {"content": response.text}
+
+    async def _get_auth_token(self, fico_config: FicoRoute) -> str:
+        """Get authentication token from Fico platform, reusing cached tokens"""
+        key = (fico_config.product_code, fico_config.version, fico_config.client_id)
+        authentication_url = fico_config.authentication_url
+        client_id = fico_config.client_id
+        secret = fico_config.secret
+        
+        async def fetch() -> Tuple[str, int]:
+            return await self._fetch_auth_token(authentication_url, client_id, secret)
+        
+        try:
+            return await token_manager.get_token(key, fetch)
         except Exception as e:
+            # Sending the request without a token would only earn a 401
+            self._count_upstream_error(fico_config, "auth")
             logger.error(f"Authentication error: {e}")
+            raise UpstreamError("Fico authentication failed", 502)
+
+    async def _fetch_auth_token(self, authentication_url: str, client_id: str, secret: str) -> Tuple[str, int]:
+        """Call the Fico token endpoint and return (access_token, expires_in)"""
+        auth_response = await self.upstream_pool.post(
+            authentication_url,
+            data={
+                "client_id": client_id,
+                "client_secret": secret,
+                "grant_type": "client_credentials"
+            }
+        )
+        
+        if auth_response.status_code != 200:
+            raise ValueError(f"Token endpoint returned {auth_response.status_code}")
         
-        return "mock_auth_token"
+        auth_data = auth_response.json()
+        return auth_data.get("access_token", "mock_token"), int(auth_data.get("expires_in") or 0)
 
 gateway_service = GatewayService()
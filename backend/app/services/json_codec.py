@@ -0,0 +1,88 @@
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+import orjson
+from fastapi import Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from app.schemas import GatewayRequest
+from app.config import settings
+
+# First and last byte of a JSON object or array
+JSON_DOCUMENT_EDGES = (b"{}", b"[]")
+
+class GatewayJSONCodec:
+    """JSON handling for the gateway endpoints.
+
+    In fast mode orjson is used throughout, request bodies are checked by hand
+    instead of through GatewayRequest, and JSON responses from Fico are passed
+    through as raw bytes (orjson.Fragment) rather than decoded and re-encoded.
+    """
+
+    def __init__(self, fast: bool):
+        self.fast = fast
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return orjson.loads(data) if self.fast else json.loads(data)
+        except ValueError as e:
+            raise RequestValidationError([{
+                "type": "json_invalid", "loc": ("body",), "msg": f"JSON decode error: {e}", "input": {}
+            }])
+
+    def dumps(self, content: Any) -> bytes:
+        return orjson.dumps(content) if self.fast else json.dumps(content).encode()
+
+    def response(self, content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+        return Response(content=self.dumps(content), status_code=status_code, headers=headers,
+                        media_type="application/json")
+
+    def upstream_body(self, content: bytes, content_type: str) -> Any:
+        """The Fico response body, or None when it has to be decoded the slow way"""
+        if self.fast and content and "json" in content_type:
+            # Fico declared JSON. Its bytes are embedded verbatim, unparsed, if they are bracketed
+            # like an object or array, which catches truncated and mislabelled (HTML error) bodies
+            edges = content[:1] + content[-1:]
+            if edges not in JSON_DOCUMENT_EDGES:
+                content = content.strip()
+                edges = content[:1] + content[-1:]
+            if edges in JSON_DOCUMENT_EDGES:
+                return orjson.Fragment(content)
+        return None
+
+    def parse_request(self, payload: Any, loc: tuple = ("body",)) -> Dict[str, Any]:
+        """A GatewayRequest-shaped dict, raising RequestValidationError like FastAPI would"""
+        if not self.fast:
+            try:
+                return GatewayRequest.model_validate(payload).model_dump()
+            except ValidationError as e:
+                raise RequestValidationError([{**error, "loc": loc + tuple(error["loc"])} for error in e.errors()])
+
+        errors: List[Dict[str, Any]] = []
+        if not isinstance(payload, dict):
+            raise RequestValidationError([
+                {"type": "dict_type", "loc": loc, "msg": "Input should be a valid dictionary", "input": payload}
+            ])
+        body = payload.get("body")
+        headers = payload.get("headers", {})
+        method = payload.get("method", "POST")
+        if "body" not in payload:
+            errors.append({"type": "missing", "loc": loc + ("body",), "msg": "Field required", "input": payload})
+        elif not isinstance(body, (dict, list)):
+            errors.append({"type": "dict_type", "loc": loc + ("body",),
+                           "msg": "Input should be a valid dictionary or list", "input": body})
+        if not isinstance(headers, dict) or not all(isinstance(value, str) for value in headers.values()):
+            errors.append({"type": "dict_type", "loc": loc + ("headers",),
+                           "msg": "Input should be a dictionary of strings", "input": headers})
+        if not isinstance(method, str):
+            errors.append({"type": "string_type", "loc": loc + ("method",),
+                           "msg": "Input should be a valid string", "input": method})
+        if errors:
+            raise RequestValidationError(errors)
+        return {"headers": headers, "body": body, "method": method}
+
+def canonical_digest(content: Any) -> str:
+    """SHA-256 of content serialised with sorted keys, so key order does not matter"""
+    return hashlib.sha256(orjson.dumps(content, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+gateway_json = GatewayJSONCodec(settings.gateway_fast_json)
@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+class LocalCache:
+    """Bounded in-process LRU cache with a per-entry TTL.
+
+    With max_bytes set, the sizes passed to set() are also kept under that
+    total, so caches of large values are bounded by memory as well as count.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, max_bytes: Optional[int] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self.bytes -= size
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def full(self) -> bool:
+        """Whether setting a new key would evict an entry that has not expired"""
+        with self._lock:
+            if len(self._entries) < self.max_entries:
+                return False
+            _, expires_at, _ = next(iter(self._entries.values()))
+            return time.monotonic() < expires_at
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def _pop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+class BoundedCounter:
+    """Per-key event counts that track at most max_keys distinct keys"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.total = 0
+        self._counts: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable):
+        with self._lock:
+            self.total += 1
+            if key in self._counts:
+                self._counts[key] += 1
+            elif len(self._counts) < self.max_keys:
+                # Keys beyond the cap still count towards total
+                self._counts[key] = 1
+
+    def discard(self, key: Hashable):
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def most_common(self, n: int) -> List[Tuple[Hashable, int]]:
+        with self._lock:
+            return sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:n]
@@ -0,0 +1,116 @@
+from typing import Dict, Tuple
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+
+# Labels used before a request has been matched to a configured Fico route, so
+# arbitrary client-supplied bomVersionIds cannot create unbounded series
+UNKNOWN = "unknown"
+
+# Hot-path stages are mostly sub-millisecond, so the buckets start well below
+# the prometheus_client defaults
+STAGE_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+STAGE_EXTRACT = "extract_bom_version_id"
+STAGE_CONFIG_LOOKUP = "config_lookup"
+STAGE_AUGMENT = "parameter_augmentation"
+STAGE_AUTH = "auth_token"
+STAGE_UPSTREAM = "upstream_call"
+
+REQUEST_DURATION = Histogram(
+    "gateway_request_duration_seconds",
+    "End-to-end gateway processing time per request",
+    ["product_code", "version", "status_code"],
+    buckets=STAGE_BUCKETS
+)
+STAGE_DURATION = Histogram(
+    "gateway_stage_duration_seconds",
+    "Time spent in each stage of the gateway hot path",
+    ["stage", "product_code", "version"],
+    buckets=STAGE_BUCKETS
+)
+CACHE_LOOKUPS = Counter(
+    "gateway_parameter_cache_lookups_total",
+    "Parameter cache lookups by tier and result",
+    ["tier", "result"]
+)
+NEGATIVE_LOOKUPS = Counter(
+    "gateway_negative_lookups_total",
+    "Lookups answered as known-absent: unknown routes and products without parameters",
+    ["kind"]
+)
+RESPONSE_CACHE_LOOKUPS = Counter(
+    "gateway_response_cache_lookups_total",
+    "Fico response cache lookups and stores per environment",
+    ["product_code", "version", "result"]
+)
+COALESCED_REQUESTS = Counter(
+    "gateway_coalesced_requests_total",
+    "Requests that shared an identical in-flight Fico call instead of making their own",
+    ["product_code", "version"]
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "gateway_admission_queue_depth",
+    "Requests waiting for a concurrency slot per Fico environment",
+    ["product_code", "version"]
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "gateway_admission_in_flight",
+    "Admitted requests currently holding a concurrency slot per Fico environment",
+    ["product_code", "version"]
+)
+ADMISSION_REJECTIONS = Counter(
+    "gateway_admission_rejections_total",
+    "Requests shed by admission control per Fico environment and reason",
+    ["product_code", "version", "reason"]
+)
+ROUTING_RULE_REQUESTS = Counter(
+    "gateway_routing_rule_requests_total",
+    "Requests routed by a weighted routing rule, per rule and chosen target",
+    ["rule", "product_code", "version"]
+)
+SHADOW_COMPARISONS = Counter(
+    "gateway_shadow_comparisons_total",
+    "Mirrored requests per shadow environment and how its response compared",
+    ["product_code", "version", "result"]
+)
+SHADOW_DURATION = Histogram(
+    "gateway_shadow_duration_seconds",
+    "Fico call time for mirrored requests per shadow environment",
+    ["product_code", "version"],
+    buckets=STAGE_BUCKETS
+)
+UPSTREAM_RESPONSES = Counter(
+    "gateway_upstream_responses_total",
+    "Responses received from Fico by status code",
+    ["product_code", "version", "status_code"]
+)
+UPSTREAM_ERRORS = Counter(
+    "gateway_upstream_errors_total",
+    "Fico calls that failed without a response",
+    ["product_code", "version", "error"]
+)
+
+# Cache tiers are fixed, so their children are bound once instead of per lookup
+LOCAL_CACHE_HIT = CACHE_LOOKUPS.labels("local", "hit")
+LOCAL_CACHE_MISS = CACHE_LOOKUPS.labels("local", "miss")
+REDIS_CACHE_HIT = CACHE_LOOKUPS.labels("redis", "hit")
+REDIS_CACHE_MISS = CACHE_LOOKUPS.labels("redis", "miss")
+NEGATIVE_PARAMETERS = NEGATIVE_LOOKUPS.labels("parameters")
+NEGATIVE_ROUTE = NEGATIVE_LOOKUPS.labels("route")
+
+_stage_children: Dict[Tuple[str, str, str], Histogram] = {}
+
+def observe_stage(stage: str, product_code: str, version: str, seconds: float):
+    """Record one stage timing, reusing the labelled child after its first use"""
+    key = (stage, product_code, version)
+    child = _stage_children.get(key)
+    if child is None:
+        child = STAGE_DURATION.labels(stage, product_code, version)
+        _stage_children[key] = child
+    child.observe(seconds)
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Current metrics in the Prometheus text exposition format"""
+    return generate_latest(), CONTENT_TYPE_LATEST
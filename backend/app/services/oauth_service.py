@@ -19,7 +19,7 @@ MOCK_USERS = {
 }
 
 @oauth_app.post("/oauth/authorize")
-async def authorize(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
+def authorize(email: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
     if email not in MOCK_USERS or MOCK_USERS[email]["password"] != password:
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
@@ -49,7 +49,7 @@ async def authorize(email: str = Form(...), password: str = Form(...), db: Sessi
     return {"authorization_code": auth_code}
 
 @oauth_app.post("/oauth/token")
-async def get_token(authorization_code: str = Form(...), db: Session = Depends(get_db)):
+def get_token(authorization_code: str = Form(...), db: Session = Depends(get_db)):
     try:
         payload = jwt.decode(authorization_code, settings.secret_key, algorithms=[settings.algorithm])
         user = db.query(User).filter(User.user_id == payload["user_id"]).first()
@@ -76,7 +76,7 @@ async def get_token(authorization_code: str = Form(...), db: Session = Depends(g
         raise HTTPException(status_code=401, detail="Invalid authorization code")
 
 @oauth_app.get("/oauth/userinfo")
-async def get_userinfo(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def get_userinfo(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
     try:
         payload = jwt.decode(credentials.credentials, settings.secret_key, algorithms=[settings.algorithm])
         user = db.query(User).filter(User.user_id == payload["user_id"]).first()
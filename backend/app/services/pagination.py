@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query, Session
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the sort key of the last row on a page"""
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, order_columns: Sequence[Any]) -> List[Any]:
+    """Inverse of encode_cursor; raises ValueError for malformed cursors"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(order_columns):
+            raise ValueError("wrong number of values")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(order_columns, values)
+        ]
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> List[str]:
+    """Fields requested as a comma-separated list, or all allowed fields when none are given"""
+    if not fields:
+        return list(allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+def keyset_page(query: Query, order_columns: Sequence[Any], descending: bool,
+                cursor: Optional[str], limit: Optional[int]) -> Tuple[List[Any], Optional[str]]:
+    """Rows after cursor in order_columns order, and the cursor for the next page.
+
+    order_columns must identify a row uniquely. Without a limit every
+    remaining row is returned.
+    """
+    if cursor:
+        after = tuple_(*order_columns)
+        values = tuple_(*decode_cursor(cursor, order_columns))
+        query = query.filter(after < values if descending else after > values)
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in order_columns])
+    if limit is None:
+        return query.all(), None
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in order_columns])
+
+def project_page(db: Session, model, fields: List[str], filters: Sequence[Any], order_columns: Sequence[Any],
+                 descending: bool, cursor: Optional[str],
+                 limit: Optional[int]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """A keyset page of model rows as JSON-ready dicts holding only the requested fields.
+
+    Only the needed columns are selected, and rows skip ORM and Pydantic
+    object construction.
+    """
+    selected = list(dict.fromkeys(fields + [column.key for column in order_columns]))
+    wanted = set(fields)
+    query = db.query(*[getattr(model, field) for field in selected]).filter(*filters)
+    rows, next_cursor = keyset_page(query, order_columns, descending, cursor, limit)
+    items = [
+        {
+            field: value.isoformat() if isinstance(value, datetime) else value
+            for field, value in zip(selected, row) if field in wanted
+        }
+        for row in rows
+    ]
+    return items, next_cursor
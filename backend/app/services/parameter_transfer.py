@@ -0,0 +1,174 @@
+import codecs
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, Iterator, Set
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app.models import ConfigurableParameters, ChangeLog
+from app.schemas import ConfigurableParametersCreate, ConfigurableParametersResponse
+from app.database import SessionLocal, AsyncSessionLocal
+from app.services.cache_service import cache_service
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = list(ConfigurableParametersResponse.model_fields)
+MAX_REPORTED_ERRORS = 100
+
+class ParameterImportError(Exception):
+    """The import was rolled back; errors lists the offending lines"""
+
+    def __init__(self, message: str, status_code: int, errors: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.errors = errors or []
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def _iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """(line number, raw record) pairs; CSV records may not span lines"""
+    header = None
+    line_number = 0
+    async for line in _iter_lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, e
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        # Empty CSV cells mean "not set", e.g. an open-ended effective_to
+        yield line_number, {name: value for name, value in zip(header, values) if value != ""}
+
+async def import_parameters(chunks: AsyncIterator[bytes], fmt: str, user_id: str) -> Dict[str, Any]:
+    """Validate and insert streamed parameters in a single transaction.
+
+    Rows are validated against ConfigurableParametersCreate and inserted
+    chunk by chunk, each with a pending ChangeLog entry. Any invalid row or
+    key conflict rolls back the whole import.
+    """
+    chunk_size = settings.parameter_import_chunk_size
+    errors: List[Dict[str, Any]] = []
+    affected: Set[Tuple[str, str]] = set()
+    imported = 0
+    now = datetime.utcnow()
+    parameters: List[Dict[str, Any]] = []
+    change_logs: List[Dict[str, Any]] = []
+
+    async with AsyncSessionLocal() as session:
+        async def flush():
+            if parameters:
+                await session.execute(insert(ConfigurableParameters), parameters)
+                await session.execute(insert(ChangeLog), change_logs)
+                parameters.clear()
+                change_logs.clear()
+
+        try:
+            async with session.begin():
+                async for line_number, record in _iter_records(chunks, fmt):
+                    if isinstance(record, Exception) or not isinstance(record, dict):
+                        errors.append({"line": line_number, "error": "Invalid JSON object"})
+                        continue
+                    record.setdefault("created_by", user_id)
+                    try:
+                        parameter = ConfigurableParametersCreate.model_validate(record)
+                    except ValidationError as e:
+                        errors.append({"line": line_number, "error": "; ".join(
+                            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+                        )})
+                        continue
+                    if errors:
+                        # Keep validating to report every bad row, but stop writing
+                        continue
+
+                    row = parameter.model_dump()
+                    row.update(created_by=user_id, created_on=now, status="PENDING_APPROVAL")
+                    parameters.append(row)
+                    change_logs.append({
+                        "table_name": "configurable_parameters",
+                        "record_id": f"{row['product_id']}:{row['subproduct_id']}:{row['component']}:{row['parameter']}",
+                        "field_name": "value",
+                        "old_value": None,
+                        "new_value": row["value"],
+                        "changed_by": user_id,
+                        "change_timestamp": now,
+                        "status": "PENDING_APPROVAL",
+                        "comments": "Bulk import"
+                    })
+                    affected.add((row["product_id"], row["subproduct_id"]))
+                    imported += 1
+                    if len(parameters) >= chunk_size:
+                        await flush()
+
+                if errors:
+                    raise ParameterImportError(
+                        f"{len(errors)} invalid rows, nothing imported", 422, errors[:MAX_REPORTED_ERRORS]
+                    )
+                await flush()
+        except IntegrityError as e:
+            logger.error(f"Parameter import conflict: {e.orig}")
+            raise ParameterImportError("Import contains parameters that already exist or repeat a key", 409)
+
+    for product_id, subproduct_id in affected:
+        cache_service.invalidate_cache(product_id, subproduct_id)
+
+    return {"imported": imported, "invalidated": len(affected)}
+
+def export_parameters(fmt: str, product_id: Optional[str] = None, subproduct_id: Optional[str] = None,
+                      status: Optional[str] = None) -> Iterator[str]:
+    """Stream parameters as CSV or NDJSON, reading them from the database in batches"""
+    batch_size = settings.parameter_import_chunk_size
+    db = SessionLocal()
+    try:
+        query = db.query(*[getattr(ConfigurableParameters, field) for field in EXPORT_FIELDS])
+        if product_id:
+            query = query.filter(ConfigurableParameters.product_id == product_id)
+        if subproduct_id:
+            query = query.filter(ConfigurableParameters.subproduct_id == subproduct_id)
+        if status:
+            query = query.filter(ConfigurableParameters.status == status)
+        rows = query.order_by(
+            ConfigurableParameters.product_id, ConfigurableParameters.subproduct_id,
+            ConfigurableParameters.component, ConfigurableParameters.parameter
+        ).yield_per(batch_size)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt == "csv":
+            writer.writerow(EXPORT_FIELDS)
+
+        for count, row in enumerate(rows, 1):
+            values = [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            if fmt == "csv":
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, values))) + "\n")
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
@@ -0,0 +1,162 @@
+import hashlib
+from typing import Dict, Any, NamedTuple, Optional, Mapping, Tuple
+import orjson
+from app.database import get_async_redis
+from app.services.local_cache import LocalCache
+from app.services.routing_service import FicoRoute
+from app.services.json_codec import gateway_json, canonical_digest
+from app.services import metrics
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "idempotency-key"
+# Cache-Control directives that make a request skip the response cache
+BYPASS_DIRECTIVES = {"no-cache", "no-store"}
+
+class IdempotencyKeyReused(Exception):
+    """An Idempotency-Key was sent again with a different request body"""
+
+class ResponseCacheKey(NamedTuple):
+    """Where a request's response is cached, and the digest of the body it was cached for"""
+    key: str
+    body_digest: str
+
+def _find_header(name: str, *sources: Optional[Mapping[str, str]]) -> Optional[str]:
+    for headers in sources:
+        if not headers:
+            continue
+        for header, value in headers.items():
+            if header.lower() == name:
+                return value
+    return None
+
+class ResponseCache:
+    """Caches successful Fico responses for configs with a response_cache_ttl.
+
+    Entries are keyed by the caller's Idempotency-Key when present, otherwise
+    by a hash of the canonical augmented request body, and are scoped to the
+    Fico config and the headers forwarded to Fico. Idempotency-Keys are also
+    scoped to the caller, and reusing one with a different body raises
+    IdempotencyKeyReused instead of returning the first body's response. A
+    local LRU tier sits in front of Redis, bounded by the encoded size of its
+    responses as well as their number.
+    """
+
+    def __init__(self):
+        self.redis_client = get_async_redis()
+        self.max_body_bytes = settings.response_cache_max_body_bytes
+        self.local_cache = LocalCache(
+            settings.response_cache_max_entries, settings.local_cache_ttl, settings.response_cache_max_local_bytes
+        )
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def cache_key(self, fico_config: FicoRoute, request_data: Dict[str, Any],
+                  client_headers: Optional[Mapping[str, str]] = None,
+                  caller: Optional[str] = None) -> Optional[ResponseCacheKey]:
+        """Key for an augmented request, or None if it is not to be cached.
+
+        Headers are looked up on the HTTP request first, then in the headers
+        the caller asked to forward to Fico.
+        """
+        if not fico_config.response_cache_ttl:
+            return None
+        sources = (client_headers, request_data.get("headers"))
+        cache_control = _find_header("cache-control", *sources) or ""
+        if BYPASS_DIRECTIVES.intersection(directive.strip().lower() for directive in cache_control.split(",")):
+            self._count(fico_config, "bypassed")
+            return None
+
+        body_digest = canonical_digest(request_data.get("body"))
+        headers_digest = canonical_digest(request_data.get("headers") or {})
+        idempotency_key = _find_header(IDEMPOTENCY_KEY_HEADER, *sources)
+        if idempotency_key:
+            scope = orjson.dumps([idempotency_key, caller, headers_digest])
+            digest = "idem:" + hashlib.sha256(scope).hexdigest()
+        else:
+            digest = f"body:{body_digest}:{headers_digest}"
+        return ResponseCacheKey(f"resp:{fico_config.product_code}:{fico_config.version}:{digest}", body_digest)
+
+    async def get(self, fico_config: FicoRoute, cache_key: ResponseCacheKey) -> Optional[Dict[str, Any]]:
+        """The cached response, or None; raises IdempotencyKeyReused if it was cached for another body"""
+        entry = self.local_cache.get(cache_key.key)
+        if entry is None:
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(cache_key.key)
+                    pipe.pttl(cache_key.key)
+                    cached_data, ttl_ms = await pipe.execute()
+            except Exception as e:
+                logger.error(f"Response cache read failed: {e}")
+                cached_data = None
+            if cached_data:
+                entry = self._decode(cached_data)
+                self.local_cache.set(cache_key.key, entry, self._local_ttl(fico_config, ttl_ms), len(cached_data))
+
+        if entry is None:
+            self._count(fico_config, "misses")
+            return None
+        response, body_digest = entry
+        if body_digest != cache_key.body_digest:
+            self._count(fico_config, "key_reused")
+            raise IdempotencyKeyReused("Idempotency-Key was already used with a different request body")
+        self._count(fico_config, "hits")
+        return response
+
+    async def set(self, fico_config: FicoRoute, cache_key: ResponseCacheKey, response: Dict[str, Any]):
+        """Cache a successful response; errors and oversized bodies are not cached"""
+        if not 200 <= response["status_code"] < 300:
+            return
+        cached_data = self._encode(response, cache_key.body_digest)
+        if len(cached_data) > self.max_body_bytes:
+            self._count(fico_config, "too_large")
+            return
+
+        self.local_cache.set(
+            cache_key.key, (response, cache_key.body_digest), self._local_ttl(fico_config), len(cached_data)
+        )
+        try:
+            await self.redis_client.setex(cache_key.key, fico_config.response_cache_ttl, cached_data)
+            self._count(fico_config, "stored")
+        except Exception as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        environments = {}
+        for environment, counts in self.stats.items():
+            lookups = counts["hits"] + counts["misses"]
+            environments[environment] = {**counts, "hit_ratio": counts["hits"] / lookups if lookups else 0.0}
+        return {"local": self.local_cache.get_stats(), "environments": environments}
+
+    def _count(self, fico_config: FicoRoute, result: str):
+        environment = f"{fico_config.product_code}:{fico_config.version}"
+        counts = self.stats.get(environment)
+        if counts is None:
+            counts = self.stats[environment] = {
+                "hits": 0, "misses": 0, "bypassed": 0, "stored": 0, "too_large": 0, "key_reused": 0
+            }
+        counts[result] += 1
+        metrics.RESPONSE_CACHE_LOOKUPS.labels(fico_config.product_code, fico_config.version, result).inc()
+
+    def _encode(self, response: Dict[str, Any], body_digest: str) -> str:
+        # Status, headers and request body digest on the first line, then the body exactly as it is relayed
+        head = orjson.dumps([response["status_code"], response["headers"], body_digest])
+        return (head + b"\n" + gateway_json.dumps(response["body"])).decode()
+
+    def _decode(self, cached_data: str) -> Tuple[Dict[str, Any], str]:
+        head, _, body = cached_data.partition("\n")
+        status_code, headers, body_digest = orjson.loads(head)
+        body_bytes = body.encode()
+        raw_body = gateway_json.upstream_body(body_bytes, "application/json")
+        return {
+            "status_code": status_code,
+            "headers": headers,
+            "body": raw_body if raw_body is not None else gateway_json.loads(body_bytes)
+        }, body_digest
+
+    def _local_ttl(self, fico_config: FicoRoute, ttl_ms: int = -1) -> float:
+        ttl = fico_config.response_cache_ttl if ttl_ms < 0 else ttl_ms / 1000
+        return min(ttl, self.local_cache.ttl)
+
+response_cache = ResponseCache()
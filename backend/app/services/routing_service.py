@@ -0,0 +1,235 @@
+import asyncio
+import json
+import random
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple, Optional
+from sqlalchemy.orm import Session
+from app.models import FicoEnvironmentConfig, FicoRoutingRule
+from app.database import SessionLocal
+from app.services.local_cache import BoundedCounter
+from app.services import metrics
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class FicoRoute:
+    """Immutable snapshot of an ACTIVE FicoEnvironmentConfig row"""
+    product_code: str
+    version: str
+    url: str
+    authentication_url: str
+    client_id: str
+    secret: str
+    # Seconds to cache successful responses for; 0 disables the response cache
+    response_cache_ttl: int = 0
+
+@dataclass(frozen=True)
+class RoutingRule:
+    """Compiled ACTIVE FicoRoutingRule: weighted targets and an optional shadow environment"""
+    product_code: str
+    version: str
+    targets: Tuple[Tuple[FicoRoute, int], ...]
+    total_weight: int
+    shadow: Optional[FicoRoute] = None
+    shadow_sample_rate: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return f"{self.product_code}:{self.version}"
+
+    def pick(self, sticky_key: Optional[Any] = None) -> Optional[FicoRoute]:
+        """A target by weight; the same sticky_key always lands on the same target"""
+        if not self.targets:
+            return None
+        if sticky_key is None:
+            point = random.randrange(self.total_weight)
+        else:
+            point = zlib.crc32(str(sticky_key).encode()) % self.total_weight
+        for route, weight in self.targets:
+            if point < weight:
+                return route
+            point -= weight
+        return self.targets[-1][0]
+
+@dataclass(frozen=True)
+class RoutingSnapshot:
+    """One generation of the routing table, published with a single assignment"""
+    routes: Dict[Tuple[str, str], FicoRoute]
+    rules: Dict[Tuple[str, str], RoutingRule]
+    generation: int
+
+class RoutingTable:
+    """In-process table of ACTIVE Fico configs keyed by (product_code, version).
+
+    ACTIVE routing rules are compiled alongside, so a (product_code, version)
+    can be split across several configs and mirrored to a shadow config.
+    """
+
+    def __init__(self):
+        self.refresh_interval = settings.routing_table_refresh_interval
+        self._snapshot = RoutingSnapshot({}, {}, 0)
+        # Serialises loads from the refresh thread and admin endpoints
+        self._load_lock = threading.Lock()
+        # Lookups for unconfigured routes, to spot callers sending bad bomVersionIds
+        self.unknown_lookups = BoundedCounter(settings.negative_cache_tracked_keys)
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def generation(self) -> int:
+        return self._snapshot.generation
+
+    def resolve(self, product_code: str, version: str,
+                sticky_key: Optional[Any] = None) -> Tuple[Optional[FicoRoute], Optional[RoutingRule]]:
+        """The route to call for a requested (product_code, version), and the rule that chose it.
+
+        Without a rule, or with a shadow-only rule, the requested route itself
+        is used. Lookups never do any I/O: misses never reach the database, so
+        unknown routes need no negative cache entry; they are only counted.
+        """
+        # Read once, so the route and rule come from the same table generation
+        snapshot = self._snapshot
+        rule = snapshot.rules.get((product_code, version))
+        route = rule.pick(sticky_key) if rule else None
+        if route is None:
+            route = self._lookup(snapshot, product_code, version)
+        return route, rule
+
+    def _lookup(self, snapshot: RoutingSnapshot, product_code: str, version: str) -> Optional[FicoRoute]:
+        route = snapshot.routes.get((product_code, version))
+        if route is None:
+            metrics.NEGATIVE_ROUTE.inc()
+            self.unknown_lookups.add(f"{product_code}:{version}")
+        return route
+
+    def load(self, db: Session) -> int:
+        """Rebuild the table from the database and swap it in atomically.
+
+        Loads run one at a time, reading and publishing under the same lock,
+        so a slow load cannot publish what it read after a later load has
+        published something newer.
+        """
+        with self._load_lock:
+            routes = self._read_routes(db)
+            rules = self._compile_rules(db, routes)
+
+            current = self._snapshot
+            if routes == current.routes and rules == current.rules:
+                return current.generation
+
+            # One reference assignment, so readers see either the old or the new table
+            snapshot = self._snapshot = RoutingSnapshot(routes, rules, current.generation + 1)
+        for product_code, version in list(routes) + list(rules):
+            self.unknown_lookups.discard(f"{product_code}:{version}")
+        logger.info(f"Loaded {len(routes)} Fico routes and {len(rules)} routing rules "
+                    f"(generation {snapshot.generation})")
+        return snapshot.generation
+
+    def _read_routes(self, db: Session) -> Dict[Tuple[str, str], FicoRoute]:
+        configs = db.query(FicoEnvironmentConfig).filter(
+            FicoEnvironmentConfig.status == "ACTIVE"
+        ).all()
+        return {
+            (config.product_code, config.version): FicoRoute(
+                product_code=config.product_code,
+                version=config.version,
+                url=config.url,
+                authentication_url=config.authentication_url,
+                client_id=config.client_id,
+                secret=config.secret,
+                response_cache_ttl=config.response_cache_ttl or 0
+            )
+            for config in configs
+        }
+
+    def _compile_rules(self, db: Session,
+                       routes: Dict[Tuple[str, str], FicoRoute]) -> Dict[Tuple[str, str], RoutingRule]:
+        """Compile ACTIVE routing rules against routes, dropping targets that are not ACTIVE configs"""
+        rules = {}
+        for row in db.query(FicoRoutingRule).filter(FicoRoutingRule.status == "ACTIVE").all():
+            name = f"{row.product_code}:{row.version}"
+            targets = []
+            for target in json.loads(row.targets or "[]"):
+                route = routes.get((target["product_code"], target["version"]))
+                if route is None:
+                    logger.warning(f"Routing rule {name}: target {target['product_code']}:{target['version']} "
+                                   f"is not an ACTIVE Fico config, skipping it")
+                elif target["weight"] > 0:
+                    targets.append((route, int(target["weight"])))
+
+            shadow = None
+            if row.shadow_product_code and row.shadow_version:
+                shadow = routes.get((row.shadow_product_code, row.shadow_version))
+                if shadow is None:
+                    logger.warning(f"Routing rule {name}: shadow {row.shadow_product_code}:{row.shadow_version} "
+                                   f"is not an ACTIVE Fico config, not mirroring")
+
+            if targets or shadow:
+                rules[(row.product_code, row.version)] = RoutingRule(
+                    product_code=row.product_code,
+                    version=row.version,
+                    targets=tuple(targets),
+                    total_weight=sum(weight for _, weight in targets),
+                    shadow=shadow,
+                    shadow_sample_rate=(row.shadow_sample_rate or 0.0) if shadow else 0.0
+                )
+        return rules
+
+    def reload(self) -> int:
+        """Rebuild the table using a fresh session"""
+        db = SessionLocal()
+        try:
+            return self.load(db)
+        finally:
+            db.close()
+
+    def start_periodic_refresh(self):
+        """Periodically reload so changes applied on other workers converge"""
+        if self.refresh_interval > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop_periodic_refresh(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "generation": snapshot.generation,
+            "routes": sorted(f"{product_code}:{version}" for product_code, version in snapshot.routes),
+            "rules": {
+                rule.name: {
+                    "targets": [
+                        {"route": f"{route.product_code}:{route.version}", "weight": weight}
+                        for route, weight in rule.targets
+                    ],
+                    "shadow": f"{rule.shadow.product_code}:{rule.shadow.version}" if rule.shadow else None,
+                    "shadow_sample_rate": rule.shadow_sample_rate
+                }
+                for rule in snapshot.rules.values()
+            },
+            "unknown_lookups": {
+                "total": self.unknown_lookups.total,
+                "top_routes": [
+                    {"route": route, "lookups": lookups} for route, lookups in self.unknown_lookups.most_common(10)
+                ]
+            }
+        }
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"Routing table refresh failed: {e}")
+
+routing_table = RoutingTable()
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Set
+import orjson
+from app.services.routing_service import FicoRoute, RoutingRule
+from app.services.json_codec import gateway_json
+from app.services import metrics
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Differing top-level body fields listed per recorded diff
+MAX_DIFF_FIELDS = 20
+
+class ShadowMirror:
+    """Mirrors a sample of successful requests to a rule's shadow environment.
+
+    Mirrored calls run as background tasks after the caller has its
+    response, so they never add latency or errors to the primary path. At
+    most max_in_flight run at once; further samples are skipped rather than
+    queued. Each comparison records both latencies and which parts of the
+    response differed.
+    """
+
+    def __init__(self):
+        self.max_in_flight = settings.shadow_max_in_flight
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._diffs: Dict[str, deque] = {}
+
+    def mirror(self, rule: Optional[RoutingRule], primary: FicoRoute, response: Dict[str, Any], seconds: float,
+               call: Callable[[FicoRoute], Awaitable[Dict[str, Any]]]):
+        """Sample a request Fico answered from primary in seconds; call(shadow) repeats it against the shadow.
+
+        Only 2xx responses are mirrored.
+        """
+        if rule is None or rule.shadow is None or not 200 <= response["status_code"] < 300:
+            return
+        if random.random() >= rule.shadow_sample_rate:
+            return
+        if len(self._tasks) >= self.max_in_flight:
+            self._count(rule, "skipped")
+            return
+        task = asyncio.create_task(self._run(rule, primary, response, seconds, call))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def aclose(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        rules = {}
+        for name, stats in self._stats.items():
+            compared = stats["matched"] + stats["differed"]
+            rules[name] = {
+                **{key: value for key, value in stats.items() if not key.endswith("_seconds")},
+                "avg_primary_ms": round(stats["primary_seconds"] / compared * 1000, 3) if compared else None,
+                "avg_shadow_ms": round(stats["shadow_seconds"] / compared * 1000, 3) if compared else None,
+                "recent_diffs": list(self._diffs[name])
+            }
+        return {"in_flight": len(self._tasks), "max_in_flight": self.max_in_flight, "rules": rules}
+
+    async def _run(self, rule: RoutingRule, primary: FicoRoute, response: Dict[str, Any], seconds: float,
+                   call: Callable[[FicoRoute], Awaitable[Dict[str, Any]]]):
+        shadow = rule.shadow
+        started = time.perf_counter()
+        try:
+            shadow_response = await call(shadow)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Shadow call to {shadow.product_code}:{shadow.version} failed: {e}")
+            self._count(rule, "errors")
+            return
+        shadow_seconds = time.perf_counter() - started
+        metrics.SHADOW_DURATION.labels(shadow.product_code, shadow.version).observe(shadow_seconds)
+
+        fields = self._diff(response, shadow_response)
+        stats = self._count(rule, "differed" if fields else "matched")
+        stats["primary_seconds"] += seconds
+        stats["shadow_seconds"] += shadow_seconds
+        if fields:
+            self._diffs[rule.name].append({
+                "timestamp": datetime.utcnow().isoformat(),
+                "primary": f"{primary.product_code}:{primary.version}",
+                "status_codes": [response["status_code"], shadow_response["status_code"]],
+                "primary_ms": round(seconds * 1000, 3),
+                "shadow_ms": round(shadow_seconds * 1000, 3),
+                "fields": fields
+            })
+
+    def _diff(self, response: Dict[str, Any], shadow_response: Dict[str, Any]) -> List[str]:
+        """Which of status_code and the top-level body fields differ"""
+        fields = []
+        if response["status_code"] != shadow_response["status_code"]:
+            fields.append("status_code")
+        body, shadow_body = self._plain(response["body"]), self._plain(shadow_response["body"])
+        if isinstance(body, dict) and isinstance(shadow_body, dict):
+            fields.extend(sorted(
+                f"body.{key}" for key in body.keys() | shadow_body.keys() if body.get(key) != shadow_body.get(key)
+            )[:MAX_DIFF_FIELDS])
+        elif body != shadow_body:
+            fields.append("body")
+        return fields
+
+    def _plain(self, body: Any) -> Any:
+        # Passed-through Fico bodies are orjson Fragments, which only compare by identity. They are
+        # not checked to parse, and may hold integers orjson rejects, so the stdlib decodes them
+        if isinstance(body, orjson.Fragment):
+            raw = gateway_json.dumps(body)
+            try:
+                return json.loads(raw)
+            except ValueError:
+                return raw
+        return body
+
+    def _count(self, rule: RoutingRule, result: str) -> Dict[str, Any]:
+        stats = self._stats.get(rule.name)
+        if stats is None:
+            stats = self._stats[rule.name] = {
+                "shadow": f"{rule.shadow.product_code}:{rule.shadow.version}",
+                "mirrored": 0, "matched": 0, "differed": 0, "errors": 0, "skipped": 0,
+                "primary_seconds": 0.0, "shadow_seconds": 0.0
+            }
+            self._diffs[rule.name] = deque(maxlen=settings.shadow_recent_diffs)
+        stats[result] += 1
+        if result != "skipped":
+            stats["mirrored"] += 1
+        metrics.SHADOW_COMPARISONS.labels(rule.shadow.product_code, rule.shadow.version, result).inc()
+        return stats
+
+shadow_mirror = ShadowMirror()
@@ -0,0 +1,136 @@
+import asyncio
+import time
+from typing import Dict, Any, Tuple, Callable, Awaitable
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+TokenKey = Tuple[str, str, str]
+TokenFetcher = Callable[[], Awaitable[Tuple[str, int]]]
+
+class CachedToken:
+    def __init__(self, access_token: str, expires_in: int, refresh_margin: int):
+        now = time.monotonic()
+        self.access_token = access_token
+        self.expires_at = now + expires_in
+        # Short-lived tokens are refreshed halfway through their lifetime
+        self.refresh_at = self.expires_at - min(refresh_margin, expires_in / 2)
+
+class TokenManager:
+    """Caches Fico OAuth tokens per (product_code, version, client_id)"""
+
+    def __init__(self):
+        self.refresh_margin = settings.fico_token_refresh_margin
+        self.default_ttl = settings.fico_token_default_ttl
+        self.failure_backoff = settings.fico_token_failure_backoff
+        self._tokens: Dict[TokenKey, CachedToken] = {}
+        self._inflight: Dict[TokenKey, asyncio.Task] = {}
+        # Bumped by invalidate so a refresh that started before it is not cached
+        self._generations: Dict[TokenKey, int] = {}
+        # (retry_at, error) of the last failed refresh per key
+        self._failures: Dict[TokenKey, Tuple[float, str]] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    async def get_token(self, key: TokenKey, fetch: TokenFetcher) -> str:
+        """Return a valid token for key, fetching it at most once per lifetime"""
+        now = time.monotonic()
+        cached = self._tokens.get(key)
+
+        if cached and now < cached.expires_at:
+            self._count(key, "hits")
+            if now >= cached.refresh_at and not self._backing_off(key, now):
+                self._start_refresh(key, fetch, background=True)
+            return cached.access_token
+
+        self._count(key, "misses")
+        failure = self._failures.get(key) if self._backing_off(key, now) else None
+        if failure is not None:
+            # Fail fast instead of sending every request to a token endpoint that just failed
+            self._count(key, "backoff_rejections")
+            raise RuntimeError(f"Auth token refresh for {key[0]}:{key[1]} failed recently: {failure[1]}")
+        task = self._start_refresh(key, fetch)
+        # Shield so one cancelled caller does not cancel the shared refresh
+        cached = await asyncio.shield(task)
+        return cached.access_token
+
+    def invalidate(self, product_code: str, version: str, clear_backoff: bool = True):
+        """Drop cached tokens, in-flight refreshes and failure backoffs for a Fico environment
+
+        A refresh already in flight keeps running for the callers awaiting it,
+        but its token is not cached and the next caller starts a new one.
+        clear_backoff=False keeps a failure backoff that has not expired, for
+        when the credentials are unchanged and the token endpoint would fail
+        the same way.
+        """
+        keys = set(self._tokens) | set(self._inflight) | set(self._failures)
+        for key in keys:
+            if key[0] == product_code and key[1] == version:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._tokens.pop(key, None)
+                self._inflight.pop(key, None)
+                if clear_backoff:
+                    self._failures.pop(key, None)
+                logger.info(f"Invalidated auth token for {product_code}:{version}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/refresh counters per Fico environment"""
+        return {
+            "cached_tokens": len(self._tokens),
+            "inflight_refreshes": len(self._inflight),
+            "backing_off": sum(1 for key in self._failures if self._backing_off(key, time.monotonic())),
+            "environments": {env: dict(counters) for env, counters in self._stats.items()}
+        }
+
+    def _start_refresh(self, key: TokenKey, fetch: TokenFetcher, background: bool = False) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._refresh(key, fetch, self._generations.get(key, 0)))
+            task.add_done_callback(self._consume_result)
+            self._inflight[key] = task
+            if background:
+                self._count(key, "background_refreshes")
+        return task
+
+    async def _refresh(self, key: TokenKey, fetch: TokenFetcher, generation: int) -> CachedToken:
+        task = asyncio.current_task()
+        try:
+            access_token, expires_in = await fetch()
+            cached = CachedToken(access_token, expires_in or self.default_ttl, self.refresh_margin)
+            if self._generations.get(key, 0) != generation:
+                # Invalidated while fetching; the token may belong to replaced credentials
+                self._count(key, "superseded")
+                return cached
+            self._tokens[key] = cached
+            self._failures.pop(key, None)
+            self._count(key, "refreshes")
+            logger.info(f"Fetched auth token for {key[0]}:{key[1]} (expires in {expires_in}s)")
+            return cached
+        except Exception as e:
+            self._count(key, "failures")
+            if self._generations.get(key, 0) == generation:
+                self._failures[key] = (time.monotonic() + self.failure_backoff, str(e))
+            logger.error(f"Auth token refresh failed for {key[0]}:{key[1]}: {e}")
+            raise
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    def _backing_off(self, key: TokenKey, now: float) -> bool:
+        failure = self._failures.get(key)
+        return failure is not None and now < failure[0]
+
+    @staticmethod
+    def _consume_result(task: asyncio.Task):
+        # Background refreshes may have no awaiter; mark failures as retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def _count(self, key: TokenKey, counter: str):
+        counters = self._stats.setdefault(f"{key[0]}:{key[1]}", {
+            "hits": 0, "misses": 0, "refreshes": 0, "background_refreshes": 0, "failures": 0,
+            "superseded": 0, "backoff_rejections": 0
+        })
+        counters[counter] += 1
+
+token_manager = TokenManager()
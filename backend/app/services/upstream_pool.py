@@ -0,0 +1,100 @@
+import httpx
+from typing import Dict, Any
+from urllib.parse import urlsplit
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class UpstreamStats:
+    def __init__(self, max_connections: int):
+        self.max_connections = max_connections
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.pool_timeouts = 0
+        self.connect_errors = 0
+        self.read_timeouts = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_connections": self.max_connections,
+            "saturation": self.in_flight / self.max_connections if self.max_connections else 0.0,
+            "pool_timeouts": self.pool_timeouts,
+            "connect_errors": self.connect_errors,
+            "read_timeouts": self.read_timeouts
+        }
+
+class UpstreamPool:
+    """One httpx client, and so one connection pool, per upstream host"""
+
+    def __init__(self):
+        self.limits = httpx.Limits(
+            max_connections=settings.upstream_max_connections,
+            max_keepalive_connections=settings.upstream_max_keepalive_connections,
+            keepalive_expiry=settings.upstream_keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(
+            connect=settings.upstream_connect_timeout,
+            read=settings.upstream_read_timeout,
+            write=settings.upstream_write_timeout,
+            pool=settings.upstream_pool_timeout
+        )
+        self.http2 = settings.upstream_http2
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, UpstreamStats] = {}
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Return the pooled client for the host serving url"""
+        origin = self._origin(url)
+        client = self._clients.get(origin)
+        if client is None:
+            # HTTP/2 is negotiated through ALPN, so plain http:// upstreams stay on HTTP/1.1
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            self._clients[origin] = client
+            self._stats[origin] = UpstreamStats(settings.upstream_max_connections)
+            logger.info(f"Created upstream connection pool for {origin}")
+        return client
+
+    async def post(self, url: str, stream: bool = False, **kwargs) -> httpx.Response:
+        """POST through the host's pool, recording saturation and failures.
+
+        With stream=True the response is returned as soon as its headers
+        arrive; the caller must read or close it to release the connection.
+        """
+        client = self.client_for(url)
+        stats = self._stats[self._origin(url)]
+        stats.requests += 1
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            if stream:
+                return await client.send(client.build_request("POST", url, **kwargs), stream=True)
+            return await client.post(url, **kwargs)
+        except httpx.PoolTimeout:
+            stats.pool_timeouts += 1
+            raise
+        except httpx.ConnectError:
+            stats.connect_errors += 1
+            raise
+        except httpx.ReadTimeout:
+            stats.read_timeouts += 1
+            raise
+        finally:
+            stats.in_flight -= 1
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {origin: stats.as_dict() for origin, stats in self._stats.items()}
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Dict, Any, Optional
+from app.database import AsyncSessionLocal
+from app.services.cache_service import cache_service
+from app.services.routing_service import routing_table
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CacheWarmer:
+    """Preloads routes and parameter sets at startup and gates readiness on it.
+
+    Warm-up runs in the background so /healthz answers straight away, while
+    /readyz keeps traffic away until it has finished. A failed or timed-out
+    warm-up still marks the worker ready; requests then fall back to the
+    normal cache-miss path.
+    """
+
+    def __init__(self):
+        self.enabled = settings.warmup_enabled
+        self.concurrency = settings.warmup_concurrency
+        self.batch_size = settings.warmup_batch_size
+        self.timeout = settings.warmup_timeout
+        self.ready = not self.enabled
+        self.stats: Dict[str, Any] = {"routes": 0, "parameter_sets": 0, "duration": None, "error": None}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(self.warm(), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["error"] = f"timed out after {self.timeout}s"
+            logger.error(f"Cache warm-up timed out after {self.timeout}s")
+        except Exception as e:
+            self.stats["error"] = str(e)
+            logger.error(f"Cache warm-up failed: {e}")
+        finally:
+            self.stats["duration"] = time.monotonic() - started
+            self.ready = True
+        logger.info(f"Cache warm-up finished in {self.stats['duration']:.2f}s: {self.stats}")
+
+    async def warm(self):
+        """Load every ACTIVE parameter set into the Redis and local caches.
+
+        ACTIVE Fico configs are already in the routing table, which
+        startup_event loads before warm-up starts.
+        """
+        self.stats["routes"] = len(routing_table.get_stats()["routes"])
+
+        async with AsyncSessionLocal() as db:
+            entries = await cache_service.load_all_parameters_async(db)
+
+        # Pipelines of batch_size writes, at most concurrency of them in flight
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def write(batch):
+            async with semaphore:
+                await cache_service.set_many_cached_parameters_async(batch)
+                self.stats["parameter_sets"] += len(batch)
+
+        await asyncio.gather(*[
+            write(entries[offset:offset + self.batch_size])
+            for offset in range(0, len(entries), self.batch_size)
+        ])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "ready": self.ready, **self.stats}
+
+cache_warmer = CacheWarmer()
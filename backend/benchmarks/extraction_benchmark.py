@@ -0,0 +1,130 @@
+"""Microbenchmark for the request field extraction step of the gateway hot path.
+
+Times, per request and for each supported payload shape, the single pass
+of the compiled extraction rules (app.services.extraction) against the
+hard-coded probes they replaced, which routing, parameter augmentation and
+access logging each ran again. Also times bomVersionId parsing with and
+without its cache. Needs no services; results are printed as JSON.
+
+Usage (from backend/):
+
+    python -m benchmarks.extraction_benchmark
+    python -m benchmarks.extraction_benchmark --number 200000 --repeat 7
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from app.services.extraction import request_extractor, parse_bom_version_id
+
+PAYLOADS: Dict[str, Any] = {
+    "flat": {
+        "bomVersionId": "PLOR_v1.2", "productId": "CC", "subproductId": "PLATINUM",
+        "applicationId": "APP_000001", "requestType": "Scoring"
+    },
+    "nested_value": {
+        "requestType": "Scoring",
+        "value": {"bomVersionId": "PLOR_v1.2", "productId": "CC", "subproductId": "PLATINUM",
+                  "applicationId": "APP_000001"}
+    },
+    "application": {
+        "bomVersionId": "PLOR_v1.2", "applicationId": "APP_000001",
+        "application": {"productCode": "CC", "subProductCode": "PLATINUM"}
+    },
+    # FR-AG-002: a list of {name, value} entries
+    "name_value_list": [
+        {"name": "channel", "value": "WEB"},
+        {"name": "applicant", "value": {"firstName": "A", "lastName": "B", "income": 85000}},
+        {"name": "request", "value": {"bomVersionId": "PLOR_v1.2",
+                                      "application": {"productCode": "CC", "subProductCode": "PLATINUM"}}}
+    ]
+}
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Request field extraction microbenchmark")
+    parser.add_argument("--number", type=int, default=100000, help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs; the fastest is reported")
+    parser.add_argument("--output", type=Path, help="write the JSON report to this file")
+    return parser.parse_args(argv)
+
+def probe_bom_version_id(body: Any) -> Any:
+    """The hard-coded probes used before extraction rules, for comparison.
+
+    They only understand object bodies, so list bodies find nothing.
+    """
+    if not isinstance(body, dict):
+        return None
+    if "bomVersionId" in body:
+        return body["bomVersionId"]
+    if "value" in body and isinstance(body["value"], dict):
+        if "bomVersionId" in body["value"]:
+            return body["value"]["bomVersionId"]
+    if "data" in body and isinstance(body["data"], dict):
+        if "bomVersionId" in body["data"]:
+            return body["data"]["bomVersionId"]
+    return None
+
+def probe_product_info(body: Any) -> Tuple[Any, Any]:
+    if not isinstance(body, dict):
+        return "DEFAULT", "DEFAULT"
+    product_id = body.get("productId", "DEFAULT")
+    subproduct_id = body.get("subproductId", "DEFAULT")
+    if "value" in body and isinstance(body["value"], dict):
+        product_id = body["value"].get("productId", product_id)
+        subproduct_id = body["value"].get("subproductId", subproduct_id)
+    return product_id, subproduct_id
+
+def probe_application_id(body: Any) -> Any:
+    if not isinstance(body, dict):
+        return None
+    if "applicationId" in body:
+        return body["applicationId"]
+    if "value" in body and isinstance(body["value"], dict):
+        return body["value"].get("applicationId")
+    return None
+
+def probe_request(body: Any):
+    """The probes one request went through: routing, augmentation and the access log each re-read the body"""
+    probe_bom_version_id(body)
+    probe_application_id(body)
+    probe_product_info(body)
+    probe_bom_version_id(body)
+    probe_product_info(body)
+
+def time_call(call: Callable[[], Any], number: int, repeat: int) -> float:
+    """Fastest time per call in nanoseconds"""
+    return min(timeit.repeat(call, number=number, repeat=repeat)) / number * 1e9
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    extraction = {}
+    for shape, body in PAYLOADS.items():
+        extraction[shape] = {
+            "found": request_extractor.extract(body)._asdict(),
+            "compiled_ns": round(time_call(lambda: request_extractor.extract(body), args.number, args.repeat), 1),
+            "probes_ns": round(time_call(lambda: probe_request(body), args.number, args.repeat), 1)
+        }
+
+    bom_version_id = "PLOR_v1.2"
+    uncached = parse_bom_version_id.__wrapped__
+    parsing = {
+        "cached_ns": round(time_call(lambda: parse_bom_version_id(bom_version_id), args.number, args.repeat), 1),
+        "uncached_ns": round(time_call(lambda: uncached(bom_version_id), args.number, args.repeat), 1)
+    }
+    return {
+        "config": {"number": args.number, "repeat": args.repeat, "python": sys.version.split()[0]},
+        "extraction": extraction,
+        "parse_bom_version_id": parsing
+    }
+
+def main():
+    args = parse_args()
+    output = json.dumps(run(args), indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+
+if __name__ == "__main__":
+    main()
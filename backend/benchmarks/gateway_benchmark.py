@@ -0,0 +1,283 @@
+"""Load test and latency benchmark for the /gateway endpoint.
+
+Starts the mock Fico PLOR/DM services (with optional injected latency and
+errors) and the gateway as uvicorn subprocesses, seeds BENCH_* products
+through app.seed_data, then drives /gateway at a fixed request rate with
+bounded concurrency. Results are written as JSON and compared against a
+stored baseline; the exit code is 1 when a regression is detected.
+
+The seeded data goes into a throwaway SQLite database unless --database-url
+or --gateway-url is given. When it goes into a shared database, the BENCH_*
+rows are deleted again when the run ends.
+
+Usage (from backend/, with Redis available):
+
+    python -m benchmarks.gateway_benchmark --rps 200 --duration 30 --concurrency 64
+    python -m benchmarks.gateway_benchmark --save-baseline
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gateway latency benchmark")
+    parser.add_argument("--rps", type=float, default=100.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="measured run length in seconds")
+    parser.add_argument("--warmup", type=float, default=5.0, help="unmeasured warm-up in seconds")
+    parser.add_argument("--concurrency", type=int, default=50, help="maximum requests in flight")
+    parser.add_argument("--products", type=int, default=20, help="number of seeded products")
+    parser.add_argument("--parameters", type=int, default=10, help="parameters seeded per product")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="injected mock Fico latency")
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0, help="extra random mock latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock Fico calls that fail")
+    parser.add_argument("--gateway-port", type=int, default=8100)
+    parser.add_argument("--plor-port", type=int, default=8101)
+    parser.add_argument("--dm-port", type=int, default=8102)
+    parser.add_argument("--gateway-url", help="benchmark an already running gateway instead of starting one")
+    parser.add_argument("--database-url",
+                        help="seed this database instead of a temporary one (defaults to the configured "
+                             "database with --gateway-url)")
+    parser.add_argument("--service-logs", action="store_true", help="show gateway and mock service logs")
+    parser.add_argument("--output", type=Path, help="write the JSON report to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed relative regression of p95/p99 latency and throughput")
+    return parser.parse_args(argv)
+
+def start_service(app_path: str, port: int, env: Dict[str, str], show_logs: bool) -> subprocess.Popen:
+    output = None if show_logs else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app_path, "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=output,
+        stderr=output
+    )
+
+async def wait_until_ready(url: str, processes: List[subprocess.Popen], timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            if any(process.poll() is not None for process in processes):
+                raise RuntimeError(f"A benchmark service exited before {url} became ready")
+            try:
+                response = await client.get(url)
+                if response.status_code < 500:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+async def wait_for_routes(gateway_url: str, bom_version_ids: List[str], timeout: float = 60.0):
+    """Wait until the gateway's routing table contains the seeded configs"""
+    expected = {bom_version_id.replace("_v", ":", 1) for bom_version_id in bom_version_ids}
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            response = await client.get(f"{gateway_url}/api/stats/routing")
+            if expected <= set(response.json().get("routes", [])):
+                return
+            await asyncio.sleep(1.0)
+    raise RuntimeError("Gateway routing table does not contain the benchmark configs")
+
+def build_requests(bom_version_ids: List[str], products: List[tuple]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "headers": {},
+            "body": {
+                "bomVersionId": bom_version_id,
+                "productId": product_id,
+                "subproductId": subproduct_id,
+                "applicationId": f"APP_{index:06d}",
+                "requestType": "Scoring"
+            }
+        }
+        for index, (bom_version_id, (product_id, subproduct_id))
+        in enumerate(itertools.product(bom_version_ids, products))
+    ]
+
+async def drive_load(gateway_url: str, requests: List[Dict[str, Any]], rps: float,
+                     duration: float, concurrency: int) -> Dict[str, Any]:
+    """Open-loop load: requests are issued on a fixed schedule regardless of response times"""
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    errors = 0
+    dropped = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=gateway_url, limits=limits, timeout=30.0) as client:
+        async def send(payload: Dict[str, Any]):
+            nonlocal errors
+            try:
+                started = time.perf_counter()
+                response = await client.post("/gateway", json=payload)
+                latencies.append((time.perf_counter() - started) * 1000)
+                status = str(response.json().get("status_code", response.status_code))
+            except Exception:
+                errors += 1
+                status = "exception"
+            finally:
+                semaphore.release()
+            status_counts[status] = status_counts.get(status, 0) + 1
+
+        tasks = []
+        interval = 1.0 / rps
+        started = time.perf_counter()
+        for sequence, payload in enumerate(itertools.cycle(requests)):
+            scheduled = started + sequence * interval
+            if scheduled - started >= duration:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if semaphore.locked():
+                # Concurrency cap reached: the gateway is not keeping up with the target rate
+                dropped += 1
+                continue
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(send(payload)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "dropped": dropped,
+        "status_codes": status_counts,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "max": round(latencies[-1], 3) if latencies else None,
+            "mean": round(sum(latencies) / len(latencies), 3) if latencies else None
+        }
+    }
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    value = sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+    return round(value, 3)
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed beyond tolerance"""
+    regressions = []
+    for metric in ("p95", "p99"):
+        current = report["latency_ms"][metric]
+        previous = baseline["latency_ms"][metric]
+        if current is not None and previous and current > previous * (1 + tolerance):
+            regressions.append(f"{metric} latency {current}ms vs baseline {previous}ms")
+    if report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput {report['throughput_rps']} rps vs baseline {baseline['throughput_rps']} rps")
+    return regressions
+
+async def run(args: argparse.Namespace, cleanup: bool) -> int:
+    # app.database binds its engine on import, so DATABASE_URL must be final by now
+    from app.seed_data import create_benchmark_data, delete_benchmark_data
+
+    plor_url = f"http://127.0.0.1:{args.plor_port}"
+    dm_url = f"http://127.0.0.1:{args.dm_port}"
+    gateway_url = args.gateway_url or f"http://127.0.0.1:{args.gateway_port}"
+
+    bom_version_ids, products = create_benchmark_data(args.products, args.parameters, plor_url, dm_url)
+
+    mock_env = {
+        **os.environ,
+        "MOCK_FICO_LATENCY_MS": str(args.latency_ms),
+        "MOCK_FICO_LATENCY_JITTER_MS": str(args.latency_jitter_ms),
+        "MOCK_FICO_ERROR_RATE": str(args.error_rate)
+    }
+    processes = [
+        start_service("app.mock_services:mock_plor_app", args.plor_port, mock_env, args.service_logs),
+        start_service("app.mock_services:mock_dm_app", args.dm_port, mock_env, args.service_logs)
+    ]
+    if not args.gateway_url:
+        processes.append(start_service("app.main:app", args.gateway_port, dict(os.environ), args.service_logs))
+
+    try:
+        await wait_until_ready(f"{plor_url}/docs", processes)
+        await wait_until_ready(f"{dm_url}/docs", processes)
+        await wait_until_ready(f"{gateway_url}/healthz", processes)
+        await wait_for_routes(gateway_url, bom_version_ids)
+
+        requests = build_requests(bom_version_ids, products)
+        if args.warmup > 0:
+            await drive_load(gateway_url, requests, args.rps, args.warmup, args.concurrency)
+        result = await drive_load(gateway_url, requests, args.rps, args.duration, args.concurrency)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+        if cleanup:
+            delete_benchmark_data()
+
+    report = {
+        "config": {
+            "rps": args.rps,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "products": args.products,
+            "parameters": args.parameters,
+            "latency_ms": args.latency_ms,
+            "latency_jitter_ms": args.latency_jitter_ms,
+            "error_rate": args.error_rate
+        },
+        **result
+    }
+
+    exit_code = 0
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("config") != report["config"]:
+            print("Warning: baseline was recorded with a different configuration", file=sys.stderr)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        report["baseline_regressions"] = regressions
+        if regressions:
+            exit_code = 1
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        args.output.write_text(output + "\n")
+    if args.save_baseline:
+        args.baseline.write_text(output + "\n")
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+
+    return exit_code
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif not args.gateway_url:
+        # A gateway started here reads the same environment, so both see the temporary database
+        with tempfile.TemporaryDirectory(prefix="gateway-benchmark-") as directory:
+            os.environ["DATABASE_URL"] = f"sqlite:///{directory}/benchmark.db"
+            sys.exit(asyncio.run(run(args, cleanup=False)))
+    sys.exit(asyncio.run(run(args, cleanup=True)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Keep the app's module-level engine off the committed dev database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
@@ -0,0 +1,171 @@
+"""In-memory stand-ins for the Redis clients, covering the commands the services use"""
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+class FakeRedisStore:
+    """Values with optional expiry; strings, hashes and sets as Python objects"""
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+        self.expires: Dict[str, float] = {}
+        self.published: List[Tuple[str, str]] = []
+
+    def _live(self, key: str) -> bool:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def get(self, key: str) -> Optional[str]:
+        return self.data[key] if self._live(key) else None
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None, nx: bool = False) -> Optional[bool]:
+        if nx and self._live(key):
+            return None
+        self.data[key] = str(value)
+        self.expires.pop(key, None)
+        if ex is not None:
+            self.expire(key, ex)
+        return True
+
+    def setex(self, key: str, seconds: int, value: Any) -> bool:
+        return self.set(key, value, ex=seconds)
+
+    def delete(self, *keys: str) -> int:
+        deleted = sum(1 for key in keys if self._live(key))
+        for key in keys:
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return deleted
+
+    def expire(self, key: str, seconds: float) -> bool:
+        return self.pexpire(key, seconds * 1000)
+
+    def pexpire(self, key: str, ms: float) -> bool:
+        if not self._live(key):
+            return False
+        self.expires[key] = time.monotonic() + ms / 1000
+        return True
+
+    def pttl(self, key: str) -> int:
+        if not self._live(key):
+            return -2
+        expires_at = self.expires.get(key)
+        return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+
+    def hset(self, key: str, field: Optional[str] = None, value: Any = None,
+             mapping: Optional[Dict[str, Any]] = None) -> int:
+        values = dict(mapping or {})
+        if field is not None:
+            values[field] = value
+        self._live(key)
+        hash_ = self.data.setdefault(key, {})
+        added = sum(1 for name in values if name not in hash_)
+        hash_.update({name: str(value) for name, value in values.items()})
+        return added
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        return dict(self.data[key]) if self._live(key) else {}
+
+    def hdel(self, key: str, *fields: str) -> int:
+        if not self._live(key):
+            return 0
+        removed = sum(1 for name in fields if self.data[key].pop(name, None) is not None)
+        if not self.data[key]:
+            self.delete(key)
+        return removed
+
+    def hlen(self, key: str) -> int:
+        return len(self.data[key]) if self._live(key) else 0
+
+    def sadd(self, key: str, *members: str) -> int:
+        self._live(key)
+        set_ = self.data.setdefault(key, set())
+        added = len(set(members) - set_)
+        set_.update(members)
+        return added
+
+    def smembers(self, key: str) -> set:
+        return set(self.data[key]) if self._live(key) else set()
+
+    def srem(self, key: str, *members: str) -> int:
+        if not self._live(key):
+            return 0
+        removed = len(self.data[key] & set(members))
+        self.data[key] -= set(members)
+        if not self.data[key]:
+            self.delete(key)
+        return removed
+
+    def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        return 0
+
+class FakePipeline:
+    """Queues commands and runs them in order on execute()"""
+
+    def __init__(self, store: FakeRedisStore):
+        self.store = store
+        self.commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        if not hasattr(self.store, name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def run(self) -> List[Any]:
+        commands, self.commands = self.commands, []
+        return [getattr(self.store, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+class FakeSyncPipeline(FakePipeline):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.commands = []
+
+    def execute(self) -> List[Any]:
+        return self.run()
+
+class FakeAsyncPipeline(FakePipeline):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.commands = []
+
+    async def execute(self) -> List[Any]:
+        return self.run()
+
+class FakeRedis:
+    """Synchronous client over a FakeRedisStore"""
+
+    def __init__(self, store: FakeRedisStore):
+        self.store = store
+
+    def __getattr__(self, name: str):
+        return getattr(self.store, name)
+
+    def pipeline(self, transaction: bool = True) -> FakeSyncPipeline:
+        return FakeSyncPipeline(self.store)
+
+class FakeAsyncRedis:
+    """Asynchronous client over a FakeRedisStore"""
+
+    def __init__(self, store: FakeRedisStore):
+        self.store = store
+
+    def __getattr__(self, name: str):
+        command = getattr(self.store, name)
+
+        async def call(*args, **kwargs):
+            return command(*args, **kwargs)
+        return call
+
+    def pipeline(self, transaction: bool = True) -> FakeAsyncPipeline:
+        return FakeAsyncPipeline(self.store)
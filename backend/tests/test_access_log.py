@@ -0,0 +1,117 @@
+import asyncio
+import httpx
+import pytest
+from app.services.access_log import AccessLogWriter
+from app.services.admission import AdmissionController
+from app.services.gateway_service import GatewayService
+from app.services.routing_service import FicoRoute
+
+ROUTE = FicoRoute("PLOR", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret")
+
+def capturing_writer(monkeypatch, batch_size=3, flush_interval=10.0, write_delay=0.0):
+    writer = AccessLogWriter()
+    writer.enabled = True
+    writer.batch_size = batch_size
+    writer.flush_interval = flush_interval
+    batches = []
+
+    async def write(batch):
+        await asyncio.sleep(write_delay)
+        batches.append([event["n"] for event in batch])
+    monkeypatch.setattr(writer, "_write", write)
+    return writer, batches
+
+def gateway_recording(monkeypatch, fico_response: httpx.Response):
+    monkeypatch.setattr("app.services.gateway_service.admission_controller", AdmissionController())
+    recorded = []
+    monkeypatch.setattr("app.services.gateway_service.access_log_writer.record", recorded.append)
+    gateway = GatewayService()
+    monkeypatch.setattr(gateway, "_resolve_route", lambda request_data: (None, ROUTE, None, None))
+
+    async def passthrough(fico_config, request_data, *args):
+        return request_data
+
+    async def call_fico(fico_config, request_data, stream=False):
+        return fico_response
+    monkeypatch.setattr(gateway, "_augment_request", passthrough)
+    monkeypatch.setattr(gateway, "_call_fico", call_fico)
+    return gateway, recorded
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status_code", [200, 422, 503])
+async def test_streamed_response_logs_the_relayed_status(monkeypatch, status_code):
+    gateway, recorded = gateway_recording(monkeypatch, httpx.Response(status_code, stream=httpx.ByteStream(b"{}")))
+
+    stream, error = await gateway.process_request_stream({"body": {"bomVersionId": "PLOR_v1.0"}, "headers": {}})
+    assert error is None
+    assert recorded == []
+    async for _ in stream.iter_bytes():
+        pass
+    await stream.aclose()
+
+    assert len(recorded) == 1
+    assert recorded[0]["status_code"] == status_code
+    assert recorded[0]["upstream_status_code"] == status_code
+
+@pytest.mark.asyncio
+async def test_full_batches_are_written_and_stop_flushes_the_rest(monkeypatch):
+    writer, batches = capturing_writer(monkeypatch)
+    writer.start()
+
+    for n in range(7):
+        writer.record({"n": n, "status_code": 200})
+    for _ in range(20):
+        await asyncio.sleep(0)
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+
+    await writer.stop()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_written_after_the_flush_interval(monkeypatch):
+    writer, batches = capturing_writer(monkeypatch, batch_size=100, flush_interval=0.05)
+    writer.start()
+
+    writer.record({"n": 0, "status_code": 200})
+    writer.record({"n": 1, "status_code": 200})
+    await asyncio.sleep(0.2)
+
+    assert batches == [[0, 1]]
+    await writer.stop()
+    assert batches == [[0, 1]]
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_the_batch_being_written(monkeypatch):
+    writer, batches = capturing_writer(monkeypatch, write_delay=0.05)
+    writer.start()
+
+    for n in range(4):
+        writer.record({"n": n, "status_code": 200})
+    for _ in range(3):
+        await asyncio.sleep(0)
+    await writer.stop()
+
+    assert batches == [[0, 1, 2], [3]]
+
+@pytest.mark.asyncio
+async def test_successes_are_sampled_past_the_watermark_and_errors_kept(monkeypatch):
+    writer, _ = capturing_writer(monkeypatch)
+    writer.sample_watermark = 2
+    writer.sample_rate = 0.0
+    # No writer loop, so the queue only fills up
+    writer._queue = asyncio.Queue(maxsize=4)
+
+    for n, status_code in enumerate([200, 200, 200, 500, 429, 500]):
+        writer.record({"n": n, "status_code": status_code})
+
+    assert [writer._queue.get_nowait()["n"] for _ in range(writer._queue.qsize())] == [0, 1, 3, 4]
+    assert writer.stats["enqueued"] == 4
+    assert writer.stats["sampled_out"] == 1
+    assert writer.stats["dropped"] == 1
+
+def test_record_is_a_no_op_until_started(monkeypatch):
+    writer, _ = capturing_writer(monkeypatch)
+
+    writer.record({"n": 0, "status_code": 200})
+
+    assert writer.stats["enqueued"] == 0
@@ -0,0 +1,148 @@
+import asyncio
+import pytest
+from app.services.admission import AdmissionController, AdmissionRejected, ConcurrencyLimiter, TokenBucket
+from app.services.gateway_service import GatewayService
+from app.services.local_cache import LocalCache
+from app.services.routing_service import FicoRoute
+
+ROUTE = FicoRoute("PLOR", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret")
+
+def limiter(max_concurrency=1, max_queue=2, queue_timeout=0.05):
+    return ConcurrencyLimiter("PLOR", "1.0", max_concurrency, max_queue, queue_timeout)
+
+@pytest.mark.asyncio
+async def test_queued_waiter_times_out_without_taking_a_slot():
+    limit = limiter()
+    await limit.acquire()
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limit.acquire()
+
+    assert rejected.value.status_code == 503
+    assert rejected.value.reason == "queue_timeout"
+    assert limit.queued == 0
+    limit.release()
+    assert limit.active == 0
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_immediately():
+    limit = limiter(max_queue=1, queue_timeout=1.0)
+    await limit.acquire()
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limit.acquire()
+
+    assert rejected.value.reason == "queue_full"
+    limit.release()
+    await waiter
+    assert limit.active == 1
+
+@pytest.mark.asyncio
+async def test_released_slot_goes_to_the_oldest_waiter():
+    limit = limiter(queue_timeout=1.0)
+    await limit.acquire()
+    first = asyncio.create_task(limit.acquire())
+    second = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+
+    limit.release()
+    await first
+
+    assert not second.done()
+    assert limit.active == 1
+    second.cancel()
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    limit = limiter(queue_timeout=1.0)
+    await limit.acquire()
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limit.queued == 0
+    limit.release()
+    assert limit.active == 0
+
+@pytest.mark.asyncio
+async def test_waiter_cancelled_after_being_handed_a_slot_passes_it_on():
+    limit = limiter(queue_timeout=1.0)
+    await limit.acquire()
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+
+    # The slot is handed over, but the waiter is cancelled before it resumes
+    limit.release()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert limit.active == 0
+
+def test_caller_id_falls_back_to_client_address():
+    admission = AdmissionController()
+
+    assert admission.caller_id({"X-Caller-Id": "team-a"}, "10.0.0.1") == "team-a"
+    assert admission.caller_id({"x-caller-id": "team-b"}, "10.0.0.1") == "team-b"
+    assert admission.caller_id({"X-Caller-Id": ""}, "10.0.0.1") == "address:10.0.0.1"
+    assert admission.caller_id(None) is None
+
+@pytest.mark.asyncio
+async def test_caller_rate_limit_applies_per_caller():
+    admission = AdmissionController()
+    admission.caller_rate = 0.001
+    admission._untracked_bucket = None
+
+    (await admission.acquire(ROUTE, "address:10.0.0.1")).release()
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.acquire(ROUTE, "address:10.0.0.1")
+    (await admission.acquire(ROUTE, "address:10.0.0.2")).release()
+
+    assert rejected.value.status_code == 429
+    assert rejected.value.reason == "caller_rate_limited"
+
+@pytest.mark.asyncio
+async def test_new_callers_cannot_evict_tracked_buckets():
+    admission = AdmissionController()
+    admission.caller_rate = 0.001
+    admission._caller_buckets = LocalCache(2, 300)
+    admission._untracked_bucket = TokenBucket(0.001, 1.0)
+
+    for caller in ("a", "b", "rotated-1"):
+        (await admission.acquire(ROUTE, caller)).release()
+
+    # "a" kept its emptied bucket, and further new callers share the one "rotated-1" used
+    for caller in ("a", "rotated-2"):
+        with pytest.raises(AdmissionRejected):
+            await admission.acquire(ROUTE, caller)
+
+@pytest.mark.asyncio
+async def test_forwarded_headers_in_the_body_do_not_identify_the_caller(monkeypatch):
+    admission = AdmissionController()
+    admission.caller_rate = 0.001
+    admission._untracked_bucket = None
+    monkeypatch.setattr("app.services.gateway_service.admission_controller", admission)
+    gateway = GatewayService()
+    monkeypatch.setattr(gateway, "_resolve_route", lambda request_data: (None, ROUTE, None, None))
+
+    async def passthrough(fico_config, request_data, *args):
+        return request_data
+    monkeypatch.setattr(gateway, "_augment_request", passthrough)
+    monkeypatch.setattr(gateway, "_route_to_fico_cached", passthrough)
+    monkeypatch.setattr(gateway, "_record_request", lambda *args: None)
+
+    admitted = 0
+    for n in range(5):
+        try:
+            await gateway.process_request({"body": {}, "headers": {"X-Caller-Id": f"spoofed-{n}"}},
+                                          client_address="10.0.0.1")
+            admitted += 1
+        except AdmissionRejected:
+            pass
+
+    assert admitted == 1
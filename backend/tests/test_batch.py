@@ -0,0 +1,103 @@
+import asyncio
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.services.admission import AdmissionController
+from app.services.gateway_service import GatewayService, UpstreamError, gateway_service
+from app.services.routing_service import FicoRoute
+
+ROUTE = FicoRoute("PLOR", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret")
+
+def routed_gateway(monkeypatch, gateway, parameters):
+    """Route PLOR v1.0 only, serve parameters per (product_id, subproduct_id) and echo Fico bodies"""
+    monkeypatch.setattr("app.services.gateway_service.admission_controller", AdmissionController())
+    monkeypatch.setattr(gateway, "_get_fico_config",
+                        lambda code, version, sticky_key=None: (ROUTE, None) if (code, version) == ("PLOR", "1.0")
+                        else (None, None))
+    monkeypatch.setattr(gateway, "_record_request", lambda *args: None)
+    lookups = []
+
+    async def get_many(keys):
+        lookups.append(sorted(keys))
+        return {key: parameters[key] for key in keys}
+    monkeypatch.setattr("app.services.gateway_service.cache_service.get_many_or_refresh_parameters", get_many)
+
+    async def route_to_fico(fico_config, request_data, client_headers, caller, rule):
+        if request_data["body"].get("applicationId") == "FAILS":
+            raise UpstreamError("Fico unavailable", 502)
+        await asyncio.sleep(0)
+        return {"status_code": 200, "headers": {}, "body": request_data["body"]}
+    monkeypatch.setattr(gateway, "_route_to_fico_cached", route_to_fico)
+    return lookups
+
+def item(product_id="CC", application_id="APP", bom_version_id="PLOR_v1.0"):
+    body = {"productId": product_id, "subproductId": "STD", "applicationId": application_id}
+    if bom_version_id:
+        body["bomVersionId"] = bom_version_id
+    return {"headers": {}, "body": body}
+
+@pytest.mark.asyncio
+async def test_each_parameter_set_is_resolved_once_and_failures_stay_per_item(monkeypatch):
+    gateway = GatewayService()
+    lookups = routed_gateway(monkeypatch, gateway, {
+        ("CC", "STD"): {"Score": {"cutoff": "600"}},
+        ("MORTGAGE", "STD"): {"Score": {"cutoff": "700"}}
+    })
+    requests = [
+        item(), item(bom_version_id=None), item("MORTGAGE"), item(bom_version_id="DM_v9.0"),
+        item(application_id="FAILS"), item()
+    ]
+
+    results = {index: (response, status_code)
+               async for index, response, status_code in gateway.process_batch(requests)}
+
+    assert lookups == [[("CC", "STD"), ("MORTGAGE", "STD")]]
+    assert {index: status_code for index, (_, status_code) in results.items()} == {
+        0: 200, 1: 400, 2: 200, 3: 404, 4: 502, 5: 200
+    }
+    assert results[0][0]["body"]["parameters"] == {"Score": {"cutoff": "600"}}
+    assert results[2][0]["body"]["parameters"] == {"Score": {"cutoff": "700"}}
+    assert results[4][0] == {"error": "Fico unavailable"}
+
+@pytest.mark.asyncio
+async def test_failed_parameter_refresh_fails_only_its_items(monkeypatch):
+    gateway = GatewayService()
+    routed_gateway(monkeypatch, gateway, {
+        ("CC", "STD"): UpstreamError("Parameters unavailable", 503),
+        ("MORTGAGE", "STD"): {}
+    })
+
+    results = {index: status_code
+               async for index, _, status_code in gateway.process_batch([item(), item("MORTGAGE"), item()])}
+
+    assert results == {0: 503, 1: 200, 2: 503}
+
+@pytest.fixture
+def client(monkeypatch):
+    routed_gateway(monkeypatch, gateway_service, {("CC", "STD"): {}, ("MORTGAGE", "STD"): {}})
+    return TestClient(app)
+
+def test_results_are_returned_in_request_order(client):
+    requests = [item(), item(application_id="FAILS"), item("MORTGAGE")]
+    response = client.post("/gateway/batch", json={"requests": requests})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["status_code"] for result in results] == [200, 502, 200]
+    assert results[2]["data"]["body"]["productId"] == "MORTGAGE"
+
+def test_streamed_results_are_ndjson_lines(client):
+    response = client.post("/gateway/batch?stream=true", json={"requests": [item(), item(bom_version_id=None)]})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines() if line]
+    assert sorted((result["index"], result["status_code"]) for result in results) == [(0, 200), (1, 400)]
+
+def test_oversized_and_malformed_batches_are_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "gateway_batch_max_size", 2)
+
+    assert client.post("/gateway/batch", json={"requests": [item()] * 3}).status_code == 413
+    assert client.post("/gateway/batch", json={"requests": {"body": {}}}).status_code == 422
@@ -0,0 +1,216 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.models import ConfigurableParameters
+from app.services.cache_service import CacheService, NO_PARAMETERS
+from tests.fakes import FakeRedisStore, FakeRedis, FakeAsyncRedis
+
+@pytest.fixture
+def store():
+    return FakeRedisStore()
+
+def cache_service(store, storage="hash"):
+    cache = CacheService()
+    cache.redis_client = FakeRedis(store)
+    cache.async_redis_client = FakeAsyncRedis(store)
+    cache.storage = storage
+    return cache
+
+def parameter(component, name, value, **fields):
+    return ConfigurableParameters(
+        product_id="CC", subproduct_id="GOLD", component=component, parameter=name, value=value,
+        effective_from=fields.pop("effective_from", datetime.utcnow() - timedelta(days=1)),
+        status=fields.pop("status", "ACTIVE"), **fields
+    )
+
+def test_rewrite_deletes_components_dropped_from_the_set(store):
+    cache = cache_service(store)
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}, "LIMITS": {"max": "5000"}})
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "650"}})
+
+    assert "hparams:CC:GOLD:LIMITS" not in store.data
+    assert {member for member in store.smembers("hparams:CC:GOLD") if not member.startswith("__")} == {"SCORING"}
+
+@pytest.mark.asyncio
+async def test_async_rewrite_deletes_components_dropped_from_the_set(store):
+    cache = cache_service(store)
+    await cache.set_many_cached_parameters_async([
+        ("CC", "GOLD", {"SCORING": {"min": "700"}, "LIMITS": {"max": "5000"}}, None)
+    ])
+    await cache.set_cached_parameters_async("CC", "GOLD", {})
+
+    assert store.data["hparams:CC:GOLD"] == {"__no_parameters__"}
+    assert not any(key.startswith("hparams:CC:GOLD:") for key in store.data)
+
+@pytest.mark.asyncio
+async def test_patch_does_not_resurrect_an_orphaned_component(store):
+    cache = cache_service(store)
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}})
+    # Left behind by a writer that predates the cleanup
+    store.hset("hparams:CC:GOLD:LIMITS", mapping={"max": "5000", "removed": "1"})
+
+    cache.patch_cached_parameter("CC", "GOLD", "LIMITS", "max", parameter("LIMITS", "max", "6000"))
+    cache.local_cache.clear()
+
+    assert await cache.get_cached_parameters_async("CC", "GOLD") == {
+        "SCORING": {"min": "700"}, "LIMITS": {"max": "6000"}
+    }
+
+@pytest.mark.asyncio
+async def test_patch_removing_last_parameter_drops_the_component(store):
+    cache = cache_service(store)
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}, "LIMITS": {"max": "5000"}})
+
+    cache.patch_cached_parameter("CC", "GOLD", "LIMITS", "max", None)
+    cache.local_cache.clear()
+
+    assert await cache.get_cached_parameters_async("CC", "GOLD") == {"SCORING": {"min": "700"}}
+
+def test_patch_with_an_effective_to_invalidates(store):
+    cache = cache_service(store)
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}})
+
+    cache.patch_cached_parameter("CC", "GOLD", "SCORING", "min", parameter(
+        "SCORING", "min", "650", effective_to=datetime.utcnow() + timedelta(days=1)
+    ))
+
+    assert not any(key.startswith("hparams:CC:GOLD") for key in store.data)
+    assert cache.local_cache.get("params:CC:GOLD") is None
+
+def test_invalidate_deletes_index_and_components(store):
+    cache = cache_service(store)
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}, "LIMITS": {"max": "5000"}})
+
+    cache.invalidate_cache("CC", "GOLD")
+
+    assert store.data == {}
+    assert cache.local_cache.get("params:CC:GOLD") is None
+    assert store.published
+
+class SlowSession:
+    """Returns rows only once released, so a test can act while the refresh is reading"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.reading = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def execute(self, query):
+        self.reading.set()
+        await self.release.wait()
+        return self
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+@pytest.mark.asyncio
+async def test_refresh_invalidated_while_reading_is_not_cached(store):
+    cache = cache_service(store, storage="json")
+    db = SlowSession([parameter("SCORING", "min", "700")])
+    refresh = asyncio.create_task(cache.refresh_parameters_cache_async(db, "CC", "GOLD"))
+    await db.reading.wait()
+
+    cache.invalidate_cache("CC", "GOLD")
+    db.release.set()
+
+    assert await refresh == {"SCORING": {"min": "700"}}
+    assert "params:CC:GOLD" not in store.data
+    assert cache.local_cache.get("params:CC:GOLD") is None
+    assert cache.refresh_stats["superseded"] == 1
+
+@pytest.mark.asyncio
+async def test_refresh_without_invalidation_is_cached(store):
+    cache = cache_service(store, storage="json")
+    db = SlowSession([parameter("SCORING", "min", "700")])
+    db.release.set()
+
+    await cache.refresh_parameters_cache_async(db, "CC", "GOLD")
+
+    assert "params:CC:GOLD" in store.data
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["json", "hash"])
+async def test_set_past_cache_ttl_is_served_stale_and_refreshed(store, storage, monkeypatch):
+    cache = cache_service(store, storage)
+    refreshed = []
+    monkeypatch.setattr(cache, "_start_refresh", lambda *key: refreshed.append(key))
+    cache.cache_ttl = 0
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}})
+    cache.local_cache.clear()
+
+    assert await cache.get_cached_parameters_async("CC", "GOLD") == {"SCORING": {"min": "700"}}
+    assert refreshed == [("CC", "GOLD")]
+    assert cache.refresh_stats["stale_served"] == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["json", "hash"])
+async def test_set_cut_short_by_a_boundary_is_never_stale(store, storage, monkeypatch):
+    cache = cache_service(store, storage)
+    refreshed = []
+    monkeypatch.setattr(cache, "_start_refresh", lambda *key: refreshed.append(key))
+    # Well inside the stale window's length, but the set has no stale window
+    cache.set_cached_parameters("CC", "GOLD", {"SCORING": {"min": "700"}}, ttl=5)
+    cache.local_cache.clear()
+
+    assert await cache.get_cached_parameters_async("CC", "GOLD") == {"SCORING": {"min": "700"}}
+    assert 0 < store.pttl(cache._index_key("CC", "GOLD") if storage == "hash" else "params:CC:GOLD") <= 5000
+    assert refreshed == []
+
+@pytest.mark.asyncio
+async def test_negative_set_expires_within_negative_ttl_and_is_never_stale(store, monkeypatch):
+    cache = cache_service(store, storage="json")
+    refreshed = []
+    monkeypatch.setattr(cache, "_start_refresh", lambda *key: refreshed.append(key))
+    cache.set_cached_parameters("CC", "NONE", {})
+    cache.local_cache.clear()
+
+    assert await cache.get_cached_parameters_async("CC", "NONE") == {}
+    assert store.pttl("params:CC:NONE") <= cache.negative_ttl * 1000
+    assert refreshed == []
+
+def test_ttl_ends_at_the_next_effective_date_boundary(store):
+    cache = cache_service(store)
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    parameters = [
+        parameter("SCORING", "min", "700", effective_from=now - timedelta(days=1),
+                  effective_to=now + timedelta(seconds=59)),
+        parameter("SCORING", "max", "900", effective_from=now + timedelta(seconds=120)),
+        parameter("LIMITS", "max", "5000", effective_from=now - timedelta(days=1))
+    ]
+
+    param_dict, ttl = cache._resolve_parameters(parameters, now)
+
+    # effective_to is inclusive, so the row is served until a second after it
+    assert ttl == 60
+    assert param_dict == {"SCORING": {"min": "700"}, "LIMITS": {"max": "5000"}}
+
+def test_boundary_beyond_cache_ttl_uses_the_full_ttl(store):
+    cache = cache_service(store)
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    parameters = [parameter("SCORING", "min", "700", effective_from=now - timedelta(days=1),
+                            effective_to=now + timedelta(seconds=cache.cache_ttl + 10))]
+
+    assert cache._resolve_parameters(parameters, now)[1] is None
+    assert cache._redis_ttl(None) == cache.cache_ttl + cache.stale_ttl
+    assert cache._redis_ttl(30) == 30
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["json", "hash"])
+async def test_empty_refresh_is_served_from_the_negative_entry_until_invalidated(store, storage, monkeypatch):
+    cache = cache_service(store, storage)
+    db = SlowSession([])
+    db.release.set()
+    assert await cache.refresh_parameters_cache_async(db, "CC", "NONE") == {}
+
+    refreshed = []
+    monkeypatch.setattr(cache, "_start_refresh", lambda *key: refreshed.append(key))
+    assert await cache.get_or_refresh_parameters("CC", "NONE") is NO_PARAMETERS
+    cache.local_cache.clear()
+    assert await cache.get_or_refresh_parameters("CC", "NONE") is NO_PARAMETERS
+    assert refreshed == []
+
+    cache.invalidate_cache("CC", "NONE")
+    assert await cache.get_cached_parameters_async("CC", "NONE") is None
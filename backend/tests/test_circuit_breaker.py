@@ -0,0 +1,138 @@
+import httpx
+import pytest
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, RetryBudget, CLOSED, OPEN, HALF_OPEN
+from app.services.gateway_service import GatewayService, UpstreamError
+from app.services.routing_service import FicoRoute
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock.monotonic)
+    return clock
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("PLOR:1.0", failure_threshold=3, open_seconds=30, half_open_max_calls=1)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.rejected == 1
+
+def test_half_open_breaker_admits_probes_then_closes_or_reopens(clock):
+    breaker = CircuitBreaker("PLOR:1.0", failure_threshold=1, open_seconds=30, half_open_max_calls=1)
+    breaker.record_failure()
+    clock.now += 30
+
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.times_opened == 2
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+def test_released_probe_slot_can_be_reused(clock):
+    breaker = CircuitBreaker("PLOR:1.0", failure_threshold=1, open_seconds=30, half_open_max_calls=1)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow_request()
+
+    breaker.release()
+
+    assert breaker.allow_request()
+
+def test_retry_budget_is_a_fraction_of_recent_requests_plus_a_minimum(clock):
+    budget = RetryBudget(ratio=0.5, min_retries=1, window=10)
+    for _ in range(4):
+        budget.record_request()
+
+    assert [budget.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert budget.exhausted == 1
+
+    clock.now += 11
+    assert budget.try_acquire()
+
+ROUTE = FicoRoute("RETRY", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret")
+
+def gateway_replying(monkeypatch, *replies):
+    gateway = GatewayService()
+    gateway.retry_backoff = 0
+    sent = []
+
+    async def send_to_fico(fico_config, request_data, stream=False):
+        reply = replies[len(sent)]
+        sent.append(request_data)
+        if isinstance(reply, Exception):
+            raise reply
+        return httpx.Response(reply, json={})
+    monkeypatch.setattr(gateway, "_send_to_fico", send_to_fico)
+    return gateway, sent
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(circuit_breaker.circuit_breakers, "_breakers", {})
+    monkeypatch.setattr(circuit_breaker.circuit_breakers, "_budgets", {})
+
+@pytest.mark.asyncio
+async def test_503_and_connect_errors_are_retried(monkeypatch):
+    gateway, sent = gateway_replying(monkeypatch, httpx.ConnectError("refused"), 503, 200)
+
+    response = await gateway._call_fico(ROUTE, {"body": {}})
+
+    assert response.status_code == 200
+    assert len(sent) == 3
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status_code", [502, 504])
+async def test_502_and_504_are_only_retried_with_an_idempotency_key(monkeypatch, status_code):
+    gateway, sent = gateway_replying(monkeypatch, status_code, 200)
+    response = await gateway._call_fico(ROUTE, {"body": {}})
+    assert response.status_code == status_code
+    assert len(sent) == 1
+
+    gateway, sent = gateway_replying(monkeypatch, status_code, 200)
+    response = await gateway._call_fico(ROUTE, {"body": {}, "headers": {"Idempotency-Key": "abc"}})
+    assert response.status_code == 200
+    assert len(sent) == 2
+
+@pytest.mark.asyncio
+async def test_timeouts_are_not_retried(monkeypatch):
+    gateway, sent = gateway_replying(monkeypatch, httpx.ReadTimeout("slow"), 200)
+
+    with pytest.raises(UpstreamError) as error:
+        await gateway._call_fico(ROUTE, {"body": {}, "headers": {"Idempotency-Key": "abc"}})
+
+    assert error.value.status_code == 504
+    assert len(sent) == 1
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(monkeypatch):
+    gateway, sent = gateway_replying(monkeypatch, *[503] * 20)
+    breaker, _ = circuit_breaker.circuit_breakers.get(ROUTE.product_code, ROUTE.version)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    with pytest.raises(UpstreamError) as error:
+        await gateway._call_fico(ROUTE, {"body": {}})
+
+    assert error.value.status_code == 503
+    assert sent == []
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from app.services.coalescing import RequestCoalescer
+
+ENVIRONMENT = ("PLOR", "1.0")
+
+class Call:
+    def __init__(self):
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"score": 700}
+
+async def callers(coalescer, call, count):
+    tasks = [asyncio.create_task(coalescer.run("key", call, ENVIRONMENT)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return tasks
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    coalescer = RequestCoalescer()
+    call = Call()
+    tasks = await callers(coalescer, call, 3)
+
+    call.release.set()
+
+    assert await asyncio.gather(*tasks) == [{"score": 700}] * 3
+    assert call.started == 1
+    assert coalescer.get_stats() == {"in_flight": 0, "environments": {"PLOR:1.0": {
+        "calls": 1, "coalesced": 2, "abandoned": 0
+    }}}
+
+@pytest.mark.asyncio
+async def test_followers_survive_the_leader_being_cancelled():
+    coalescer = RequestCoalescer()
+    call = Call()
+    leader, follower = await callers(coalescer, call, 2)
+
+    leader.cancel()
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await follower == {"score": 700}
+    assert leader.cancelled()
+    assert not call.cancelled
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_once_every_caller_has_gone():
+    coalescer = RequestCoalescer()
+    call = Call()
+    tasks = await callers(coalescer, call, 2)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert call.cancelled
+    stats = coalescer.get_stats()
+    assert stats["in_flight"] == 0
+    assert stats["environments"]["PLOR:1.0"]["abandoned"] == 1
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_caller_and_are_not_shared_afterwards():
+    coalescer = RequestCoalescer()
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(*(coalescer.run("key", failing, ENVIRONMENT) for _ in range(2)),
+                                   return_exceptions=True)
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert await coalescer.run("key", lambda: asyncio.sleep(0, "fresh"), ENVIRONMENT) == "fresh"
+
+@pytest.mark.asyncio
+async def test_caller_arriving_while_the_call_is_cancelled_starts_a_new_one():
+    coalescer = RequestCoalescer()
+    call = Call()
+    abandoned, = await callers(coalescer, call, 1)
+
+    abandoned.cancel()
+    await asyncio.sleep(0)
+    # The abandoned call has been told to cancel but has not finished doing so
+    late = asyncio.create_task(coalescer.run("key", call, ENVIRONMENT))
+    await asyncio.sleep(0)
+    call.release.set()
+
+    assert await late == {"score": 700}
+    assert call.started == 2
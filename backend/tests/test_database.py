@@ -0,0 +1,28 @@
+from sqlalchemy import create_engine, inspect, text
+from app.database import upgrade_schema
+from app.models import Base
+
+def test_upgrade_schema_adds_missing_columns_and_indexes(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/old.db")
+    with engine.begin() as connection:
+        # fico_environment_config as the first release created it
+        connection.execute(text(
+            "CREATE TABLE fico_environment_config (product_code VARCHAR(50) NOT NULL, "
+            "version VARCHAR(20) NOT NULL, url VARCHAR(500) NOT NULL, authentication_url VARCHAR(500) NOT NULL, "
+            "client_id VARCHAR(100) NOT NULL, secret TEXT NOT NULL, created_by VARCHAR(100) NOT NULL, "
+            "created_on DATETIME, modified_by VARCHAR(100), modified_on DATETIME, status VARCHAR(20), "
+            "PRIMARY KEY (product_code, version))"
+        ))
+        connection.execute(text(
+            "INSERT INTO fico_environment_config VALUES ('PLOR', '1.2', 'u', 'a', 'c', 's', 'x', NULL, NULL, NULL, 'ACTIVE')"
+        ))
+    Base.metadata.create_all(bind=engine)
+
+    upgrade_schema(engine)
+    upgrade_schema(engine)
+
+    inspector = inspect(engine)
+    assert "response_cache_ttl" in {column["name"] for column in inspector.get_columns("fico_environment_config")}
+    assert "idx_params_product_status" in {index["name"] for index in inspector.get_indexes("configurable_parameters")}
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT response_cache_ttl FROM fico_environment_config")).all() == [(None,)]
@@ -0,0 +1,77 @@
+import copy
+import pytest
+from app.services.extraction import RequestExtractor, RequestFields, request_extractor
+from app.services.gateway_service import GatewayService
+
+def extractor(**paths):
+    return RequestExtractor(paths)
+
+def test_earlier_path_wins_whatever_order_it_is_found_in():
+    rules = extractor(application_id=["[*].value.applicationId", "applicationId", "[0].id"])
+
+    body = [{"id": "ID_0"}, {"value": {"applicationId": "APP_1"}}]
+    assert rules.extract(body).application_id == "APP_1"
+    assert rules.extract([{"id": "ID_0"}, {"value": {}}]).application_id == "ID_0"
+    assert rules.extract({"applicationId": "APP_2"}).application_id == "APP_2"
+
+def test_later_paths_are_fallbacks_for_missing_or_null_values():
+    rules = extractor(product_id=["value.application.productCode", "productId"])
+
+    assert rules.extract({"value": {"application": {"productCode": None}}, "productId": "P1"}).product_id == "P1"
+    assert rules.extract({"value": "not an object", "productId": "P2"}).product_id == "P2"
+    assert rules.extract({"value": {"application": {"productCode": "P0"}}, "productId": "P1"}).product_id == "P0"
+
+def test_each_step_takes_the_first_matching_element_and_negative_indexes_count_from_the_end():
+    rules = extractor(application_id=["[*].applicationId"], subproduct_id=["[-1].sub"])
+
+    fields = rules.extract([{"other": 1}, {"applicationId": "APP_1"}, {"applicationId": "APP_2", "sub": "S"}])
+
+    assert fields == RequestFields(None, None, "S", "APP_1")
+    assert rules.extract([]) == RequestFields(None, None, None, None)
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        extractor(application_id=["[x].id"])
+    with pytest.raises(ValueError):
+        extractor(unknown=["id"])
+
+def test_keys_cannot_inject_code():
+    rules = extractor(application_id=["a'); raise SystemExit; ('"])
+
+    assert rules.extract({"a'); raise SystemExit; ('": "APP_1"}).application_id == "APP_1"
+
+def test_default_rules_read_single_and_list_bodies():
+    assert request_extractor.extract({"applicationId": "APP_1"}).application_id == "APP_1"
+    fields = request_extractor.extract([{"value": {"bomVersionId": "PLOR:1.0", "application": {"productCode": "P1"}}}])
+    assert (fields.bom_version_id, fields.product_id) == ("PLOR:1.0", "P1")
+
+CACHED = {"ScoreComponent": {"cutoff": 600, "weight": 2}, "RiskComponent": {"limit": 10}}
+
+def test_merge_into_list_body_copies_only_the_first_object_entry():
+    cached = copy.deepcopy(CACHED)
+    untouched = {"value": {"applicationId": "APP_2"}}
+    request = {"headers": {}, "body": [
+        "marker", {"value": {"applicationId": "APP_1", "parameters": {"ScoreComponent": {"cutoff": 500, "own": 1}}}},
+        untouched
+    ]}
+    original = copy.deepcopy(request)
+
+    merged = GatewayService()._merge_parameters(request, cached)
+
+    assert request == original
+    assert cached == CACHED
+    parameters = merged["body"][1]["value"]["parameters"]
+    assert parameters["ScoreComponent"] == {"cutoff": 600, "weight": 2, "own": 1}
+    assert parameters["RiskComponent"] is cached["RiskComponent"]
+    assert merged["body"][0] == "marker"
+    assert merged["body"][2] is untouched
+
+def test_merge_leaves_list_bodies_without_an_object_value_alone():
+    request = {"body": [{"value": "text"}, 1]}
+
+    assert GatewayService()._merge_parameters(request, CACHED) is request
+
+def test_merge_without_caller_parameters_references_the_cached_payload():
+    merged = GatewayService()._merge_parameters({"body": {"applicationId": "APP_1"}}, CACHED)
+
+    assert merged["body"]["parameters"] is CACHED
@@ -0,0 +1,35 @@
+import httpx
+import orjson
+import pytest
+from app.services.gateway_service import GatewayService
+from app.services.json_codec import GatewayJSONCodec
+
+def test_valid_json_is_embedded_verbatim():
+    codec = GatewayJSONCodec(fast=True)
+
+    body = codec.upstream_body(b'{"score": 700}', "application/json; charset=utf-8")
+
+    assert isinstance(body, orjson.Fragment)
+    assert codec.dumps({"body": body}) == b'{"body":{"score": 700}}'
+
+@pytest.mark.parametrize("content", [b'{"score": 7', b"<html>Bad Gateway</html>", b'{"a": 1} trailing', b"\xff\xfe",
+                                     b'"text"', b"  "])
+def test_invalid_json_is_not_embedded(content):
+    assert GatewayJSONCodec(fast=True).upstream_body(content, "application/json") is None
+
+def test_values_orjson_cannot_parse_pass_through_unchanged():
+    codec = GatewayJSONCodec(fast=True)
+
+    body = codec.upstream_body(b'\n{"id": 123456789012345678901234567890}\n', "application/json")
+
+    assert codec.dumps(body) == b'{"id": 123456789012345678901234567890}'
+
+def test_non_json_content_types_and_slow_mode_are_decoded_the_slow_way():
+    assert GatewayJSONCodec(fast=True).upstream_body(b'{"a": 1}', "text/plain") is None
+    assert GatewayJSONCodec(fast=False).upstream_body(b'{"a": 1}', "application/json") is None
+
+def test_mislabelled_upstream_body_is_relayed_as_text(monkeypatch):
+    monkeypatch.setattr("app.services.gateway_service.gateway_json", GatewayJSONCodec(fast=True))
+    response = httpx.Response(502, headers={"content-type": "application/json"}, content=b"<html>Bad Gateway</html>")
+
+    assert GatewayService()._decode_body(response) == {"content": "<html>Bad Gateway</html>"}
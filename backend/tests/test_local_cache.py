@@ -0,0 +1,56 @@
+from app.services.local_cache import LocalCache
+
+def test_entries_are_evicted_least_recently_used_first():
+    cache = LocalCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_max_bytes_bounds_total_size():
+    cache = LocalCache(max_entries=100, ttl=60, max_bytes=10)
+    cache.set("a", "a", size=4)
+    cache.set("b", "b", size=4)
+    cache.set("c", "c", size=4)
+
+    assert cache.get("a") is None
+    assert cache.bytes == 8
+    assert len(cache) == 2
+
+def test_replacing_an_entry_releases_its_size():
+    cache = LocalCache(max_entries=100, ttl=60, max_bytes=10)
+    cache.set("a", "a", size=6)
+    cache.set("a", "a", size=3)
+    cache.delete("a")
+
+    assert cache.bytes == 0
+
+def test_entry_larger_than_max_bytes_is_not_stored():
+    cache = LocalCache(max_entries=100, ttl=60, max_bytes=10)
+    cache.set("a", "a", size=4)
+    cache.set("big", "big", size=11)
+
+    assert cache.get("big") is None
+    assert cache.get("a") == "a"
+    assert cache.bytes == 4
+
+def test_expired_entries_are_misses():
+    cache = LocalCache(max_entries=10, ttl=60, max_bytes=10)
+    cache.set("a", "a", ttl=0, size=5)
+
+    assert cache.get("a") is None
+    assert cache.bytes == 0
+
+def test_full_only_when_a_live_entry_would_be_evicted():
+    cache = LocalCache(max_entries=2, ttl=60)
+    cache.set("a", 1, ttl=0)
+    assert not cache.full()
+    cache.set("b", 2)
+    assert not cache.full()
+    cache.set("a", 1)
+    assert cache.full()
@@ -0,0 +1,75 @@
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.main import app
+from app.services import metrics
+from app.services.admission import AdmissionController
+from app.services.gateway_service import GatewayService
+from app.services.routing_service import FicoRoute
+
+ROUTE = FicoRoute("METRICS", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret")
+STAGES = [metrics.STAGE_EXTRACT, metrics.STAGE_CONFIG_LOOKUP, metrics.STAGE_AUGMENT,
+          metrics.STAGE_AUTH, metrics.STAGE_UPSTREAM]
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def stage_counts(product_code, version):
+    return [sample("gateway_stage_duration_seconds_count", stage=stage, product_code=product_code, version=version)
+            for stage in STAGES]
+
+@pytest.fixture
+def gateway(monkeypatch):
+    monkeypatch.setattr("app.services.gateway_service.admission_controller", AdmissionController())
+    gateway = GatewayService()
+    monkeypatch.setattr(gateway, "_get_fico_config",
+                        lambda code, version, sticky_key=None: (ROUTE, None) if code == "METRICS" else (None, None))
+
+    async def get_parameters(product_id, subproduct_id):
+        return {}
+
+    async def get_auth_token(fico_config):
+        return "token"
+
+    async def post(url, stream=False, **kwargs):
+        return httpx.Response(200, json={"score": 700})
+    monkeypatch.setattr("app.services.gateway_service.cache_service.get_or_refresh_parameters", get_parameters)
+    monkeypatch.setattr(gateway, "_get_auth_token", get_auth_token)
+    monkeypatch.setattr(gateway.upstream_pool, "post", post)
+    return gateway
+
+@pytest.mark.asyncio
+async def test_each_stage_is_timed_under_the_route_labels(gateway):
+    stages_before = stage_counts("METRICS", "1.0")
+    requests_before = sample("gateway_request_duration_seconds_count",
+                             product_code="METRICS", version="1.0", status_code="200")
+
+    response, status_code = await gateway.process_request({"headers": {}, "body": {"bomVersionId": "METRICS_v1.0"}})
+
+    assert status_code == 200
+    assert response["status_code"] == 200
+    assert [after - before for before, after in zip(stages_before, stage_counts("METRICS", "1.0"))] == [1] * 5
+    assert sample("gateway_request_duration_seconds_count",
+                  product_code="METRICS", version="1.0", status_code="200") == requests_before + 1
+    assert sample("gateway_upstream_responses_total",
+                  product_code="METRICS", version="1.0", status_code="200") >= 1
+
+@pytest.mark.asyncio
+async def test_unrouted_requests_are_labelled_unknown(gateway):
+    unknown_before = sample("gateway_request_duration_seconds_count",
+                            product_code=metrics.UNKNOWN, version=metrics.UNKNOWN, status_code="404")
+
+    _, status_code = await gateway.process_request({"headers": {}, "body": {"bomVersionId": "ROGUE_v6.6"}})
+
+    assert status_code == 404
+    assert sample("gateway_request_duration_seconds_count",
+                  product_code=metrics.UNKNOWN, version=metrics.UNKNOWN, status_code="404") == unknown_before + 1
+    assert "ROGUE" not in metrics.render_metrics()[0].decode()
+
+def test_metrics_endpoint_serves_the_exposition_format():
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE gateway_stage_duration_seconds histogram" in response.text
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import get_db
+from app.main import app
+from app.models import Base, ChangeLog, ConfigurableParameters
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/pages.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def client(Session, monkeypatch):
+    with Session() as db:
+        started = datetime(2026, 1, 1)
+        db.add_all(ChangeLog(
+            table_name="configurable_parameters", record_id=f"CC:STD:{n}", field_name="value", new_value=str(n),
+            changed_by="editor1" if n % 2 else "editor2", change_timestamp=started + timedelta(minutes=n)
+        ) for n in range(7))
+        db.add_all(ConfigurableParameters(
+            product_id="CC", subproduct_id="STD", component="ScoreComponent", parameter=f"p{n}", value=str(n),
+            effective_from=started, created_by="test"
+        ) for n in range(5))
+        db.commit()
+
+    def get_test_db():
+        with Session() as db:
+            yield db
+    monkeypatch.setitem(app.dependency_overrides, get_db, get_test_db)
+    return TestClient(app)
+
+def all_pages(client, url, **params):
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, "cursor": cursor} if cursor else params)
+        assert response.status_code == 200
+        pages.append(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+def test_change_logs_page_newest_first_without_gaps_or_repeats(client):
+    pages = all_pages(client, "/api/change-logs", limit=3, fields="log_id,record_id")
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [item["record_id"] for page in pages for item in page] == [f"CC:STD:{n}" for n in range(6, -1, -1)]
+    assert set(pages[0][0]) == {"log_id", "record_id"}
+
+def test_lists_without_a_limit_return_one_default_page(client, Session):
+    with Session() as db:
+        db.add_all(ConfigurableParameters(
+            product_id="DM", subproduct_id="STD", component="ScoreComponent", parameter=f"p{n:03}", value=str(n),
+            effective_from=datetime(2026, 1, 1), created_by="test"
+        ) for n in range(settings.admin_page_size))
+        db.commit()
+
+    response = client.get("/api/parameters")
+
+    assert len(response.json()) == settings.admin_page_size
+    assert response.headers["X-Next-Cursor"]
+    assert len(all_pages(client, "/api/parameters")) == 2
+
+def test_filters_apply_across_pages(client):
+    pages = all_pages(client, "/api/change-logs", changed_by="editor1", limit=2, fields="record_id")
+
+    assert [item["record_id"] for page in pages for item in page] == ["CC:STD:5", "CC:STD:3", "CC:STD:1"]
+
+def test_unknown_fields_and_bad_cursors_are_rejected(client):
+    assert client.get("/api/parameters?fields=value,password").status_code == 400
+    assert client.get("/api/change-logs?cursor=not-a-cursor").status_code == 400
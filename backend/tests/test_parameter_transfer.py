@@ -0,0 +1,94 @@
+import json
+import pytest
+from app.config import settings
+from app.database import SessionLocal, create_tables
+from app.models import ChangeLog, ConfigurableParameters
+from app.services.parameter_transfer import ParameterImportError, export_parameters, import_parameters
+
+CSV = (
+    "\ufeffproduct_id,subproduct_id,component,parameter,value,effective_from,effective_to\r\n"
+    "IMPORT,STD,Score,cutoff,600,2026-01-01T00:00:00,\r\n"
+    "\r\n"
+    "IMPORT,STD,Score,ceiling,900,2026-01-01T00:00:00,2026-12-31T00:00:00\r\n"
+    "IMPORT,GOLD,Limits,max,5000,2026-01-01T00:00:00,\r\n"
+).encode()
+
+@pytest.fixture(autouse=True)
+def database(monkeypatch):
+    create_tables()
+    invalidated = []
+    monkeypatch.setattr("app.services.parameter_transfer.cache_service.invalidate_cache",
+                        lambda *key: invalidated.append(key))
+    monkeypatch.setattr(settings, "parameter_import_chunk_size", 2)
+    yield invalidated
+    with SessionLocal() as db:
+        db.query(ConfigurableParameters).filter(ConfigurableParameters.product_id == "IMPORT").delete()
+        db.query(ChangeLog).filter(ChangeLog.record_id.like("IMPORT:%")).delete(synchronize_session=False)
+        db.commit()
+
+async def chunked(data: bytes, size: int = 7):
+    for offset in range(0, len(data), size):
+        yield data[offset:offset + size]
+
+def imported_rows():
+    with SessionLocal() as db:
+        return {
+            (row.subproduct_id, row.parameter): (row.value, row.status, row.effective_to is not None)
+            for row in db.query(ConfigurableParameters).filter(ConfigurableParameters.product_id == "IMPORT")
+        }
+
+@pytest.mark.asyncio
+async def test_csv_split_across_chunks_is_imported_as_pending(database):
+    result = await import_parameters(chunked(CSV), "csv", "editor1")
+
+    assert result == {"imported": 3, "invalidated": 2}
+    assert imported_rows() == {
+        ("STD", "cutoff"): ("600", "PENDING_APPROVAL", False),
+        ("STD", "ceiling"): ("900", "PENDING_APPROVAL", True),
+        ("GOLD", "max"): ("5000", "PENDING_APPROVAL", False)
+    }
+    with SessionLocal() as db:
+        assert db.query(ChangeLog).filter(ChangeLog.record_id.like("IMPORT:%")).count() == 3
+    assert sorted(database) == [("IMPORT", "GOLD"), ("IMPORT", "STD")]
+
+@pytest.mark.asyncio
+async def test_any_invalid_row_rolls_back_the_whole_import(database):
+    lines = [
+        json.dumps({"product_id": "IMPORT", "subproduct_id": "STD", "component": "Score", "parameter": f"p{n}",
+                    "value": str(n), "effective_from": "2026-01-01T00:00:00"})
+        for n in range(3)
+    ]
+    lines += ["not json", json.dumps({"product_id": "IMPORT", "subproduct_id": "STD"})]
+
+    with pytest.raises(ParameterImportError) as rejected:
+        await import_parameters(chunked("\n".join(lines).encode()), "ndjson", "editor1")
+
+    assert rejected.value.status_code == 422
+    assert [error["line"] for error in rejected.value.errors] == [4, 5]
+    assert imported_rows() == {}
+    assert database == []
+
+@pytest.mark.asyncio
+async def test_existing_keys_roll_back_with_a_conflict(database):
+    await import_parameters(chunked(CSV), "csv", "editor1")
+
+    with pytest.raises(ParameterImportError) as rejected:
+        await import_parameters(chunked(CSV.replace(b"GOLD", b"PLATINUM")), "csv", "editor1")
+
+    assert rejected.value.status_code == 409
+    assert ("PLATINUM", "max") not in imported_rows()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["csv", "ndjson"])
+async def test_export_can_be_imported_again(fmt):
+    await import_parameters(chunked(CSV), "csv", "editor1")
+    exported = "".join(export_parameters(fmt, product_id="IMPORT")).encode()
+    before = imported_rows()
+    with SessionLocal() as db:
+        db.query(ConfigurableParameters).filter(ConfigurableParameters.product_id == "IMPORT").delete()
+        db.commit()
+
+    result = await import_parameters(chunked(exported), fmt, "editor2")
+
+    assert result["imported"] == 3
+    assert imported_rows() == before
@@ -0,0 +1,64 @@
+from dataclasses import replace
+import pytest
+from app.services.response_cache import ResponseCache, IdempotencyKeyReused
+from app.services.routing_service import FicoRoute
+from tests.fakes import FakeRedisStore, FakeAsyncRedis
+
+ROUTE = FicoRoute("PLOR", "1.2", "http://fico/score", "http://fico/token", "client", "secret", response_cache_ttl=60)
+RESPONSE = {"status_code": 200, "headers": {"content-type": "application/json"}, "body": {"score": 700}}
+
+@pytest.fixture
+def cache():
+    cache = ResponseCache()
+    cache.redis_client = FakeAsyncRedis(FakeRedisStore())
+    return cache
+
+def request(body, headers=None):
+    return {"body": body, "headers": headers or {}}
+
+def test_idempotency_key_is_scoped_to_caller_and_forwarded_headers(cache):
+    client_headers = {"Idempotency-Key": "abc"}
+    key = cache.cache_key(ROUTE, request({"a": 1}), client_headers, caller="team-a")
+
+    assert key != cache.cache_key(ROUTE, request({"a": 1}), client_headers, caller="team-b")
+    assert key != cache.cache_key(ROUTE, request({"a": 1}, {"X-Channel": "web"}), client_headers, caller="team-a")
+    assert key.key == cache.cache_key(ROUTE, request({"a": 2}), client_headers, caller="team-a").key
+
+def test_body_key_ignores_key_order_but_not_forwarded_headers(cache):
+    key = cache.cache_key(ROUTE, request({"a": 1, "b": 2}))
+
+    assert key == cache.cache_key(ROUTE, request({"b": 2, "a": 1}))
+    assert key != cache.cache_key(ROUTE, request({"a": 1, "b": 2}, {"X-Channel": "web"}))
+
+def test_no_cache_and_disabled_configs_are_not_cached(cache):
+    assert cache.cache_key(ROUTE, request({"a": 1}), {"Cache-Control": "max-age=0, no-cache"}) is None
+    assert cache.cache_key(replace(ROUTE, response_cache_ttl=0), request({"a": 1})) is None
+
+@pytest.mark.asyncio
+async def test_idempotency_key_replays_response_for_same_body(cache):
+    key = cache.cache_key(ROUTE, request({"a": 1}), {"Idempotency-Key": "abc"})
+    await cache.set(ROUTE, key, RESPONSE)
+    cache.local_cache.clear()
+
+    cached = await cache.get(ROUTE, key)
+
+    assert cached["status_code"] == 200
+    assert cached["headers"] == RESPONSE["headers"]
+
+@pytest.mark.asyncio
+async def test_idempotency_key_reused_with_different_body_is_rejected(cache):
+    await cache.set(ROUTE, cache.cache_key(ROUTE, request({"a": 1}), {"Idempotency-Key": "abc"}), RESPONSE)
+    reused = cache.cache_key(ROUTE, request({"a": 2}), {"Idempotency-Key": "abc"})
+
+    with pytest.raises(IdempotencyKeyReused):
+        await cache.get(ROUTE, reused)
+    cache.local_cache.clear()
+    with pytest.raises(IdempotencyKeyReused):
+        await cache.get(ROUTE, reused)
+
+@pytest.mark.asyncio
+async def test_error_responses_are_not_cached(cache):
+    key = cache.cache_key(ROUTE, request({"a": 1}))
+    await cache.set(ROUTE, key, {**RESPONSE, "status_code": 500})
+
+    assert await cache.get(ROUTE, key) is None
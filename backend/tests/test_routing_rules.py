@@ -0,0 +1,71 @@
+import json
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import create_routing_rule, update_routing_rule, deactivate_routing_rule, approve_change
+from app.models import Base, ChangeLog, FicoEnvironmentConfig, FicoRoutingRule, User
+from app.schemas import ApprovalRequest, FicoRoutingRuleBase, FicoRoutingRuleCreate
+from app.services.routing_service import routing_table
+
+EDITOR = User(user_id="editor1", role="EDITOR")
+APPROVER = User(user_id="approver1", role="APPROVER")
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/rules.db")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for version in ("1.0", "2.0"):
+        session.add(FicoEnvironmentConfig(
+            product_code="PLOR", version=version, url=f"http://fico/{version}", authentication_url="http://fico/token",
+            client_id="client", secret="secret", created_by="test"
+        ))
+    session.commit()
+    routing_table.load(session)
+    yield session
+    session.close()
+
+def approve(db, user=APPROVER):
+    change_log = db.query(ChangeLog).filter(ChangeLog.status == "PENDING_APPROVAL").one()
+    approve_change(change_log.log_id, ApprovalRequest(
+        log_id=change_log.log_id, action="APPROVE", approved_by=user.user_id
+    ), db, user)
+    return change_log
+
+def routed_version(version="1.0"):
+    return routing_table.resolve("PLOR", version)[0].version
+
+def test_rule_changes_only_route_traffic_once_approved(db):
+    create_routing_rule(FicoRoutingRuleCreate(
+        product_code="PLOR", version="1.0", targets=[{"product_code": "PLOR", "version": "2.0", "weight": 1}]
+    ), db, EDITOR)
+    assert routed_version() == "1.0"
+
+    change_log = approve(db)
+    assert json.loads(change_log.new_value)["status"] == "ACTIVE"
+    assert routed_version() == "2.0"
+
+    update_routing_rule("PLOR", "1.0", FicoRoutingRuleBase(
+        targets=[{"product_code": "PLOR", "version": "1.0", "weight": 1}]
+    ), db, EDITOR)
+    assert routed_version() == "2.0"
+    change_log = approve(db)
+    assert json.loads(change_log.old_value)["targets"][0]["version"] == "2.0"
+    assert routed_version() == "1.0"
+
+    deactivate_routing_rule("PLOR", "1.0", db, EDITOR)
+    approve(db)
+    assert db.get(FicoRoutingRule, ("PLOR", "1.0")).status == "INACTIVE"
+    assert routing_table.resolve("PLOR", "1.0")[1] is None
+
+def test_rule_change_cannot_be_approved_by_its_author(db):
+    create_routing_rule(FicoRoutingRuleCreate(
+        product_code="PLOR", version="1.0", targets=[{"product_code": "PLOR", "version": "2.0", "weight": 1}]
+    ), db, APPROVER)
+
+    with pytest.raises(HTTPException) as error:
+        approve(db, APPROVER)
+
+    assert error.value.status_code == 403
+    assert routed_version() == "1.0"
@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, FicoEnvironmentConfig, FicoRoutingRule
+from app.services.gateway_service import GatewayService
+from app.services.routing_service import RoutingTable
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/routing.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for version in ("1.0", "2.0"):
+        session.add(FicoEnvironmentConfig(
+            product_code="PLOR", version=version, url=f"http://fico/{version}", authentication_url="http://fico/token",
+            client_id="client", secret="secret", created_by="test"
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+def add_rule(db, targets, **fields):
+    db.add(FicoRoutingRule(product_code="PLOR", version="1.0", targets=json.dumps(targets), created_by="test", **fields))
+    db.commit()
+
+def test_resolve_without_rule_uses_requested_route(db):
+    table = RoutingTable()
+    table.load(db)
+
+    route, rule = table.resolve("PLOR", "1.0")
+
+    assert route.url == "http://fico/1.0"
+    assert rule is None
+    assert table.resolve("NOPE", "1.0") == (None, None)
+    assert table.unknown_lookups.total == 1
+
+def test_rule_splits_by_weight_and_sticky_key_is_stable(db):
+    add_rule(db, [{"product_code": "PLOR", "version": "1.0", "weight": 1},
+                  {"product_code": "PLOR", "version": "2.0", "weight": 1}])
+    table = RoutingTable()
+    table.load(db)
+
+    picked = {table.resolve("PLOR", "1.0", sticky_key=f"APP_{n}")[0].version for n in range(50)}
+    sticky = {table.resolve("PLOR", "1.0", sticky_key="APP_1")[0].version for _ in range(20)}
+
+    assert picked == {"1.0", "2.0"}
+    assert len(sticky) == 1
+
+def test_targets_that_are_not_active_configs_are_dropped(db):
+    add_rule(db, [{"product_code": "GONE", "version": "1.0", "weight": 100}],
+             shadow_product_code="PLOR", shadow_version="2.0", shadow_sample_rate=0.5)
+    table = RoutingTable()
+    table.load(db)
+
+    route, rule = table.resolve("PLOR", "1.0")
+
+    assert route.version == "1.0"
+    assert rule.shadow.version == "2.0"
+
+def test_unchanged_reload_keeps_generation(db):
+    table = RoutingTable()
+
+    assert table.load(db) == 1
+    assert table.load(db) == 1
+    add_rule(db, [{"product_code": "PLOR", "version": "2.0", "weight": 1}])
+    assert table.load(db) == 2
+    assert table.resolve("PLOR", "1.0")[0].version == "2.0"
+
+def test_concurrent_loads_publish_one_generation_per_change(db):
+    table = RoutingTable()
+    sessions = [sessionmaker(bind=db.get_bind())() for _ in range(8)]
+    threads = [threading.Thread(target=table.load, args=(session,)) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert table.generation == 1
+    for session in sessions:
+        session.close()
+
+def test_list_bodies_are_sticky_on_their_application_id(db, monkeypatch):
+    add_rule(db, [{"product_code": "PLOR", "version": "1.0", "weight": 1},
+                  {"product_code": "PLOR", "version": "2.0", "weight": 1}])
+    table = RoutingTable()
+    table.load(db)
+    monkeypatch.setattr("app.services.gateway_service.routing_table", table)
+    gateway = GatewayService()
+
+    def routed_version(application_id):
+        body = [{"name": "request", "value": {"bomVersionId": "PLOR_v1.0", "applicationId": application_id}}]
+        return gateway._resolve_route({"body": body})[1].version
+
+    versions = {n: {routed_version(f"APP_{n}") for _ in range(10)} for n in range(20)}
+
+    assert all(len(picked) == 1 for picked in versions.values())
+    assert set().union(*versions.values()) == {"1.0", "2.0"}
+
+class SlowRuleQuery:
+    """Reads routing rules, then stalls before the load can publish them"""
+
+    def __init__(self, query, read):
+        self.query = query
+        self.read = read
+
+    def filter(self, *criteria):
+        return SlowRuleQuery(self.query.filter(*criteria), self.read)
+
+    def all(self):
+        rows = self.query.all()
+        self.read.set()
+        time.sleep(0.2)
+        return rows
+
+class SlowSession:
+    def __init__(self, session, read):
+        self.session = session
+        self.read = read
+
+    def query(self, model):
+        query = self.session.query(model)
+        return SlowRuleQuery(query, self.read) if model is FicoRoutingRule else query
+
+def test_slow_load_cannot_publish_over_a_later_one(db):
+    table = RoutingTable()
+    table.load(db)
+    read = threading.Event()
+    slow_session = sessionmaker(bind=db.get_bind())()
+    slow = threading.Thread(target=table.load, args=(SlowSession(slow_session, read),))
+    slow.start()
+    read.wait()
+
+    add_rule(db, [{"product_code": "PLOR", "version": "2.0", "weight": 1}])
+    later = threading.Thread(target=table.load, args=(db,))
+    later.start()
+    slow.join()
+    later.join()
+
+    assert table.resolve("PLOR", "1.0")[0].version == "2.0"
+    slow_session.close()
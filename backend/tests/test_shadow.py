@@ -0,0 +1,67 @@
+import asyncio
+import httpx
+import orjson
+import pytest
+from app.services import gateway_service as gateway_module
+from app.services.gateway_service import GatewayService
+from app.services.response_cache import response_cache
+from app.services.routing_service import FicoRoute, RoutingRule
+from app.services.shadow import ShadowMirror
+from tests.fakes import FakeRedisStore, FakeAsyncRedis
+
+PRIMARY = FicoRoute("PLOR", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret", response_cache_ttl=60)
+SHADOW = FicoRoute("PLOR", "2.0", "http://fico/2.0", "http://fico/token", "client", "secret")
+RULE = RoutingRule("PLOR", "1.0", ((PRIMARY, 1),), 1, SHADOW, 1.0)
+
+def response(status_code, body):
+    return {"status_code": status_code, "headers": {}, "body": body}
+
+@pytest.mark.asyncio
+async def test_only_successful_responses_are_mirrored():
+    mirror = ShadowMirror()
+    calls = []
+
+    async def call(shadow):
+        calls.append(shadow)
+        return response(200, {"score": 650})
+
+    mirror.mirror(RULE, PRIMARY, response(500, {"error": "x"}), 0.1, call)
+    mirror.mirror(RULE, PRIMARY, response(200, {"score": 700}), 0.1, call)
+    await asyncio.gather(*mirror._tasks)
+
+    assert calls == [SHADOW]
+    stats = mirror.get_stats()["rules"]["PLOR:1.0"]
+    assert stats["differed"] == 1
+    assert stats["avg_primary_ms"] == 100.0
+    assert stats["recent_diffs"][0]["fields"] == ["body.score"]
+
+@pytest.mark.asyncio
+async def test_cache_hits_and_shared_calls_are_not_mirrored(monkeypatch):
+    gateway = GatewayService()
+    mirrored = []
+    monkeypatch.setattr(gateway_module.shadow_mirror, "mirror", lambda *args: mirrored.append(args))
+    monkeypatch.setattr(response_cache, "redis_client", FakeAsyncRedis(FakeRedisStore()))
+    response_cache.local_cache.clear()
+
+    async def call_fico(fico_config, request_data, stream=False):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"score": 700})
+    monkeypatch.setattr(gateway, "_call_fico", call_fico)
+
+    request = {"body": {"applicationId": "APP_1"}, "headers": {}}
+    await asyncio.gather(*(gateway._route_to_fico_cached(PRIMARY, request, rule=RULE) for _ in range(3)))
+    await gateway._route_to_fico_cached(PRIMARY, request, rule=RULE)
+
+    assert len(mirrored) == 1
+    rule, primary, mirrored_response, seconds, _ = mirrored[0]
+    assert mirrored_response["status_code"] == 200
+    assert seconds >= 0.01
+
+def test_passed_through_bodies_are_compared_by_value():
+    mirror = ShadowMirror()
+    fragment = orjson.Fragment(b'{"id": 123456789012345678901234567890, "score": 700}')
+
+    fields = mirror._diff(response(200, fragment), response(200, {"id": 123456789012345678901234567890, "score": 650}))
+
+    assert fields == ["body.score"]
+    assert mirror._diff(response(200, orjson.Fragment(b'{"a": }')), response(200, {"a": 1})) == ["body"]
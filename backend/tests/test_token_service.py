@@ -0,0 +1,121 @@
+import asyncio
+import httpx
+import pytest
+from app.services.gateway_service import GatewayService, UpstreamError
+from app.services.routing_service import FicoRoute
+from app.services.token_service import TokenManager
+
+KEY = ("PLOR", "1.0", "client")
+
+class Fetcher:
+    def __init__(self, *tokens):
+        self.tokens = list(tokens)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        token = self.tokens.pop(0)
+        await self.release.wait()
+        if isinstance(token, Exception):
+            raise token
+        return token, 300
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_fetch():
+    manager = TokenManager()
+    fetch = Fetcher("t1")
+    fetch.release.clear()
+
+    callers = [asyncio.create_task(manager.get_token(KEY, fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(*callers) == ["t1"] * 5
+    assert fetch.calls == 1
+
+@pytest.mark.asyncio
+async def test_refresh_in_flight_during_invalidate_is_not_cached():
+    manager = TokenManager()
+    stale = Fetcher("old")
+    stale.release.clear()
+    waiting = asyncio.create_task(manager.get_token(KEY, stale))
+    await asyncio.sleep(0)
+
+    manager.invalidate("PLOR", "1.0")
+    fresh = Fetcher("new")
+    assert await manager.get_token(KEY, fresh) == "new"
+    stale.release.set()
+    assert await waiting == "old"
+
+    assert await manager.get_token(KEY, Fetcher("unused")) == "new"
+    assert manager.get_stats()["environments"]["PLOR:1.0"]["superseded"] == 1
+    assert manager.get_stats()["inflight_refreshes"] == 0
+
+@pytest.mark.asyncio
+async def test_failed_fetch_is_backed_off_until_invalidated():
+    manager = TokenManager()
+    manager.failure_backoff = 60
+    fetch = Fetcher(ValueError("Token endpoint returned 500"), "t1")
+
+    with pytest.raises(ValueError):
+        await manager.get_token(KEY, fetch)
+    with pytest.raises(RuntimeError, match="failed recently"):
+        await manager.get_token(KEY, fetch)
+    assert fetch.calls == 1
+    assert manager.get_stats()["backing_off"] == 1
+
+    manager.invalidate("PLOR", "1.0")
+    assert await manager.get_token(KEY, fetch) == "t1"
+    assert manager.get_stats()["environments"]["PLOR:1.0"]["backoff_rejections"] == 1
+
+@pytest.mark.asyncio
+async def test_fetch_is_retried_once_backoff_expires():
+    manager = TokenManager()
+    manager.failure_backoff = 0
+    fetch = Fetcher(ValueError("Token endpoint returned 500"), "t1")
+
+    with pytest.raises(ValueError):
+        await manager.get_token(KEY, fetch)
+
+    assert await manager.get_token(KEY, fetch) == "t1"
+    assert manager.get_stats()["backing_off"] == 0
+
+@pytest.mark.asyncio
+async def test_invalidate_can_keep_an_unexpired_backoff():
+    manager = TokenManager()
+    manager.failure_backoff = 60
+    with pytest.raises(ValueError):
+        await manager.get_token(KEY, Fetcher(ValueError("Token endpoint returned 500")))
+
+    manager.invalidate("PLOR", "1.0", clear_backoff=False)
+
+    assert manager.get_stats()["backing_off"] == 1
+
+ROUTE = FicoRoute("PLOR", "1.0", "http://fico/1.0", "http://fico/token", "client", "secret")
+
+class FicoPool:
+    """Token endpoint failing with 500 and Fico rejecting every token with 401"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def post(self, url, **kwargs):
+        self.calls.append(url)
+        return httpx.Response(500 if url == ROUTE.authentication_url else 401, json={})
+
+@pytest.mark.asyncio
+async def test_failed_token_fetch_is_not_repeated_for_every_request(monkeypatch):
+    manager = TokenManager()
+    manager.failure_backoff = 60
+    monkeypatch.setattr("app.services.gateway_service.token_manager", manager)
+    gateway = GatewayService()
+    gateway.upstream_pool = FicoPool()
+
+    for _ in range(10):
+        with pytest.raises(UpstreamError) as error:
+            await gateway._call_fico(ROUTE, {"body": {}})
+        assert error.value.status_code == 502
+
+    assert gateway.upstream_pool.calls == [ROUTE.authentication_url]
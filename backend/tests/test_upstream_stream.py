@@ -0,0 +1,48 @@
+import httpx
+import pytest
+from app.services.gateway_service import UpstreamStream, UpstreamStreamingResponse
+
+class ClosingStream(httpx.AsyncByteStream):
+    def __init__(self):
+        self.closed = 0
+
+    async def __aiter__(self):
+        yield b'{"score":'
+        yield b'700}'
+
+    async def aclose(self):
+        self.closed += 1
+
+def upstream_stream():
+    body = ClosingStream()
+    finished = []
+    stream = UpstreamStream(httpx.Response(200, headers={"Server": "fico"}, stream=body), lambda: finished.append(1))
+    return stream, body, finished
+
+@pytest.mark.asyncio
+async def test_relayed_body_closes_once():
+    stream, body, finished = upstream_stream()
+
+    chunks = [chunk async for chunk in stream.iter_bytes()]
+    await stream.aclose()
+
+    assert b"".join(chunks) == b'{"score":700}'
+    assert "server" not in stream.headers
+    assert finished == [1]
+    assert body.closed == 1
+
+@pytest.mark.asyncio
+async def test_response_closes_stream_when_send_fails_before_body():
+    stream, body, finished = upstream_stream()
+
+    async def send(message):
+        raise OSError("client went away")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    with pytest.raises(Exception):
+        await UpstreamStreamingResponse(stream)({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+
+    assert finished == [1]
+    assert body.closed == 1
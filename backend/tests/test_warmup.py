@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.warmup import CacheWarmer, cache_warmer
+
+def warmer_loading(monkeypatch, entries, write_delay=0.0):
+    warmer = CacheWarmer()
+    warmer.enabled = True
+    warmer.ready = False
+    warmer.batch_size = 2
+    warmer.concurrency = 2
+    writes = []
+    in_flight = [0, 0]
+
+    async def load_all(db):
+        return entries
+
+    async def set_many(batch):
+        in_flight[0] += 1
+        in_flight[1] = max(in_flight)
+        await asyncio.sleep(write_delay)
+        writes.append(batch)
+        in_flight[0] -= 1
+    monkeypatch.setattr("app.services.warmup.cache_service.load_all_parameters_async", load_all)
+    monkeypatch.setattr("app.services.warmup.cache_service.set_many_cached_parameters_async", set_many)
+    return warmer, writes, in_flight
+
+@pytest.mark.asyncio
+async def test_ready_only_after_every_parameter_set_is_written(monkeypatch):
+    entries = [(f"key{n}", {}) for n in range(5)]
+    warmer, writes, in_flight = warmer_loading(monkeypatch, entries, write_delay=0.01)
+
+    warmer.start()
+    await asyncio.sleep(0)
+    assert not warmer.ready
+    await warmer._task
+
+    assert warmer.ready
+    assert sorted(entry for batch in writes for entry in batch) == entries
+    assert [len(batch) for batch in writes] == [2, 2, 1]
+    assert in_flight[1] == 2
+    assert warmer.get_stats()["parameter_sets"] == 5
+    assert warmer.get_stats()["error"] is None
+
+@pytest.mark.asyncio
+async def test_timed_out_warm_up_still_becomes_ready(monkeypatch):
+    warmer, _, _ = warmer_loading(monkeypatch, [("key", {})], write_delay=1.0)
+    warmer.timeout = 0.01
+
+    warmer.start()
+    await warmer._task
+
+    assert warmer.ready
+    assert warmer.get_stats()["error"] == "timed out after 0.01s"
+
+@pytest.mark.asyncio
+async def test_failed_warm_up_still_becomes_ready(monkeypatch):
+    warmer, _, _ = warmer_loading(monkeypatch, [])
+
+    async def load_all(db):
+        raise ConnectionError("database unavailable")
+    monkeypatch.setattr("app.services.warmup.cache_service.load_all_parameters_async", load_all)
+
+    warmer.start()
+    await warmer._task
+
+    assert warmer.ready
+    assert warmer.get_stats()["error"] == "database unavailable"
+
+def test_readyz_reports_warm_up(monkeypatch):
+    client = TestClient(app)
+
+    monkeypatch.setattr(cache_warmer, "ready", False)
+    assert client.get("/readyz").status_code == 503
+    assert client.get("/healthz").status_code == 200
+
+    monkeypatch.setattr(cache_warmer, "ready", True)
+    assert client.get("/readyz").json() == {"status": "ready"}
@@ -34,6 +34,7 @@ interface ChangeLogViewerProps {
 
 export function ChangeLogViewer({ user, token }: ChangeLogViewerProps) {
   const [changeLogs, setChangeLogs] = useState<ChangeLog[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [pendingChanges, setPendingChanges] = useState<ChangeLog[]>([])
   const [loading, setLoading] = useState(true)
   const [selectedChange, setSelectedChange] = useState<ChangeLog | null>(null)
@@ -46,15 +47,18 @@ export function ChangeLogViewer({ user, token }: ChangeLogViewerProps) {
     fetchPendingChanges()
   }, [])
 
-  const fetchChangeLogs = async () => {
+  // Without a cursor the list is reloaded from its first page; with one, the next page is appended
+  const fetchChangeLogs = async (cursor?: string) => {
     try {
-      const response = await fetch('http://localhost:8000/api/change-logs', {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+      const response = await fetch(`http://localhost:8000/api/change-logs${query}`, {
         headers: {
           'Authorization': `Bearer ${token}`
         }
       })
       const data = await response.json()
-      setChangeLogs(data)
+      setChangeLogs(cursor ? (loaded) => [...loaded, ...data] : data)
+      setNextCursor(response.headers.get('X-Next-Cursor'))
     } catch (error) {
       toast({
         title: "Error",
@@ -163,7 +167,7 @@ export function ChangeLogViewer({ user, token }: ChangeLogViewerProps) {
             Pending Approval ({pendingChanges.length})
           </TabsTrigger>
           <TabsTrigger value="all" className="data-[state=active]:bg-blue-600 data-[state=active]:text-white text-blue-700 hover:bg-blue-50">
-            All Changes ({changeLogs.length})
+            All Changes ({changeLogs.length}{nextCursor ? '+' : ''})
           </TabsTrigger>
         </TabsList>
 
@@ -286,6 +290,17 @@ export function ChangeLogViewer({ user, token }: ChangeLogViewerProps) {
                   No change logs found.
                 </div>
               )}
+              {nextCursor && (
+                <div className="flex justify-center pt-4">
+                  <Button
+                    variant="outline"
+                    onClick={() => fetchChangeLogs(nextCursor)}
+                    className="border-blue-300 text-blue-700 hover:bg-blue-50 hover:border-blue-400"
+                  >
+                    Load more
+                  </Button>
+                </div>
+              )}
             </CardContent>
           </Card>
         </TabsContent>
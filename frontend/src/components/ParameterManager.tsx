@@ -32,6 +32,7 @@ interface ParameterManagerProps {
 
 export function ParameterManager({ user, token }: ParameterManagerProps) {
   const [parameters, setParameters] = useState<Parameter[]>([])
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
   const [isDialogOpen, setIsDialogOpen] = useState(false)
   const [editingParameter, setEditingParameter] = useState<Parameter | null>(null)
@@ -53,15 +54,18 @@ export function ParameterManager({ user, token }: ParameterManagerProps) {
     fetchParameters()
   }, [])
 
-  const fetchParameters = async () => {
+  // Without a cursor the list is reloaded from its first page; with one, the next page is appended
+  const fetchParameters = async (cursor?: string) => {
     try {
-      const response = await fetch('http://localhost:8000/api/parameters', {
+      const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+      const response = await fetch(`http://localhost:8000/api/parameters${query}`, {
         headers: {
           'Authorization': `Bearer ${token}`
         }
       })
       const data = await response.json()
-      setParameters(data)
+      setParameters(cursor ? (loaded) => [...loaded, ...data] : data)
+      setNextCursor(response.headers.get('X-Next-Cursor'))
     } catch (error) {
       toast({
         title: "Error",
@@ -359,7 +363,7 @@ export function ParameterManager({ user, token }: ParameterManagerProps) {
         <CardHeader className="bg-blue-50 border-b border-blue-200">
           <CardTitle className="text-blue-900">Current Parameters</CardTitle>
           <CardDescription className="text-blue-700">
-            {parameters.length} parameter{parameters.length !== 1 ? 's' : ''} found
+            {parameters.length}{nextCursor ? '+' : ''} parameter{parameters.length !== 1 ? 's' : ''} found
           </CardDescription>
         </CardHeader>
         <CardContent>
@@ -433,6 +437,17 @@ export function ParameterManager({ user, token }: ParameterManagerProps) {
               No parameters found. Add your first parameter to get started.
             </div>
           )}
+          {nextCursor && (
+            <div className="flex justify-center pt-4">
+              <Button
+                variant="outline"
+                onClick={() => fetchParameters(nextCursor)}
+                className="border-blue-300 text-blue-700 hover:bg-blue-50 hover:border-blue-400"
+              >
+                Load more
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
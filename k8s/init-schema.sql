@@ -7,6 +7,7 @@ CREATE TABLE IF NOT EXISTS fico_environment_config (
     authentication_url VARCHAR(500) NOT NULL,
     client_id VARCHAR(100) NOT NULL,
     secret TEXT NOT NULL,  -- Encrypted client secret
+    response_cache_ttl INTEGER,  -- Seconds to cache successful Fico responses; NULL or 0 disables
     created_by VARCHAR(100) NOT NULL,
     created_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     modified_by VARCHAR(100),
@@ -48,16 +49,54 @@ CREATE TABLE IF NOT EXISTS change_log (
     comments TEXT
 );
 
+CREATE TABLE IF NOT EXISTS fico_routing_rule (
+    product_code VARCHAR(50) NOT NULL,
+    version VARCHAR(20) NOT NULL,
+    targets TEXT NOT NULL,  -- JSON list of {product_code, version, weight}
+    shadow_product_code VARCHAR(50),
+    shadow_version VARCHAR(20),
+    shadow_sample_rate DOUBLE PRECISION DEFAULT 0,
+    created_by VARCHAR(100) NOT NULL,
+    created_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    modified_by VARCHAR(100),
+    modified_on TIMESTAMP,
+    status VARCHAR(20) DEFAULT 'ACTIVE',
+    PRIMARY KEY (product_code, version)
+);
+
+CREATE TABLE IF NOT EXISTS gateway_access_log (
+    log_id SERIAL PRIMARY KEY,
+    request_timestamp TIMESTAMP NOT NULL,
+    bom_version_id VARCHAR(200),
+    product_code VARCHAR(50),
+    version VARCHAR(20),
+    product_id VARCHAR(50),
+    subproduct_id VARCHAR(50),
+    routing_path VARCHAR(500),
+    status_code INTEGER NOT NULL,
+    upstream_status_code INTEGER,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    error TEXT
+);
+
+-- Columns added after the first release, for databases created before them
+ALTER TABLE fico_environment_config ADD COLUMN IF NOT EXISTS response_cache_ttl INTEGER;
+
 CREATE INDEX IF NOT EXISTS idx_fico_config_status ON fico_environment_config(status);
 CREATE INDEX IF NOT EXISTS idx_fico_config_product ON fico_environment_config(product_code);
 
 CREATE INDEX IF NOT EXISTS idx_params_product ON configurable_parameters(product_id, subproduct_id);
 CREATE INDEX IF NOT EXISTS idx_params_effective ON configurable_parameters(effective_from, effective_to);
 CREATE INDEX IF NOT EXISTS idx_params_status ON configurable_parameters(status);
+CREATE INDEX IF NOT EXISTS idx_params_product_status ON configurable_parameters(product_id, subproduct_id, status);
 
 CREATE INDEX IF NOT EXISTS idx_changelog_table ON change_log(table_name);
 CREATE INDEX IF NOT EXISTS idx_changelog_status ON change_log(status);
 CREATE INDEX IF NOT EXISTS idx_changelog_timestamp ON change_log(change_timestamp);
+CREATE INDEX IF NOT EXISTS idx_changelog_status_timestamp ON change_log(status, change_timestamp);
+
+CREATE INDEX IF NOT EXISTS ix_gateway_access_log_request_timestamp ON gateway_access_log(request_timestamp);
+CREATE INDEX IF NOT EXISTS idx_access_log_bom_version ON gateway_access_log(bom_version_id, request_timestamp);
 
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO gateway_user;
 GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA public TO gateway_user;